@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-window cost of one batch availability search vs. one search per window
+
+Usage: python benchmarks/bench_batch_availability.py [fleet_size] [num_windows]
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+
+from main import create_app, db
+from config import Config
+from models.booking import CarsharingBooking
+from models.user import User
+from models.vehicle import Vehicle
+from services.carsharing import find_available_vehicles, find_available_vehicles_batch
+
+CENTER = (34.0522, -118.2437)
+
+
+class BenchConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+
+def seed(fleet_size, start):
+    rng = random.Random(42)
+    owner = User(email='owner@example.com', first_name='Fleet', last_name='Owner', phone='+10000000000')
+    owner.password_hash = 'x'
+    db.session.add(owner)
+    db.session.flush()
+    db.session.bulk_insert_mappings(Vehicle, [{
+        'owner_id': owner.id,
+        'make': 'Make',
+        'model': 'Model',
+        'year': 2020,
+        'license_plate': f'BENCH{i}',
+        'vehicle_type': 'sedan',
+        'seating_capacity': 4,
+        'hourly_rate': 10,
+        'is_available': True,
+        'is_approved': True,
+        'latitude': CENTER[0] + rng.uniform(-0.3, 0.3),
+        'longitude': CENTER[1] + rng.uniform(-0.3, 0.3),
+    } for i in range(fleet_size)])
+    db.session.commit()
+    for vehicle_id in rng.sample(range(1, fleet_size + 1), fleet_size // 4):
+        booked_start = start + timedelta(minutes=15 * rng.randrange(0, 96))
+        db.session.add(CarsharingBooking(
+            user_id=owner.id, vehicle_id=vehicle_id, driver_id=owner.id,
+            start_time=booked_start, end_time=booked_start + timedelta(hours=rng.randrange(1, 6)),
+            pickup_address='bench', pickup_latitude=CENTER[0], pickup_longitude=CENTER[1],
+            total_price=10, status='confirmed'
+        ))
+    db.session.commit()
+
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    fleet_size = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    num_windows = int(sys.argv[2]) if len(sys.argv) > 2 else 24
+    start = datetime(2030, 6, 1, 8)
+    windows = [(start + timedelta(hours=h), start + timedelta(hours=h + 2)) for h in range(num_windows)]
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        seed(fleet_size, start)
+        for booking_index in (True, False):
+            app.config['BOOKING_INDEX_ENABLED'] = booking_index
+            find_available_vehicles(*windows[0], CENTER)  # warm the indexes
+
+            one_by_one = timed(lambda: [find_available_vehicles(s, e, CENTER) for s, e in windows])
+            batched = timed(lambda: find_available_vehicles_batch(windows, [CENTER]))
+            print(f'fleet={fleet_size} windows={num_windows} booking_index={booking_index}')
+            print(f'  per-window searches: {one_by_one * 1000 / num_windows:8.2f} ms/window')
+            print(f'  batch search:        {batched * 1000 / num_windows:8.2f} ms/window')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Benchmark: scoring N candidate points with the NumPy batch API vs. geopy per pair
+
+Usage: python benchmarks/bench_distances.py [num_points]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.geoutils import calculate_distance, nearest_indices, radius_filter
+
+ORIGIN = (34.0522, -118.2437)
+
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    num_points = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = random.Random(42)
+    lats = [ORIGIN[0] + rng.uniform(-1, 1) for _ in range(num_points)]
+    lngs = [ORIGIN[1] + rng.uniform(-1, 1) for _ in range(num_points)]
+
+    pairwise = timed(lambda: sorted(
+        d for d in (calculate_distance(ORIGIN, p) for p in zip(lats, lngs)) if d <= 10
+    ), repeat=1)
+    batch_sort = timed(lambda: nearest_indices(ORIGIN, lats, lngs, max_distance=10))
+    batch_filter = timed(lambda: radius_filter(ORIGIN, lats, lngs, 10))
+
+    print(f'points={num_points}')
+    print(f'geopy per pair:        {pairwise * 1000:8.1f} ms')
+    print(f'numpy nearest_indices: {batch_sort * 1000:8.1f} ms')
+    print(f'numpy radius_filter:   {batch_filter * 1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark: building a JSON response of N vehicles with Flask's default provider
+(to_dict() converting rates with float()) vs. FastJSONProvider on raw column values
+
+Usage: python benchmarks/bench_json.py [num_vehicles]
+"""
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+
+from flask.json.provider import DefaultJSONProvider
+from main import create_app
+from models.vehicle import Vehicle
+from utils.jsonprovider import FastJSONProvider, orjson
+
+
+def timed(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def converted(vehicle_dict):
+    """to_dict() output as it was before models returned Decimal values"""
+    rates = vehicle_dict['rates']
+    return dict(vehicle_dict, rates={k: float(v) if v else None for k, v in rates.items()})
+
+
+def main():
+    num_vehicles = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rng = random.Random(42)
+    vehicles = [Vehicle(
+        id=i, owner_id=1, make='Toyota', model='Corolla', year=2020, license_plate=f'BENCH{i}',
+        color='blue', vehicle_type='sedan', seating_capacity=5, fuel_type='petrol', transmission='automatic',
+        daily_rate=Decimal('49.99'), hourly_rate=Decimal('9.50'), is_available=True, is_approved=True,
+        latitude=34.05 + rng.uniform(-0.5, 0.5), longitude=-118.24 + rng.uniform(-0.5, 0.5)
+    ) for i in range(num_vehicles)]
+
+    app = create_app()
+    default = DefaultJSONProvider(app)
+    fallback = FastJSONProvider(app, use_orjson=False)
+    fast = FastJSONProvider(app)
+
+    with app.test_request_context():
+        results = [
+            ('default provider, float() in to_dict', lambda: default.response([converted(v.to_dict()) for v in vehicles])),
+            ('FastJSONProvider (stdlib json)', lambda: fallback.response([v.to_dict() for v in vehicles])),
+        ]
+        if orjson is not None:
+            results.append(('FastJSONProvider (orjson)', lambda: fast.response([v.to_dict() for v in vehicles])))
+        to_dict_only = timed(lambda: [v.to_dict() for v in vehicles])
+
+        print(f'vehicles={num_vehicles}')
+        print(f'  to_dict() alone:                       {to_dict_only * 1000:8.1f} ms')
+        for label, fn in results:
+            print(f'  {label:38} {timed(fn) * 1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark: login throughput under concurrency with password hashing inline in
+the request thread vs. offloaded to the PasswordHasher process pool
+
+Usage: python benchmarks/bench_login.py [concurrency] [logins]
+"""
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+
+from config import Config
+from main import create_app, db
+from models.user import User
+from utils.passwords import PasswordHasher
+
+
+def make_app(path, workers, concurrency):
+    class BenchConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+        PASSWORD_HASH_WORKERS = workers
+        PASSWORD_HASH_QUEUE = concurrency
+    return create_app(BenchConfig)
+
+
+def run(app, concurrency, logins):
+    def login(i):
+        response = app.test_client().post('/auth/login', json={
+            'email': f'user{i % concurrency}@example.com', 'password': 'benchpass'
+        })
+        assert response.status_code == 200, response.status_code
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(login, range(concurrency)))  # warm up the hashing pool
+        started = time.perf_counter()
+        list(pool.map(login, range(logins)))
+        return time.perf_counter() - started
+
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    logins = int(sys.argv[2]) if len(sys.argv) > 2 else 128
+    cores = os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.db')
+        app = make_app(path, 0, concurrency)
+        with app.app_context():
+            db.create_all()
+            password_hash = PasswordHasher(app.config['PASSWORD_HASH_METHOD']).hash('benchpass')
+            db.session.add_all([User(email=f'user{i}@example.com', password_hash=password_hash, first_name='Bench',
+                                     last_name='User', phone='+15550100') for i in range(concurrency)])
+            db.session.commit()
+
+        print(f'{logins} logins, {concurrency} concurrent clients, {cores} cores, '
+              f'{app.config["PASSWORD_HASH_METHOD"]}')
+        for workers in sorted({0, 2, cores}):
+            elapsed = run(make_app(path, workers, concurrency), concurrency, logins)
+            label = 'inline' if not workers else f'{workers} hashing processes'
+            print(f'  {label:>22}: {elapsed:6.2f} s  {logins / elapsed:7.1f} logins/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark: listing N vehicles as ORM instances vs. __slots__ read models
+
+Usage: python benchmarks/bench_read_models.py [num_vehicles]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+
+from main import create_app, db
+from config import Config
+from models.read import VehicleRecord
+from models.user import User
+from models.vehicle import Vehicle
+
+
+class BenchConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+
+def measure(fn):
+    """Return (seconds, peak traced bytes) of one run of fn, after the session is cleared"""
+    db.session.expunge_all()
+    tracemalloc.start()
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    num_vehicles = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    app = create_app(BenchConfig)
+    with app.app_context():
+        owner = User(email='owner@example.com', first_name='Fleet', last_name='Owner', phone='+10000000000')
+        owner.password_hash = 'x'
+        db.session.add(owner)
+        db.session.flush()
+        db.session.bulk_insert_mappings(Vehicle, [{
+            'owner_id': owner.id, 'make': 'Toyota', 'model': 'Corolla', 'year': 2020,
+            'license_plate': f'BENCH{i}', 'vehicle_type': 'sedan', 'seating_capacity': 5,
+            'daily_rate': 49.99, 'hourly_rate': 9.5, 'is_available': True, 'is_approved': True,
+            'latitude': 34.05, 'longitude': -118.24
+        } for i in range(num_vehicles)])
+        db.session.commit()
+
+        criteria = (Vehicle.is_available == True, Vehicle.is_approved == True)
+        orm_time, orm_peak = measure(lambda: [v.to_dict() for v in Vehicle.query.filter(*criteria).all()])
+        read_time, read_peak = measure(lambda: [v.to_dict() for v in VehicleRecord.all(*criteria)])
+
+        print(f'vehicles={num_vehicles}')
+        print(f'  ORM instances: {orm_time * 1000:8.1f} ms, peak {orm_peak / 2**20:6.1f} MiB')
+        print(f'  read models:   {read_time * 1000:8.1f} ms, peak {read_peak / 2**20:6.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
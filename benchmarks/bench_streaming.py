@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark: peak memory and time to first byte of GET /vehicles/ buffered vs. ?stream=true
+
+Usage: python benchmarks/bench_streaming.py [num_vehicles]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+
+from main import create_app, db
+from config import Config
+from models.user import User
+from models.vehicle import Vehicle
+
+
+class BenchConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+
+def consume(client, query_string):
+    """Read a response chunk by chunk; return (first byte seconds, total seconds, peak bytes)"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    response = client.get('/vehicles/', query_string=query_string, buffered=False)
+    first_byte = None
+    for _ in response.iter_encoded():
+        if first_byte is None:
+            first_byte = time.perf_counter() - started
+    total = time.perf_counter() - started
+    response.close()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first_byte, total, peak
+
+
+def main():
+    num_vehicles = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    app = create_app(BenchConfig)
+    with app.app_context():
+        owner = User(email='owner@example.com', first_name='Fleet', last_name='Owner', phone='+10000000000')
+        owner.password_hash = 'x'
+        db.session.add(owner)
+        db.session.flush()
+        db.session.bulk_insert_mappings(Vehicle, [{
+            'owner_id': owner.id, 'make': 'Toyota', 'model': 'Corolla', 'year': 2020,
+            'license_plate': f'BENCH{i}', 'vehicle_type': 'sedan', 'seating_capacity': 5,
+            'daily_rate': 49.99, 'hourly_rate': 9.5, 'is_available': True, 'is_approved': True,
+            'latitude': 34.05, 'longitude': -118.24
+        } for i in range(num_vehicles)])
+        db.session.commit()
+
+        client = app.test_client()
+        print(f'vehicles={num_vehicles}')
+        for label, query_string in (('buffered', {}), ('streamed', {'stream': 'true'})):
+            first_byte, total, peak = consume(client, query_string)
+            print(f'  {label}: first byte {first_byte * 1000:7.1f} ms, '
+                  f'total {total * 1000:7.1f} ms, peak {peak / 2**20:6.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark: radius search through the vehicle grid index vs. a full-fleet scan
+
+Usage: python benchmarks/bench_vehicle_search.py [fleet_size]
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+
+from main import create_app, db
+from config import Config
+from models.user import User
+from models.vehicle import Vehicle
+from models.booking import CarsharingBooking
+from services.carsharing import find_available_vehicles
+from utils.geoutils import calculate_distance
+
+CENTER = (34.0522, -118.2437)
+
+
+class BenchConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+
+def full_scan(start_time, end_time, location, radius_km=10):
+    """The pre-index implementation: load the fleet and measure every vehicle"""
+    vehicles = Vehicle.query.filter(
+        Vehicle.is_approved == True,
+        Vehicle.is_available == True
+    ).all()
+    available = []
+    for vehicle in vehicles:
+        if not vehicle.latitude or not vehicle.longitude:
+            continue
+        if calculate_distance(location, (vehicle.latitude, vehicle.longitude)) > radius_km:
+            continue
+        has_conflict = CarsharingBooking.query.filter(
+            CarsharingBooking.vehicle_id == vehicle.id,
+            CarsharingBooking.status.in_(['confirmed', 'pending']),
+            CarsharingBooking.start_time < end_time,
+            CarsharingBooking.end_time > start_time
+        ).first()
+        if not has_conflict:
+            available.append(vehicle)
+    return available
+
+
+def seed(fleet_size):
+    rng = random.Random(42)
+    owner = User(email='owner@example.com', first_name='Fleet', last_name='Owner', phone='+10000000000')
+    owner.password_hash = 'x'
+    db.session.add(owner)
+    db.session.flush()
+    # A metro-area fleet spread over roughly 200km x 200km
+    db.session.bulk_insert_mappings(Vehicle, [{
+        'owner_id': owner.id,
+        'make': 'Make',
+        'model': 'Model',
+        'year': 2020,
+        'license_plate': f'BENCH{i}',
+        'vehicle_type': 'sedan',
+        'seating_capacity': 4,
+        'hourly_rate': 10,
+        'daily_rate': 50,
+        'is_available': True,
+        'is_approved': True,
+        'latitude': CENTER[0] + rng.uniform(-1, 1),
+        'longitude': CENTER[1] + rng.uniform(-1, 1),
+    } for i in range(fleet_size)])
+    db.session.commit()
+
+
+def timed(fn, repeat=5):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    fleet_size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    app = create_app(BenchConfig)
+    with app.app_context():
+        seed(fleet_size)
+        start_time = datetime.utcnow() + timedelta(hours=1)
+        end_time = start_time + timedelta(hours=2)
+
+        # The first indexed search pays for the index build
+        build_started = time.perf_counter()
+        find_available_vehicles(start_time, end_time, CENTER)
+        build_time = time.perf_counter() - build_started
+
+        scan_time, scanned = timed(lambda: full_scan(start_time, end_time, CENTER))
+        index_time, indexed = timed(lambda: find_available_vehicles(start_time, end_time, CENTER))
+
+        assert sorted(v.id for v in scanned) == sorted(v.id for v in indexed)
+        print(f'fleet={fleet_size} matches={len(indexed)}')
+        print(f'full scan:    {scan_time * 1000:8.1f} ms')
+        print(f'grid index:   {index_time * 1000:8.1f} ms  (first call incl. build {build_time * 1000:.1f} ms)')
+
+
+if __name__ == '__main__':
+    main()
@@ -18,6 +18,8 @@ class Config:
     # JWT Configuration
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'jwt-secret-change-me-too')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
+    # Role changes made by other workers reach this one within ROLE_VERSION_MAX_AGE seconds
+    ROLE_VERSION_MAX_AGE = int(os.getenv('ROLE_VERSION_MAX_AGE', 30))
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
     JWT_TOKEN_LOCATION = ['headers', 'cookies']
     JWT_COOKIE_SECURE = False  # Set to True in production with HTTPS
@@ -51,6 +53,37 @@ class Config:
     # Application Settings
     DEFAULT_SERVICE_RADIUS_KM = int(os.getenv('DEFAULT_SERVICE_RADIUS_KM', 10))
     PASSWORD_RESET_EXPIRE_MINUTES = int(os.getenv('PASSWORD_RESET_EXPIRE_MINUTES', 60))
+    # Longest booking and availability search window accepted, in days
+    MAX_BOOKING_DAYS = int(os.getenv('MAX_BOOKING_DAYS', 90))
+    MAX_SEARCH_WINDOW_DAYS = int(os.getenv('MAX_SEARCH_WINDOW_DAYS', 90))
+    
+    # Password hashing: werkzeug method of new hashes (older ones are rehashed
+    # on login) and the process pool computing them (0 workers = inline)
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE = int(os.getenv('PASSWORD_HASH_QUEUE', 32))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', 5))
+    
+    # In-memory search indexes (rebuilt from the database after SEARCH_INDEX_MAX_AGE seconds)
+    SEARCH_INDEX_MAX_AGE = int(os.getenv('SEARCH_INDEX_MAX_AGE', 300))
+    # Geo search backend: sql (bounding box), rtree (SQLite), postgis or python (in-memory
+    # grid, which sees other workers' changes only after SEARCH_INDEX_MAX_AGE). Empty picks
+    # the database's spatial engine: rtree on SQLite, postgis (or sql without it) on PostgreSQL
+    GEO_BACKEND = os.getenv('GEO_BACKEND', '')
+    SPATIAL_INDEX_CELL_DEG = float(os.getenv('SPATIAL_INDEX_CELL_DEG', 0.05))
+    COVERAGE_INDEX_CELL_DEG = float(os.getenv('COVERAGE_INDEX_CELL_DEG', 0.1))
+    BOOKING_INDEX_ENABLED = os.getenv('BOOKING_INDEX_ENABLED', 'true').lower() == 'true'
+    
+    # JSON encoding with orjson when installed (stdlib json otherwise)
+    ORJSON_ENABLED = os.getenv('ORJSON_ENABLED', 'true').lower() == 'true'
+    
+    # Response compression (brotli when installed, gzip otherwise)
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 500))
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 4))
+    # Compressed bodies of responses with an ETag kept for reuse
+    COMPRESS_CACHE_SIZE = int(os.getenv('COMPRESS_CACHE_SIZE', 256))
     
     # CORS Configuration
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', '').split(',') or ['*']
@@ -1,27 +1,37 @@
-from flask import Flask
+from flask import Flask, json
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_socketio import SocketIO
 from celery import Celery
 from config import Config
+from utils.compression import Compressor
+from utils.jsonprovider import FastJSONProvider
+from utils.passwords import HashingBusy, hashing_busy
 
 db = SQLAlchemy()
 migrate = Migrate()
 jwt = JWTManager()
 socketio = SocketIO()
 celery = Celery(__name__, broker=Config.CELERY_BROKER_URL)
+compressor = Compressor()
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    app.json = FastJSONProvider(app, use_orjson=app.config.get('ORJSON_ENABLED', True))
 
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
-    socketio.init_app(app, message_queue=app.config['SOCKETIO_MESSAGE_QUEUE'])
+    # Emitted payloads are encoded by app.json, like responses
+    socketio.init_app(app, message_queue=app.config['SOCKETIO_MESSAGE_QUEUE'], json=json)
     celery.conf.update(app.config)
+    if app.config.get('COMPRESS_ENABLED', True):
+        compressor.init_app(app)
+    # Every endpoint setting or checking a password may find the hashing queue full
+    app.register_error_handler(HashingBusy, hashing_busy)
     
     # Ensure db is bound to app context
     with app.app_context():
@@ -36,6 +46,11 @@ def create_app(config_class=Config):
     from routes.notifications import notifications_bp
     from routes.admin import admin_bp
     from routes.detailing import detailing_bp
+    from routes.carsharing import carsharing_bp
+    from services.roles import role_claims
+    
+    # Tokens carry the user's roles, so role checks need no user lookup
+    jwt.additional_claims_loader(role_claims)
     
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(bookings_bp, url_prefix='/bookings')
@@ -45,6 +60,7 @@ def create_app(config_class=Config):
     app.register_blueprint(notifications_bp, url_prefix='/notifications')
     app.register_blueprint(admin_bp, url_prefix='/admin')
     app.register_blueprint(detailing_bp, url_prefix='/detailing')
+    app.register_blueprint(carsharing_bp, url_prefix='/carsharing')
 
     # Add a simple root route
     @app.route('/')
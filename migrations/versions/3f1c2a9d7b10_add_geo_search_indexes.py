@@ -0,0 +1,38 @@
+"""add geo search indexes
+
+Revision ID: 3f1c2a9d7b10
+Revises: 
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('vehicles', 'ix_vehicles_search_location', ['is_approved', 'is_available', 'latitude', 'longitude']),
+    ('users', 'ix_users_provider_location', ['is_detailing_provider', 'latitude', 'longitude']),
+]
+
+
+def upgrade():
+    # Tables are created by db.create_all(), which already adds these indexes
+    # to new tables; only existing tables need them here
+    inspector = sa.inspect(op.get_bind())
+    for table, name, columns in INDEXES:
+        if inspector.has_table(table):
+            op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    for table, name, _ in reversed(INDEXES):
+        if inspector.has_table(table):
+            op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,54 @@
+"""add spatial backend support
+
+Revision ID: 8b2e4d6f1a37
+Revises: 3f1c2a9d7b10
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from utils.geoutils.backends import rtree_statements
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e4d6f1a37'
+down_revision = '3f1c2a9d7b10'
+branch_labels = None
+depends_on = None
+
+
+TABLES = ['vehicles', 'users']
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = [t for t in TABLES if inspector.has_table(t)]
+
+    if bind.dialect.name == 'sqlite':
+        # R*Trees used by GEO_BACKEND=rtree, kept in sync by triggers
+        for table in tables:
+            for statement in rtree_statements(table):
+                op.execute(statement)
+
+    elif bind.dialect.name == 'postgresql':
+        # GiST indexes used by GEO_BACKEND=postgis; skipped without the extension
+        has_postgis = bind.exec_driver_sql("SELECT 1 FROM pg_extension WHERE extname = 'postgis'").scalar()
+        if has_postgis:
+            for table in tables:
+                op.execute(
+                    f'CREATE INDEX IF NOT EXISTS ix_{table}_geography ON {table} '
+                    f'USING gist (geography(ST_MakePoint(longitude, latitude)))'
+                )
+
+
+def downgrade():
+    bind = op.get_bind()
+    for table in reversed(TABLES):
+        if bind.dialect.name == 'sqlite':
+            for suffix in ('insert', 'update', 'delete'):
+                op.execute(f'DROP TRIGGER IF EXISTS {table}_rtree_{suffix}')
+            op.execute(f'DROP TABLE IF EXISTS {table}_rtree')
+        elif bind.dialect.name == 'postgresql':
+            op.execute(f'DROP INDEX IF EXISTS ix_{table}_geography')
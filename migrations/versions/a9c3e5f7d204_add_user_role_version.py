@@ -0,0 +1,28 @@
+"""add users.role_version
+
+Revision ID: a9c3e5f7d204
+Revises: f4b8d2e6a915
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9c3e5f7d204'
+down_revision = 'f4b8d2e6a915'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table('users') and 'role_version' not in {c['name'] for c in inspector.get_columns('users')}:
+        with op.batch_alter_table('users') as batch_op:
+            batch_op.add_column(sa.Column('role_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('role_version')
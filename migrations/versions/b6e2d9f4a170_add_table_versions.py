@@ -0,0 +1,64 @@
+"""add table_versions and the triggers bumping them, drop the updated_at indexes
+
+Revision ID: b6e2d9f4a170
+Revises: a9c3e5f7d204
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from utils.versions import version_statements
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e2d9f4a170'
+down_revision = 'a9c3e5f7d204'
+branch_labels = None
+depends_on = None
+
+
+# Tables behind the catalog endpoints' ETags and the service catalog's snapshots
+TABLES = ['vehicles', 'bus_agencies', 'bus_routes', 'detailing_services', 'translations']
+# ETags no longer read max(updated_at), so the indexes added for it in
+# d7f3b1c8e260 only slow writes down
+UPDATED_AT_TABLES = ['vehicles', 'bus_agencies', 'bus_routes', 'detailing_services']
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table('table_versions'):
+        op.create_table(
+            'table_versions',
+            sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+            sa.Column('name', sa.String(length=64), nullable=False),
+            sa.Column('version', sa.BigInteger(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_table_versions_name', 'table_versions', ['name'], unique=False)
+    for table in TABLES:
+        if inspector.has_table(table):
+            for statement in version_statements(table, bind.dialect.name):
+                op.execute(statement)
+    for table in UPDATED_AT_TABLES:
+        if inspector.has_table(table):
+            op.drop_index(f'ix_{table}_updated_at', table_name=table, if_exists=True)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    for table in UPDATED_AT_TABLES:
+        if inspector.has_table(table):
+            op.create_index(f'ix_{table}_updated_at', table, ['updated_at'], unique=False, if_not_exists=True)
+    for table in TABLES:
+        if bind.dialect.name == 'sqlite':
+            for suffix in ('insert', 'update', 'delete'):
+                op.execute(f'DROP TRIGGER IF EXISTS {table}_version_{suffix}')
+        elif bind.dialect.name == 'postgresql':
+            op.execute(f'DROP TRIGGER IF EXISTS {table}_version ON {table}')
+    if bind.dialect.name == 'postgresql':
+        op.execute('DROP FUNCTION IF EXISTS bump_table_version()')
+    op.drop_index('ix_table_versions_name', table_name='table_versions')
+    op.drop_table('table_versions')
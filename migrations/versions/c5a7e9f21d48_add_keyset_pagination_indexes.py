@@ -0,0 +1,39 @@
+"""add keyset pagination indexes
+
+Revision ID: c5a7e9f21d48
+Revises: 8b2e4d6f1a37
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a7e9f21d48'
+down_revision = '8b2e4d6f1a37'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('vehicles', 'ix_vehicles_created_at_id', ['created_at', 'id']),
+    ('bus_routes', 'ix_bus_routes_departure_time_id', ['departure_time', 'id']),
+    ('bus_seats', 'ix_bus_seats_route_id_id', ['route_id', 'id']),
+    ('notifications', 'ix_notifications_user_id_created_at_id', ['user_id', 'created_at', 'id']),
+]
+
+
+def upgrade():
+    # New tables get these indexes from db.create_all(); only existing ones need them here
+    inspector = sa.inspect(op.get_bind())
+    for table, name, columns in INDEXES:
+        if inspector.has_table(table):
+            op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    for table, name, _ in reversed(INDEXES):
+        if inspector.has_table(table):
+            op.drop_index(name, table_name=table, if_exists=True)
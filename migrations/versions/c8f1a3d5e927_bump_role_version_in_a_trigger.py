@@ -0,0 +1,37 @@
+"""bump users.role_version in a trigger
+
+Revision ID: c8f1a3d5e927
+Revises: b6e2d9f4a170
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from utils.versions import counter_statements
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8f1a3d5e927'
+down_revision = 'b6e2d9f4a170'
+branch_labels = None
+depends_on = None
+
+
+ROLE_COLUMNS = ('is_admin', 'is_driver', 'is_detailing_provider')
+
+
+def upgrade():
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table('users'):
+        for statement in counter_statements('users', 'role_version', ROLE_COLUMNS, bind.dialect.name):
+            op.execute(statement)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS users_role_version')
+    elif bind.dialect.name == 'postgresql':
+        op.execute('DROP TRIGGER IF EXISTS users_role_version ON users')
+        op.execute('DROP FUNCTION IF EXISTS bump_users_role_version()')
@@ -0,0 +1,35 @@
+"""add updated_at indexes for catalog etags
+
+Revision ID: d7f3b1c8e260
+Revises: c5a7e9f21d48
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7f3b1c8e260'
+down_revision = 'c5a7e9f21d48'
+branch_labels = None
+depends_on = None
+
+
+# max(updated_at) of the catalog tables fingerprinted their ETags until
+# b6e2d9f4a170 moved them to table_versions and dropped these indexes
+TABLES = ['vehicles', 'bus_agencies', 'bus_routes', 'detailing_services']
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for table in TABLES:
+        if inspector.has_table(table):
+            op.create_index(f'ix_{table}_updated_at', table, ['updated_at'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    for table in reversed(TABLES):
+        if inspector.has_table(table):
+            op.drop_index(f'ix_{table}_updated_at', table_name=table, if_exists=True)
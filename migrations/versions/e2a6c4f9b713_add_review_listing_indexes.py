@@ -0,0 +1,37 @@
+"""add review listing indexes
+
+Revision ID: e2a6c4f9b713
+Revises: d7f3b1c8e260
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a6c4f9b713'
+down_revision = 'd7f3b1c8e260'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('reviews', 'ix_reviews_target_id_created_at_id', ['target_id', 'created_at', 'id']),
+    ('reviews', 'ix_reviews_vehicle_id_created_at_id', ['vehicle_id', 'created_at', 'id']),
+]
+
+
+def upgrade():
+    # New tables get these indexes from db.create_all(); only existing ones need them here
+    inspector = sa.inspect(op.get_bind())
+    for table, name, columns in INDEXES:
+        if inspector.has_table(table):
+            op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    for table, name, _ in reversed(INDEXES):
+        if inspector.has_table(table):
+            op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,105 @@
+"""add translations table and split JSON translation blobs into it
+
+Revision ID: f4b8d2e6a915
+Revises: e2a6c4f9b713
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+import json
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4b8d2e6a915'
+down_revision = 'e2a6c4f9b713'
+branch_labels = None
+depends_on = None
+
+
+DEFAULT_LANG = 'en'
+# Columns that held {lang: text} JSON blobs
+TRANSLATED = {
+    'detailing_services': ['name', 'description'],
+    'notifications': ['title', 'message'],
+}
+
+translations = sa.table(
+    'translations',
+    sa.column('entity', sa.String), sa.column('entity_id', sa.Integer), sa.column('field', sa.String),
+    sa.column('lang', sa.String), sa.column('value', sa.Text),
+)
+
+
+def _parse(value):
+    if not isinstance(value, str) or value.lstrip()[:1] != '{':
+        return None
+    try:
+        parsed = json.loads(value)
+    except ValueError:
+        return None
+    return parsed if isinstance(parsed, dict) and parsed else None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table('translations'):
+        op.create_table(
+            'translations',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('entity', sa.String(length=50), nullable=False),
+            sa.Column('entity_id', sa.Integer(), nullable=False),
+            sa.Column('field', sa.String(length=50), nullable=False),
+            sa.Column('lang', sa.String(length=8), nullable=False),
+            sa.Column('value', sa.Text(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('entity', 'lang', 'entity_id', 'field', name='uq_translations_entity_lang_id_field')
+        )
+
+    # The default language stays in the row's column, the others move out
+    for entity, fields in TRANSLATED.items():
+        if not inspector.has_table(entity):
+            continue
+        table = sa.table(entity, sa.column('id', sa.Integer), *[sa.column(f, sa.Text) for f in fields])
+        for row in bind.execute(sa.select(table)).mappings().all():
+            updates, rows = {}, []
+            for field in fields:
+                blob = _parse(row[field])
+                if blob is None:
+                    continue
+                updates[field] = blob.get(DEFAULT_LANG, next(iter(blob.values())))
+                rows.extend({'entity': entity, 'entity_id': row['id'], 'field': field, 'lang': lang, 'value': text}
+                            for lang, text in blob.items() if lang != DEFAULT_LANG)
+            if updates:
+                bind.execute(table.update().where(table.c.id == row['id']).values(**updates))
+            if rows:
+                bind.execute(translations.insert(), rows)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table('translations'):
+        return
+
+    # Fold the translations back into JSON blobs
+    for entity, fields in TRANSLATED.items():
+        if not inspector.has_table(entity):
+            continue
+        table = sa.table(entity, sa.column('id', sa.Integer), *[sa.column(f, sa.Text) for f in fields])
+        stored = bind.execute(
+            sa.select(translations.c.entity_id, translations.c.field, translations.c.lang, translations.c.value)
+            .where(translations.c.entity == entity)
+        ).all()
+        blobs = {}
+        for entity_id, field, lang, value in stored:
+            blobs.setdefault((entity_id, field), {})[lang] = value
+        for (entity_id, field), blob in blobs.items():
+            current = bind.execute(sa.select(table.c[field]).where(table.c.id == entity_id)).scalar()
+            if current is None:
+                continue
+            blob[DEFAULT_LANG] = current
+            bind.execute(table.update().where(table.c.id == entity_id).values({field: json.dumps(blob)}))
+
+    op.drop_table('translations')
@@ -1,6 +1,11 @@
 from datetime import datetime
+from sqlalchemy.orm import configure_mappers, joinedload, with_polymorphic
 from main import db
 
+# Booking statuses that block the booked vehicle or detailing provider
+CARSHARING_ACTIVE_STATUSES = ['confirmed', 'pending']
+DETAILING_ACTIVE_STATUSES = ['confirmed', 'in_progress']
+
 class Booking(db.Model):
     __tablename__ = 'bookings'
     
@@ -23,15 +28,39 @@ class Booking(db.Model):
         'polymorphic_identity': 'booking'
     }
 
+    # Many-to-one relationships to_dict() embeds, each with a <name>_id column
+    embedded = ()
+
+    @classmethod
+    def load_options(cls, include=None):
+        """
+        Loader options fetching the embedded relationships in the same query
+        Args:
+            include: Optional names of the relationships to load (default: all)
+        """
+        # The relationships are backrefs, which only exist once mappers are configured
+        configure_mappers()
+        return tuple(joinedload(getattr(cls, name), innerjoin=True)
+                     for name in cls.embedded if include is None or name in include)
+
+    def _embed(self, data, include=None):
+        """Add the embedded relationships to data, or only their ids for those not in include"""
+        for name in self.embedded:
+            if include is None or name in include:
+                data[name] = getattr(self, name).to_dict()
+            else:
+                data[f'{name}_id'] = getattr(self, f'{name}_id')
+        return data
+
     def to_dict(self):
         return {
             'id': self.id,
             'service_type': self.service_type,
             'status': self.status,
-            'start_time': self.start_time.isoformat(),
-            'end_time': self.end_time.isoformat() if self.end_time else None,
-            'total_price': float(self.total_price),
-            'created_at': self.created_at.isoformat()
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'total_price': self.total_price,
+            'created_at': self.created_at
         }
 
 class CarsharingBooking(Booking):
@@ -53,11 +82,11 @@ class CarsharingBooking(Booking):
         'polymorphic_identity': 'carsharing'
     }
 
-    def to_dict(self):
-        base_dict = super().to_dict()
+    embedded = ('vehicle', 'driver')
+
+    def to_dict(self, include=None):
+        base_dict = self._embed(super().to_dict(), include)
         base_dict.update({
-            'vehicle': self.vehicle.to_dict(),
-            'driver': self.driver.to_dict(),
             'pickup_location': {
                 'address': self.pickup_address,
                 'lat': self.pickup_latitude,
@@ -89,12 +118,11 @@ class DetailingBooking(Booking):
         'polymorphic_identity': 'detailing'
     }
 
-    def to_dict(self):
-        base_dict = super().to_dict()
+    embedded = ('service', 'provider', 'vehicle')
+
+    def to_dict(self, include=None):
+        base_dict = self._embed(super().to_dict(), include)
         base_dict.update({
-            'service': self.service.to_dict(),
-            'provider': self.provider.to_dict(),
-            'vehicle': self.vehicle.to_dict(),
             'location': {
                 'address': self.address,
                 'lat': self.latitude,
@@ -124,4 +152,21 @@ class BusSeatBooking(Booking):
             'agency_id': self.agency_id,
             'notes': self.notes
         })
-        return base_dict
\ No newline at end of file
+        return base_dict
+
+def polymorphic_bookings():
+    """
+    Query for bookings of every type that loads each row's subtype columns and
+    the relationships its to_dict() serializes in one statement, instead of
+    one extra load per row. Filter it on Booking columns.
+    """
+    configure_mappers()
+    bookings = with_polymorphic(Booking, [CarsharingBooking, DetailingBooking, BusSeatBooking])
+    # Outer joins, since each row only has one subtype's relationships
+    return db.session.query(bookings).options(
+        joinedload(bookings.CarsharingBooking.vehicle),
+        joinedload(bookings.CarsharingBooking.driver),
+        joinedload(bookings.DetailingBooking.service),
+        joinedload(bookings.DetailingBooking.provider),
+        joinedload(bookings.DetailingBooking.vehicle)
+    )
@@ -1,5 +1,6 @@
 from datetime import datetime
 from main import db
+from models.translation import load_translations
 from utils.translation import translate_field, get_current_lang
 
 class Notification(db.Model):
@@ -14,15 +15,21 @@ class Notification(db.Model):
     is_read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        # Newest-first keyset pagination of a user's notifications
+        db.Index('ix_notifications_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+    )
+    
     def to_dict(self, lang=None):
         if not lang:
             lang = get_current_lang()
+        translations = load_translations(self.__tablename__, lang, [self.id]).get(self.id, {})
 
         return {
             'id': self.id,
-            'title': translate_field(self.title, lang),
-            'message': translate_field(self.message, lang),
+            'title': translate_field(translations.get('title', self.title), lang),
+            'message': translate_field(translations.get('message', self.message), lang),
             'type': self.notification_type,
             'is_read': self.is_read,
-            'created_at': self.created_at.isoformat()
+            'created_at': self.created_at
         }
\ No newline at end of file
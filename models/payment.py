@@ -19,11 +19,11 @@ class Payment(db.Model):
         return {
             'id': self.id,
             'booking_id': self.booking_id,
-            'amount': float(self.amount),
+            'amount': self.amount,
             'currency': self.currency,
             'payment_method': self.payment_method,
             'status': self.status,
             'gateway': self.gateway,
             'transaction_id': self.transaction_id,
-            'created_at': self.created_at.isoformat()
+            'created_at': self.created_at
         }
\ No newline at end of file
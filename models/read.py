@@ -0,0 +1,131 @@
+from sqlalchemy import func, select
+from main import db
+from utils.pagination import keyset_page, split_page
+from models.vehicle import Vehicle, BusRoute, BusSeat
+from models.service import DetailingService
+
+class ReadModel:
+    """
+    Read-only record loaded from an entity's columns for listing endpoints.
+    Rows are selected as plain tuples and copied into __slots__ records, so no
+    ORM instances or identity-map entries are created. Subclasses name the
+    columns they need in __slots__ and reuse the model's to_dict(), which
+    keeps the serialized shape identical. sort_key lists the columns keyset
+    pages are ordered on, ending with a unique one.
+    Loaders take an optional set of to_dict() keys (a sparse fieldset) and
+    only select the columns those keys need; field_slots maps the keys that
+    are not named after a slot, and the other slots are left as None.
+    """
+    __slots__ = ()
+    entity = None
+    sort_key = ()
+    field_slots = {}
+
+    def __init__(self, *values, slots=None):
+        if slots is not None:
+            for name in self.__slots__:
+                setattr(self, name, None)
+        for name, value in zip(slots or self.__slots__, values):
+            setattr(self, name, value)
+
+    @classmethod
+    def slots_for(cls, fields=None):
+        """Return the slots needed to serialize the to_dict() keys in fields (all of them by default)"""
+        if fields is None:
+            return None
+        wanted = set()
+        for field in fields:
+            wanted.update(cls.field_slots.get(field, (field, f'{field}_id')))
+        return tuple(name for name in cls.__slots__ if name in wanted)
+
+    @classmethod
+    def select(cls, *criteria, slots=None):
+        return select(*[getattr(cls.entity, name) for name in slots or cls.__slots__]).where(*criteria)
+
+    @classmethod
+    def all(cls, *criteria, fields=None):
+        """Load the records of every row matching criteria"""
+        slots = cls.slots_for(fields)
+        return [cls(*row, slots=slots) for row in db.session.execute(cls.select(*criteria, slots=slots))]
+
+    @classmethod
+    def count(cls, *criteria):
+        return db.session.execute(select(func.count()).select_from(cls.entity).where(*criteria)).scalar()
+
+    @classmethod
+    def page(cls, *criteria, per_page, cursor=None, descending=False, fields=None):
+        """
+        Load one keyset page of records sorted on sort_key
+        Returns:
+            (records, cursor of the next page or None on the last page)
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        key = cls.sort_key
+        slots = cls.slots_for(fields)
+        size = len(slots or cls.__slots__)
+        statement = cls.select(*criteria, slots=slots).add_columns(
+            *[column.label(f'_key_{i}') for i, column in enumerate(key)]
+        )
+        rows = db.session.execute(keyset_page(statement, key, per_page, cursor, descending)).all()
+        rows, next_cursor = split_page(rows, per_page, lambda row: row[size:])
+        return [cls(*row[:size], slots=slots) for row in rows], next_cursor
+
+    @classmethod
+    def stream(cls, *criteria, batch_size=1000, fields=None):
+        """Yield the records of every row matching criteria, fetching batch_size rows at a time"""
+        slots = cls.slots_for(fields)
+        statement = cls.select(*criteria, slots=slots).execution_options(yield_per=batch_size)
+        for row in db.session.execute(statement):
+            yield cls(*row, slots=slots)
+
+class VehicleRecord(ReadModel):
+    __slots__ = (
+        'id', 'owner_id', 'make', 'model', 'year', 'license_plate', 'color',
+        'vehicle_type', 'seating_capacity', 'fuel_type', 'transmission',
+        'daily_rate', 'hourly_rate', 'is_available', 'is_approved', 'latitude', 'longitude'
+    )
+    entity = Vehicle
+    sort_key = (Vehicle.created_at, Vehicle.id)
+    field_slots = {
+        'type': ('vehicle_type',),
+        'rates': ('daily_rate', 'hourly_rate'),
+        'availability': ('is_available',),
+        'approved': ('is_approved',),
+        'location': ('latitude', 'longitude')
+    }
+    to_dict = Vehicle.to_dict
+
+class DetailingServiceRecord(ReadModel):
+    __slots__ = ('id', 'name', 'description', 'base_price', 'duration', 'is_active')
+    entity = DetailingService
+    to_dict = DetailingService.to_dict
+
+class BusRouteRecord(ReadModel):
+    __slots__ = ('id', 'agency_id', 'origin', 'destination', 'departure_time', 'available_seats', 'price')
+    entity = BusRoute
+    sort_key = (BusRoute.departure_time, BusRoute.id)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'agency_id': self.agency_id,
+            'origin': self.origin,
+            'destination': self.destination,
+            'departure_time': self.departure_time,
+            'available_seats': self.available_seats,
+            'price': self.price
+        }
+
+class BusSeatRecord(ReadModel):
+    __slots__ = ('id', 'seat_number', 'is_booked')
+    entity = BusSeat
+    # Seats are listed per route, where the id alone keeps them in order
+    sort_key = (BusSeat.id,)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'seat_number': self.seat_number,
+            'is_booked': self.is_booked
+        }
@@ -1,4 +1,5 @@
 from datetime import datetime
+from sqlalchemy.orm import configure_mappers, joinedload
 from main import db
 
 class Review(db.Model):
@@ -13,6 +14,23 @@ class Review(db.Model):
     comment = db.Column(db.Text)
     review_type = db.Column(db.String(20), nullable=False)  # carsharing/detailing
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Newest-first keyset pages of a user's and a vehicle's reviews
+        db.Index('ix_reviews_target_id_created_at_id', 'target_id', 'created_at', 'id'),
+        db.Index('ix_reviews_vehicle_id_created_at_id', 'vehicle_id', 'created_at', 'id'),
+    )
+
+    @classmethod
+    def load_options(cls):
+        """Loader options fetching the relationships to_dict() serializes in the same query"""
+        # reviewer, target_user and vehicle are backrefs, which only exist once mappers are configured
+        configure_mappers()
+        return (
+            joinedload(cls.reviewer, innerjoin=True),
+            joinedload(cls.target_user, innerjoin=True),
+            joinedload(cls.vehicle)
+        )
     
     def to_dict(self):
         return {
@@ -24,5 +42,5 @@ class Review(db.Model):
             'rating': self.rating,
             'comment': self.comment,
             'type': self.review_type,
-            'created_at': self.created_at.isoformat()
+            'created_at': self.created_at
         }
\ No newline at end of file
@@ -1,5 +1,7 @@
 from datetime import datetime
 from main import db
+from models.translation import load_translations
+from models.version import track_versions
 from utils.translation import translate_field, get_current_lang
 
 class DetailingService(db.Model):
@@ -20,12 +22,17 @@ class DetailingService(db.Model):
     def to_dict(self, lang=None):
         if not lang:
             lang = get_current_lang()
+        # Also used by DetailingServiceRecord, which has no __tablename__
+        translations = load_translations(DetailingService.__tablename__, lang, [self.id]).get(self.id, {})
 
         return {
             'id': self.id,
-            'name': translate_field(self.name, lang),
-            'description': translate_field(self.description, lang),
-            'base_price': float(self.base_price),
+            'name': translate_field(translations.get('name', self.name), lang),
+            'description': translate_field(translations.get('description', self.description), lang),
+            'base_price': self.base_price,
             'duration': self.duration,
             'is_active': self.is_active
-        }
\ No newline at end of file
+        }
+
+# The service catalog's snapshots and ETags follow this table's change counter
+track_versions(DetailingService)
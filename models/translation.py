@@ -0,0 +1,76 @@
+from flask import g, has_request_context
+from main import db
+from models.version import track_versions
+from utils.translation import DEFAULT_LANG
+
+class Translation(db.Model):
+    """
+    Text of one field of one row in a language other than the default.
+    The row's own column holds the default language (DEFAULT_LANG).
+    """
+    __tablename__ = 'translations'
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(50), nullable=False)  # table name of the translated row
+    entity_id = db.Column(db.Integer, nullable=False)
+    field = db.Column(db.String(50), nullable=False)
+    lang = db.Column(db.String(8), nullable=False)
+    value = db.Column(db.Text, nullable=False)
+
+    __table_args__ = (
+        # One language of many rows is read at a time
+        db.UniqueConstraint('entity', 'lang', 'entity_id', 'field', name='uq_translations_entity_lang_id_field'),
+    )
+
+def load_translations(entity, lang, ids):
+    """
+    Load the lang text of the translated fields of some rows of entity
+    Within a request, rows already looked up are answered from memory, so
+    list endpoints can load a page's translations in one query up front and
+    to_dict() finds them there.
+    Args:
+        entity: Table name of the rows
+        lang: Language code
+        ids: IDs of the rows
+    Returns:
+        {entity_id: {field: text}} for the rows that have translations
+    """
+    if lang == DEFAULT_LANG:
+        return {}
+    cache = g.setdefault('translations', {}) if has_request_context() else {}
+    found = cache.setdefault((entity, lang), {})
+    missing = [entity_id for entity_id in set(ids) if entity_id not in found]
+    if missing:
+        for entity_id in missing:
+            found[entity_id] = {}
+        rows = db.session.query(Translation.entity_id, Translation.field, Translation.value).filter(
+            Translation.entity == entity,
+            Translation.lang == lang,
+            Translation.entity_id.in_(missing)
+        )
+        for entity_id, field, value in rows:
+            found[entity_id][field] = value
+    return {entity_id: found[entity_id] for entity_id in ids if found.get(entity_id)}
+
+def store_translations(obj, **fields):
+    """
+    Set translated fields of a row from {lang: text} dicts: the default
+    language goes into the row's column, the others into translations.
+    Plain string values are simply assigned. The row is flushed if it has
+    no id yet.
+    """
+    translated = {field: value for field, value in fields.items() if isinstance(value, dict)}
+    for field, value in fields.items():
+        setattr(obj, field, value.get(DEFAULT_LANG, next(iter(value.values()))) if field in translated else value)
+    if translated and obj.id is None:
+        db.session.add(obj)
+        db.session.flush()
+    for field, value in translated.items():
+        Translation.query.filter_by(entity=obj.__tablename__, entity_id=obj.id, field=field).delete()
+        db.session.add_all([
+            Translation(entity=obj.__tablename__, entity_id=obj.id, field=field, lang=lang, value=text)
+            for lang, text in value.items() if lang != DEFAULT_LANG
+        ])
+
+# Translated catalogs are cached by the change counters of their tables and this one
+track_versions(Translation)
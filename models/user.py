@@ -1,6 +1,8 @@
 from datetime import datetime, timedelta
+from sqlalchemy import FetchedValue, event
 from main import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from utils.passwords import get_hasher
+from utils.versions import counter_statements
 import secrets
 
 class User(db.Model):
@@ -19,6 +21,10 @@ class User(db.Model):
     is_admin = db.Column(db.Boolean, default=False)
     is_driver = db.Column(db.Boolean, default=False)
     is_detailing_provider = db.Column(db.Boolean, default=False)
+    # Incremented by a database trigger whenever a role changes, invalidating
+    # the role claims of older tokens (see ROLE_COLUMNS)
+    role_version = db.Column(db.Integer, nullable=False, default=0, server_default='0',
+                             server_onupdate=FetchedValue())
     
     # Driver-specific fields
     driver_license = db.Column(db.String(50))
@@ -43,11 +49,35 @@ class User(db.Model):
     reviews_received = db.relationship('Review', foreign_keys='Review.target_id', backref='target_user', lazy=True)
     notifications = db.relationship('Notification', backref='user', lazy=True)
 
+    __table_args__ = (
+        # Serves the bounding-box prefilter of detailing provider searches
+        db.Index('ix_users_provider_location', 'is_detailing_provider', 'latitude', 'longitude'),
+    )
+
+    @property
+    def roles(self):
+        """Names of the user's roles, as issued in token claims"""
+        flags = (('admin', self.is_admin), ('driver', self.is_driver),
+                 ('detailing_provider', self.is_detailing_provider))
+        return [role for role, granted in flags if granted]
+
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = get_hasher().hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return get_hasher().verify(self.password_hash, password)
+
+    def rehash_password(self, password):
+        """
+        Rehash a just-verified password if its hash was made with other
+        parameters than the configured method
+        Returns:
+            True if the hash was replaced
+        """
+        if not get_hasher().needs_rehash(self.password_hash):
+            return False
+        self.set_password(password)
+        return True
     
     password_reset_token = db.Column(db.String(100))
     password_reset_expires = db.Column(db.DateTime)
@@ -90,4 +120,12 @@ class User(db.Model):
                 'lat': self.latitude,
                 'lng': self.longitude
             } if self.latitude and self.longitude else None
-        }
\ No newline at end of file
+        }
+
+ROLE_COLUMNS = ('is_admin', 'is_driver', 'is_detailing_provider')
+
+@event.listens_for(User.__table__, 'after_create')
+def _install_role_version_trigger(target, connection, **kw):
+    # In the database, so bulk Query.update() calls and raw SQL bump it too
+    for statement in counter_statements(target.name, 'role_version', ROLE_COLUMNS, connection.dialect.name):
+        connection.exec_driver_sql(statement)
@@ -1,5 +1,6 @@
 from datetime import datetime
 from main import db
+from models.version import track_versions
 
 class Vehicle(db.Model):
     __tablename__ = 'vehicles'
@@ -29,6 +30,13 @@ class Vehicle(db.Model):
     detailing_bookings = db.relationship('DetailingBooking', backref='vehicle', lazy=True)
     reviews = db.relationship('Review', backref='vehicle', lazy=True)
 
+    __table_args__ = (
+        # Serves the bounding-box prefilter of available vehicle searches
+        db.Index('ix_vehicles_search_location', 'is_approved', 'is_available', 'latitude', 'longitude'),
+        # Keyset pagination order of vehicle listings
+        db.Index('ix_vehicles_created_at_id', 'created_at', 'id'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -43,8 +51,8 @@ class Vehicle(db.Model):
             'fuel_type': self.fuel_type,
             'transmission': self.transmission,
             'rates': {
-                'daily': float(self.daily_rate) if self.daily_rate else None,
-                'hourly': float(self.hourly_rate) if self.hourly_rate else None
+                'daily': self.daily_rate,
+                'hourly': self.hourly_rate
             },
             'availability': self.is_available,
             'approved': self.is_approved,
@@ -78,6 +86,11 @@ class BusRoute(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     seats = db.relationship('BusSeat', backref='route', lazy=True)
 
+    __table_args__ = (
+        # Keyset pagination order of route listings
+        db.Index('ix_bus_routes_departure_time_id', 'departure_time', 'id'),
+    )
+
 class BusSeat(db.Model):
     __tablename__ = 'bus_seats'
     id = db.Column(db.Integer, primary_key=True)
@@ -85,4 +98,12 @@ class BusSeat(db.Model):
     seat_number = db.Column(db.String(10), nullable=False)
     is_booked = db.Column(db.Boolean, default=False)
     booked_by = db.Column(db.Integer, db.ForeignKey('users.id'))
-    booked_at = db.Column(db.DateTime)
\ No newline at end of file
+    booked_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        # Keyset pagination order of a route's seats
+        db.Index('ix_bus_seats_route_id_id', 'route_id', 'id'),
+    )
+
+# ETags of the catalog endpoints follow these tables' change counters
+track_versions(Vehicle, BusAgency, BusRoute)
@@ -0,0 +1,32 @@
+from sqlalchemy import event, func
+from main import db
+from utils.versions import install_version_triggers
+
+class TableVersion(db.Model):
+    """
+    Change counter of a table: the sum of the versions of its rows. Database
+    triggers add to it on every insert, update and delete, so bulk
+    Query.update() calls, raw SQL and other workers' writes all move it
+    forward. On PostgreSQL each writing statement inserts a row rather than
+    locking a shared one (see utils.versions.BUMP_FUNCTION).
+    """
+    __tablename__ = 'table_versions'
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    name = db.Column(db.String(64), nullable=False, index=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+def track_versions(*models) -> None:
+    """Keep a TableVersion for the tables of models, created along with them by db.create_all()"""
+    for model in models:
+        event.listen(model.__table__, 'after_create', install_version_triggers)
+
+def version_query(tables):
+    """Scalar subquery summing the TableVersion counters of tables"""
+    return db.session.query(func.coalesce(func.sum(TableVersion.version), 0)).filter(
+        TableVersion.name.in_(tables)
+    ).scalar_subquery()
+
+def table_version(tables) -> int:
+    """Summed change counter of tables"""
+    return db.session.query(version_query(tables)).scalar()
@@ -1,21 +1,22 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from utils.decorators import role_required
 from models.user import User
 from models.vehicle import Vehicle
-from models.booking import Booking
+from models.booking import Booking, polymorphic_bookings
+from models.read import VehicleRecord
+from utils.pagination import wants_page
+from utils.response import keyset_response
+from services.indexes import get_index, VehicleBookingIndex, ProviderBookingIndex
 from main import db
 
 admin_bp = Blueprint('admin', __name__)
 
+# Largest page of the admin booking list
+MAX_ADMIN_BOOKINGS = 200
+
 @admin_bp.route('/dashboard', methods=['GET'])
-@jwt_required()
+@role_required('admin')
 def admin_dashboard():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    if not user.is_admin:
-        return jsonify({'message': 'Unauthorized'}), 403
-    
     stats = {
         'total_users': User.query.count(),
         'total_vehicles': Vehicle.query.count(),
@@ -26,28 +27,52 @@ def admin_dashboard():
     return jsonify(stats)
 
 @admin_bp.route('/vehicles/pending', methods=['GET'])
-@jwt_required()
+@role_required('admin')
 def pending_vehicle_approvals():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    if not user.is_admin:
-        return jsonify({'message': 'Unauthorized'}), 403
-    
-    vehicles = Vehicle.query.filter_by(is_approved=False).all()
+    if wants_page(request.args):
+        return keyset_response(VehicleRecord, Vehicle.is_approved == False)
+    vehicles = VehicleRecord.all(Vehicle.is_approved == False)
     return jsonify([v.to_dict() for v in vehicles])
 
 @admin_bp.route('/vehicles/<int:vehicle_id>/approve', methods=['POST'])
-@jwt_required()
+@role_required('admin')
 def approve_vehicle(vehicle_id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    if not user.is_admin:
-        return jsonify({'message': 'Unauthorized'}), 403
-    
     vehicle = Vehicle.query.get_or_404(vehicle_id)
     vehicle.is_approved = True
     db.session.commit()
     
-    return jsonify({'message': 'Vehicle approved successfully'})
\ No newline at end of file
+    return jsonify({'message': 'Vehicle approved successfully'})
+
+@admin_bp.route('/bookings', methods=['GET'])
+@role_required('admin')
+def list_bookings():
+    try:
+        limit = min(int(request.args.get('limit', 50)), MAX_ADMIN_BOOKINGS)
+    except ValueError:
+        return jsonify({'message': 'Invalid limit'}), 400
+    
+    query = polymorphic_bookings()
+    if request.args.get('status'):
+        query = query.filter(Booking.status == request.args['status'])
+    if request.args.get('service_type'):
+        query = query.filter(Booking.service_type == request.args['service_type'])
+    if request.args.get('user_id'):
+        query = query.filter(Booking.user_id == request.args.get('user_id', type=int))
+    
+    bookings = query.order_by(Booking.start_time.desc()).limit(limit).all()
+    return jsonify([b.to_dict() for b in bookings])
+
+@admin_bp.route('/booking-index/check', methods=['GET'])
+@role_required('admin')
+def check_booking_index():
+    rebuild = request.args.get('rebuild', 'false').lower() == 'true'
+    report = {}
+    for index_class in (VehicleBookingIndex, ProviderBookingIndex):
+        index = get_index(index_class)
+        result = index.verify()
+        if rebuild and (result['missing'] or result['unexpected'] or result['mismatched']):
+            index.refresh()
+            result['rebuilt'] = True
+        report[index_class.name] = result
+    
+    return jsonify(report)
@@ -64,6 +64,10 @@ def login():
     if not user or not user.check_password(data['password']):
         return jsonify({'message': 'Invalid credentials'}), 401
     
+    # Hashes made with older parameters are upgraded while the password is known
+    if user.rehash_password(data['password']):
+        db.session.commit()
+    
     access_token = create_access_token(identity=str(user.id))
     refresh_token = create_refresh_token(identity=str(user.id))
     
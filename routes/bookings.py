@@ -1,7 +1,9 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models.booking import Booking, CarsharingBooking, DetailingBooking
+from models.booking import Booking, CarsharingBooking, DetailingBooking, polymorphic_bookings
 from models.user import User
+from services.carsharing import is_vehicle_free
+from utils.fields import FieldSelection
 from main import db
 from decimal import Decimal
 
@@ -12,19 +14,27 @@ bookings_bp = Blueprint('bookings', __name__)
 def get_upcoming_bookings():
     user_id = get_jwt_identity()
     
-    carsharing = CarsharingBooking.query.filter(
+    # ?include= and ?fields= choose the relationships that are embedded;
+    # the others are neither joined nor serialized beyond their ids
+    selection = FieldSelection.from_args(request.args)
+    carsharing_include = selection.embedded(CarsharingBooking.embedded) if selection else None
+    detailing_include = selection.embedded(DetailingBooking.embedded) if selection else None
+    
+    # Each query also loads everything to_dict() serializes, so the response
+    # takes two queries however many bookings there are
+    carsharing = CarsharingBooking.query.options(*CarsharingBooking.load_options(carsharing_include)).filter(
         CarsharingBooking.user_id == user_id,
         CarsharingBooking.status.in_(['confirmed', 'pending'])
     ).all()
     
-    detailing = DetailingBooking.query.filter(
+    detailing = DetailingBooking.query.options(*DetailingBooking.load_options(detailing_include)).filter(
         DetailingBooking.user_id == user_id,
         DetailingBooking.status.in_(['confirmed', 'pending'])
     ).all()
     
     return jsonify({
-        'carsharing': [b.to_dict() for b in carsharing],
-        'detailing': [b.to_dict() for b in detailing]
+        'carsharing': [selection.apply(b.to_dict(carsharing_include)) for b in carsharing],
+        'detailing': [selection.apply(b.to_dict(detailing_include)) for b in detailing]
     })
 
 @bookings_bp.route('/history', methods=['GET'])
@@ -32,7 +42,8 @@ def get_upcoming_bookings():
 def get_booking_history():
     user_id = get_jwt_identity()
     
-    bookings = Booking.query.filter(
+    # Every booking type comes back from one query with its own columns
+    bookings = polymorphic_bookings().filter(
         Booking.user_id == user_id,
         Booking.status.in_(['completed', 'canceled'])
     ).order_by(Booking.start_time.desc()).limit(20).all()
@@ -56,12 +67,23 @@ def create_carsharing_booking():
     except ValueError:
         return jsonify({'message': 'Invalid date format'}), 400
     
+    if end_time:
+        from datetime import timedelta
+        max_days = current_app.config['MAX_BOOKING_DAYS']
+        if end_time <= start_time:
+            return jsonify({'message': 'A booking must start before it ends'}), 400
+        if end_time - start_time > timedelta(days=max_days):
+            return jsonify({'message': f'Bookings last at most {max_days} days'}), 400
+    
     # Get vehicle to find the driver
     from models.vehicle import Vehicle
     vehicle = Vehicle.query.get(data['vehicle_id'])
     if not vehicle:
         return jsonify({'message': 'Vehicle not found'}), 404
     
+    if end_time and not is_vehicle_free(vehicle.id, start_time, end_time):
+        return jsonify({'message': 'Vehicle is already booked for this time'}), 409
+    
     # Calculate total price (simplified calculation)
     total_price = Decimal('0.0')
     if end_time:
@@ -1,13 +1,31 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.vehicle import Vehicle
 from models.booking import CarsharingBooking
-from services.carsharing import find_available_vehicles, calculate_booking_price
+from services.carsharing import (
+    find_available_vehicles, find_available_vehicles_batch, find_nearest_vehicles, calculate_booking_price
+)
+from utils.cursors import encode_cursor, decode_cursor
 from main import db
-from datetime import datetime
+from datetime import datetime, timedelta
 
 carsharing_bp = Blueprint('carsharing', __name__)
 
+# Upper bounds on a single batch availability request
+MAX_BATCH_WINDOWS = 50
+MAX_BATCH_LOCATIONS = 10
+# Largest page of a nearest-vehicle search
+MAX_NEAREST_K = 100
+
+def window_error(start_time, end_time):
+    """Return the message rejecting a search window, or None if it is valid"""
+    max_days = current_app.config['MAX_SEARCH_WINDOW_DAYS']
+    if start_time >= end_time:
+        return 'Each window must start before it ends'
+    if end_time - start_time > timedelta(days=max_days):
+        return f'Search windows last at most {max_days} days'
+    return None
+
 @carsharing_bp.route('/available', methods=['GET'])
 def get_available_vehicles():
     try:
@@ -15,11 +33,70 @@ def get_available_vehicles():
         end_time = datetime.fromisoformat(request.args.get('end_time'))
         lat = float(request.args.get('lat'))
         lng = float(request.args.get('lng'))
+        radius_km = float(request.args.get('radius_km', 10))
+    except (ValueError, TypeError):
+        return jsonify({'message': 'Invalid parameters'}), 400
+    error = window_error(start_time, end_time)
+    if error:
+        return jsonify({'message': error}), 400
+    
+    if 'k' not in request.args:
+        vehicles = find_available_vehicles(start_time, end_time, (lat, lng), radius_km)
+        return jsonify([v.to_dict() for v in vehicles])
+    
+    # Nearest-first mode: one page of k vehicles plus a cursor for the next one
+    try:
+        k = int(request.args['k'])
+        cursor = request.args.get('cursor')
+        after = None
+        if cursor:
+            distance, vehicle_id = decode_cursor(cursor, 2)
+            after = (float(distance), int(vehicle_id))
     except (ValueError, TypeError):
         return jsonify({'message': 'Invalid parameters'}), 400
+    if not 1 <= k <= MAX_NEAREST_K:
+        return jsonify({'message': f'k must be between 1 and {MAX_NEAREST_K}'}), 400
+    
+    found, next_key = find_nearest_vehicles(start_time, end_time, (lat, lng), k, radius_km, after)
+    return jsonify({
+        'vehicles': [dict(v.to_dict(), distance_km=distance) for v, distance in found],
+        'next_cursor': encode_cursor(next_key) if next_key else None
+    })
+
+@carsharing_bp.route('/available/batch', methods=['POST'])
+def get_available_vehicles_batch():
+    data = request.get_json() or {}
+    try:
+        windows = [
+            (datetime.fromisoformat(w['start_time']), datetime.fromisoformat(w['end_time']))
+            for w in data['windows']
+        ]
+        raw_locations = data.get('locations') or [{'lat': data['lat'], 'lng': data['lng']}]
+        locations = [(float(loc['lat']), float(loc['lng'])) for loc in raw_locations]
+        radius_km = float(data.get('radius_km', 10))
+    except (KeyError, ValueError, TypeError):
+        return jsonify({'message': 'Invalid parameters'}), 400
+    
+    if not windows or len(windows) > MAX_BATCH_WINDOWS or len(locations) > MAX_BATCH_LOCATIONS:
+        return jsonify({
+            'message': f'Between 1 and {MAX_BATCH_WINDOWS} windows and at most '
+                       f'{MAX_BATCH_LOCATIONS} locations are allowed'
+        }), 400
+    error = next(filter(None, (window_error(start_time, end_time) for start_time, end_time in windows)), None)
+    if error:
+        return jsonify({'message': error}), 400
     
-    vehicles = find_available_vehicles(start_time, end_time, (lat, lng))
-    return jsonify([v.to_dict() for v in vehicles])
+    vehicles, results = find_available_vehicles_batch(windows, locations, radius_km)
+    return jsonify({
+        'vehicles': [v.to_dict() for v in vehicles.values()],
+        'results': [{
+            'location': {'lat': location[0], 'lng': location[1]},
+            'start_time': start_time.isoformat(),
+            'end_time': end_time.isoformat(),
+            'vehicles': [{'id': vehicle_id, 'distance_km': distance} for vehicle_id, distance in found]
+        } for location, by_window in zip(locations, results)
+          for (start_time, end_time), found in zip(windows, by_window)]
+    })
 
 @carsharing_bp.route('/calculate-price', methods=['GET'])
 def calculate_price():
@@ -1,17 +1,23 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.service import DetailingService
 from models.booking import DetailingBooking
+from models.translation import Translation
+from services.catalog import get_catalog
 from services.detailing import find_available_providers, create_detailing_booking
+from utils.decorators import etag
+from utils.translation import get_current_lang
 from main import db
 from datetime import datetime
 
 detailing_bp = Blueprint('detailing', __name__)
 
 @detailing_bp.route('/services', methods=['GET'])
+@etag(DetailingService, depends_on=(Translation,))
 def get_services():
-    services = DetailingService.query.filter_by(is_active=True).all()
-    return jsonify([s.to_dict() for s in services])
+    # Served from a per-language snapshot of the serialized catalog
+    body = get_catalog().snapshot(get_current_lang())
+    return current_app.response_class(body, mimetype='application/json')
 
 @detailing_bp.route('/available', methods=['GET'])
 def get_available_providers():
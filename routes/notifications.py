@@ -1,6 +1,10 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.notification import Notification
+from models.translation import load_translations
+from utils.pagination import page_args, keyset_page, split_page, wants_page
+from utils.response import paginated_response
+from utils.translation import get_current_lang
 from main import db
 
 notifications_bp = Blueprint('notifications', __name__)
@@ -9,6 +13,8 @@ notifications_bp = Blueprint('notifications', __name__)
 @jwt_required()
 def get_notifications():
     user_id = get_jwt_identity()
+    if wants_page(request.args):
+        return get_notifications_page(user_id)
     limit = request.args.get('limit', default=10, type=int)
     
     notifications = Notification.query.filter_by(
@@ -17,8 +23,27 @@ def get_notifications():
         Notification.created_at.desc()
     ).limit(limit).all()
     
+    # One query fetches the translations of every notification in the list
+    load_translations(Notification.__tablename__, get_current_lang(), [n.id for n in notifications])
     return jsonify([n.to_dict() for n in notifications])
 
+def get_notifications_page(user_id):
+    """Newest-first keyset page of a user's notifications"""
+    key = (Notification.created_at, Notification.id)
+    try:
+        per_page, cursor = page_args(request.args)
+        query = keyset_page(Notification.query.filter_by(user_id=user_id), key, per_page, cursor, descending=True)
+    except ValueError:
+        return jsonify({'message': 'Invalid pagination parameters'}), 400
+    
+    notifications, next_cursor = split_page(query.all(), per_page, lambda n: (n.created_at, n.id))
+    load_translations(Notification.__tablename__, get_current_lang(), [n.id for n in notifications])
+    total = None
+    if request.args.get('total', 'false').lower() == 'true':
+        total = Notification.query.filter_by(user_id=user_id).count()
+    return paginated_response([n.to_dict() for n in notifications], per_page=per_page,
+                              total=total, next_cursor=next_cursor)
+
 @notifications_bp.route('/mark-read', methods=['POST'])
 @jwt_required()
 def mark_notifications_read():
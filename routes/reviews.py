@@ -3,6 +3,8 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.review import Review
 from models.booking import Booking
 from models.user import User
+from utils.pagination import page_args, keyset_page, split_page
+from utils.response import paginated_response
 from main import db
 
 reviews_bp = Blueprint('reviews', __name__)
@@ -41,6 +43,35 @@ def create_review():
     
     return jsonify(review.to_dict()), 201
 
+@reviews_bp.route('/users/<int:user_id>', methods=['GET'])
+def get_user_reviews(user_id):
+    return get_reviews_page(Review.target_id == user_id)
+
+@reviews_bp.route('/vehicles/<int:vehicle_id>', methods=['GET'])
+def get_vehicle_reviews(vehicle_id):
+    return get_reviews_page(Review.vehicle_id == vehicle_id)
+
+def get_reviews_page(*criteria):
+    """
+    Newest-first keyset page of the reviews matching criteria. Reviewers,
+    target users and vehicles are joined into the page query, so a page
+    takes one query however many reviews it holds.
+    """
+    key = (Review.created_at, Review.id)
+    try:
+        per_page, cursor = page_args(request.args)
+        query = keyset_page(Review.query.options(*Review.load_options()).filter(*criteria),
+                            key, per_page, cursor, descending=True)
+    except ValueError:
+        return jsonify({'message': 'Invalid pagination parameters'}), 400
+    
+    reviews, next_cursor = split_page(query.all(), per_page, lambda r: (r.created_at, r.id))
+    total = None
+    if request.args.get('total', 'false').lower() == 'true':
+        total = Review.query.filter(*criteria).count()
+    return paginated_response([r.to_dict() for r in reviews], per_page=per_page,
+                              total=total, next_cursor=next_cursor)
+
 def update_user_ratings(user_id, review_type):
     """Update user's average rating"""
     reviews = Review.query.filter_by(
@@ -2,11 +2,22 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.vehicle import Vehicle, BusAgency, BusRoute, BusSeat
 from models.booking import BusSeatBooking
+from models.read import VehicleRecord, BusRouteRecord, BusSeatRecord
+from utils.decorators import etag
+from utils.fields import FieldSelection
+from utils.pagination import wants_page
+from utils.response import keyset_response, streamed_json_array
+from services.indexes import vehicle_calendar
+from utils.timeslots import SLOT_MINUTES, busy_ranges
 from main import db
-from datetime import datetime
+from datetime import date, datetime, timedelta
 
 vehicles_bp = Blueprint('vehicles', __name__)
 
+def wants_stream():
+    """Check if the client asked for a streamed list with ?stream=true"""
+    return request.args.get('stream', 'false').lower() == 'true'
+
 @vehicles_bp.route('/', methods=['POST'])
 @jwt_required()
 def add_vehicle():
@@ -38,23 +49,66 @@ def add_vehicle():
     return jsonify(vehicle.to_dict()), 201
 
 @vehicles_bp.route('/', methods=['GET'])
+@etag(Vehicle)
 def get_vehicles():
-    vehicles = Vehicle.query.filter_by(is_available=True, is_approved=True).all()
-    return jsonify([v.to_dict() for v in vehicles])
+    criteria = (Vehicle.is_available == True, Vehicle.is_approved == True)
+    if wants_page(request.args):
+        return keyset_response(VehicleRecord, *criteria)
+    # ?fields= narrows both the selected columns and the serialized keys
+    selection = FieldSelection.from_args(request.args)
+    if wants_stream():
+        return streamed_json_array(VehicleRecord.stream(*criteria, fields=selection.fields),
+                                   lambda v: selection.apply(v.to_dict()))
+    vehicles = VehicleRecord.all(*criteria, fields=selection.fields)
+    return jsonify([selection.apply(v.to_dict()) for v in vehicles])
 
 @vehicles_bp.route('/<int:vehicle_id>', methods=['GET'])
+@etag(Vehicle, lambda vehicle_id: [Vehicle.id == vehicle_id])
 def get_vehicle(vehicle_id):
     vehicle = Vehicle.query.get_or_404(vehicle_id)
     return jsonify(vehicle.to_dict())
 
+@vehicles_bp.route('/<int:vehicle_id>/calendar', methods=['GET'])
+def get_vehicle_calendar(vehicle_id):
+    Vehicle.query.get_or_404(vehicle_id)
+    try:
+        first_day = date.fromisoformat(request.args.get('date', datetime.utcnow().date().isoformat()))
+        days = min(max(request.args.get('days', default=1, type=int), 1), 31)
+        # The window must end before datetime.max
+        first_day + timedelta(days=days)
+    except (ValueError, OverflowError):
+        return jsonify({'message': 'Invalid date format'}), 400
+    
+    calendar = vehicle_calendar(vehicle_id, first_day, days)
+    result = []
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        bitmap = calendar.day_bitmap(vehicle_id, day)
+        result.append({
+            'date': day.isoformat(),
+            'bitmap': bitmap.hex(),
+            'busy': [{'start': start.isoformat(), 'end': end.isoformat()}
+                     for start, end in busy_ranges(day, bitmap)]
+        })
+    
+    return jsonify({
+        'vehicle_id': vehicle_id,
+        'slot_minutes': SLOT_MINUTES,
+        'days': result
+    })
+
 @vehicles_bp.route('/mine', methods=['GET'])
 @jwt_required()
 def get_my_vehicles():
     user_id = get_jwt_identity()
-    vehicles = Vehicle.query.filter_by(owner_id=user_id).all()
-    return jsonify([v.to_dict() for v in vehicles])
+    if wants_page(request.args):
+        return keyset_response(VehicleRecord, Vehicle.owner_id == user_id)
+    selection = FieldSelection.from_args(request.args)
+    vehicles = VehicleRecord.all(Vehicle.owner_id == user_id, fields=selection.fields)
+    return jsonify([selection.apply(v.to_dict()) for v in vehicles])
 
 @vehicles_bp.route('/bus/agencies', methods=['GET'])
+@etag(BusAgency)
 def get_bus_agencies():
     agencies = BusAgency.query.filter_by(approved=True).all()
     return jsonify([{
@@ -77,17 +131,14 @@ def register_bus_agency():
     return jsonify({'message': 'Bus agency registered, pending approval.'}), 201
 
 @vehicles_bp.route('/bus/routes', methods=['GET'])
+@etag(BusRoute)
 def get_bus_routes():
-    routes = BusRoute.query.all()
-    return jsonify([{
-        'id': r.id,
-        'agency_id': r.agency_id,
-        'origin': r.origin,
-        'destination': r.destination,
-        'departure_time': r.departure_time.isoformat(),
-        'available_seats': r.available_seats,
-        'price': float(r.price)
-    } for r in routes])
+    if wants_page(request.args):
+        return keyset_response(BusRouteRecord)
+    if wants_stream():
+        return streamed_json_array(BusRouteRecord.stream())
+    routes = BusRouteRecord.all()
+    return jsonify([r.to_dict() for r in routes])
 
 @vehicles_bp.route('/bus/routes', methods=['POST'])
 @jwt_required()
@@ -117,12 +168,12 @@ def get_bus_seats():
     route_id = request.args.get('route_id')
     if not route_id:
         return jsonify({'message': 'Missing route_id'}), 400
-    seats = BusSeat.query.filter_by(route_id=route_id).all()
-    return jsonify([{
-        'id': s.id,
-        'seat_number': s.seat_number,
-        'is_booked': s.is_booked
-    } for s in seats])
+    if wants_page(request.args):
+        return keyset_response(BusSeatRecord, BusSeat.route_id == route_id)
+    if wants_stream():
+        return streamed_json_array(BusSeatRecord.stream(BusSeat.route_id == route_id))
+    seats = BusSeatRecord.all(BusSeat.route_id == route_id)
+    return jsonify([s.to_dict() for s in seats])
 
 @vehicles_bp.route('/bus/seats/book', methods=['POST'])
 @jwt_required()
@@ -2,6 +2,8 @@
 from .auth import AuthService
 from .carsharing import (
     find_available_vehicles,
+    find_available_vehicles_batch,
+    find_nearest_vehicles,
     calculate_booking_price,
     create_carsharing_booking
 )
@@ -23,6 +25,8 @@ from .notification import (
 # Group related services for cleaner imports
 class CarsharingService:
     find_available = find_available_vehicles
+    find_available_batch = find_available_vehicles_batch
+    find_nearest = find_nearest_vehicles
     calculate_price = calculate_booking_price
     create_booking = create_carsharing_booking
 
@@ -52,6 +56,8 @@ __all__ = [
     
     # Individual functions
     'find_available_vehicles',
+    'find_available_vehicles_batch',
+    'find_nearest_vehicles',
     'calculate_booking_price',
     'create_carsharing_booking',
     'find_available_providers',
@@ -1,6 +1,5 @@
 import secrets
 from datetime import datetime, timedelta
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token, create_refresh_token
 from models.user import User
 from main import db
@@ -39,7 +38,7 @@ class AuthService:
         """Authenticate a user and return tokens"""
         user = User.query.filter_by(email=email).first()
         
-        if not user or not check_password_hash(user.password_hash, password):
+        if not user or not user.check_password(password):
             return error_response("Invalid credentials", 401)
         
         return {
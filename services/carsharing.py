@@ -1,7 +1,11 @@
+import heapq
 from datetime import datetime, timedelta
+from flask import current_app
 from models.vehicle import Vehicle
-from models.booking import CarsharingBooking
-from utils.geoutils import calculate_distance
+from models.booking import CarsharingBooking, CARSHARING_ACTIVE_STATUSES
+from services.geo import geo_backend, VEHICLES
+from services.indexes import get_index, VehicleBookingIndex, VehicleCalendarIndex
+from utils.geoutils import radius_filter
 from main import db
 
 def find_available_vehicles(start_time, end_time, location, radius_km=10):
@@ -15,37 +19,184 @@ def find_available_vehicles(start_time, end_time, location, radius_km=10):
     Returns:
         List of available Vehicle objects
     """
-    # Get all approved and available vehicles
-    vehicles = Vehicle.query.filter(
+    criteria = []
+    if not current_app.config['BOOKING_INDEX_ENABLED']:
+        # Conflicts for every candidate are resolved by the same query (NOT EXISTS)
+        criteria.append(~has_conflicting_booking(start_time, end_time))
+
+    vehicles, distances = _nearby_vehicles([location], radius_km, *criteria)
+    vehicles = [v for v in vehicles if v.id in distances[0]]
+
+    if current_app.config['BOOKING_INDEX_ENABLED']:
+        busy = _busy_vehicle_ids([v.id for v in vehicles], start_time, end_time)
+        vehicles = [v for v in vehicles if v.id not in busy]
+    return vehicles
+
+def find_available_vehicles_batch(windows, locations, radius_km=10):
+    """
+    Find available vehicles for several time windows and search locations at once.
+    Candidate vehicles, their distances and the bookings that could conflict
+    are fetched once for the whole batch rather than once per window.
+    Args:
+        windows: List of (start_time, end_time) tuples
+        locations: List of (latitude, longitude) tuples
+        radius_km: Search radius in kilometers
+    Returns:
+        Tuple of (vehicles, results): vehicles maps vehicle id to Vehicle for
+        every vehicle in any result; results[i][j] is the list of
+        (vehicle_id, distance_km) available at locations[i] during windows[j]
+    """
+    vehicles, distances = _nearby_vehicles(locations, radius_km)
+    vehicle_ids = [v.id for v in vehicles]
+
+    if current_app.config['BOOKING_INDEX_ENABLED']:
+        busy_by_window = [_busy_vehicle_ids(vehicle_ids, start, end) for start, end in windows]
+    else:
+        # One query fetches every active booking that overlaps any window
+        bookings = db.session.query(
+            CarsharingBooking.vehicle_id, CarsharingBooking.start_time, CarsharingBooking.end_time
+        ).filter(
+            CarsharingBooking.vehicle_id.in_(vehicle_ids),
+            CarsharingBooking.status.in_(CARSHARING_ACTIVE_STATUSES),
+            CarsharingBooking.start_time < max(end for _, end in windows),
+            CarsharingBooking.end_time > min(start for start, _ in windows)
+        ).all() if vehicle_ids else []
+        busy_by_window = [{vehicle_id for vehicle_id, booked_start, booked_end in bookings
+                           if booked_start < end and booked_end > start}
+                          for start, end in windows]
+
+    results = [[[(v.id, location_distances[v.id]) for v in vehicles
+                 if v.id in location_distances and v.id not in busy]
+                for busy in busy_by_window]
+               for location_distances in distances]
+    used = {vehicle_id for by_window in results for found in by_window for vehicle_id, _ in found}
+    return {v.id: v for v in vehicles if v.id in used}, results
+
+def find_nearest_vehicles(start_time, end_time, location, k=20, radius_km=10, after=None):
+    """
+    Find the k closest available vehicles, nearest first
+    Candidates are kept in a heap keyed by (distance, id) and popped a page at
+    a time, so only the vehicles that end up on the page (plus any busy ones
+    passed over) are loaded and checked for conflicts.
+    Args:
+        start_time: Booking start datetime
+        end_time: Booking end datetime
+        location: Tuple of (latitude, longitude)
+        k: Number of vehicles to return
+        radius_km: Search radius in kilometers
+        after: Optional (distance_km, vehicle_id) of the last vehicle of the
+            previous page; only vehicles ranked after it are returned
+    Returns:
+        Tuple of (list of (Vehicle, distance_km), next_key) where next_key is
+        the (distance_km, vehicle_id) to pass as `after` for the next page, or
+        None if there are no more vehicles
+    """
+    heap = [(distance, vehicle_id) for vehicle_id, distance in _vehicle_distances(location, radius_km).items()]
+    if after is not None:
+        after = tuple(after)
+        heap = [key for key in heap if key > after]
+    heapq.heapify(heap)
+
+    # One extra vehicle tells whether there is a next page
+    found = []
+    while heap and len(found) <= k:
+        keys = [heapq.heappop(heap) for _ in range(min(k + 1 - len(found), len(heap)))]
+        available = _available_vehicles([vehicle_id for _, vehicle_id in keys], start_time, end_time)
+        found.extend((available[vehicle_id], distance) for distance, vehicle_id in keys if vehicle_id in available)
+
+    page = found[:k]
+    next_key = (page[-1][1], page[-1][0].id) if len(found) > k else None
+    return page, next_key
+
+def _vehicle_distances(location, radius_km):
+    """Return {vehicle_id: distance_km} for located vehicles within radius_km"""
+    # Approval and availability are checked when the vehicles are loaded
+    return geo_backend().distances(VEHICLES, location, radius_km)
+
+def _available_vehicles(vehicle_ids, start_time, end_time):
+    """Load the approved, available vehicles among vehicle_ids that are free during the window"""
+    query = Vehicle.query.filter(
+        Vehicle.id.in_(vehicle_ids),
         Vehicle.is_approved == True,
         Vehicle.is_available == True
-    ).all()
+    )
+    if not current_app.config['BOOKING_INDEX_ENABLED']:
+        return {v.id: v for v in query.filter(~has_conflicting_booking(start_time, end_time))}
 
-    available_vehicles = []
-    
-    for vehicle in vehicles:
-        # Skip vehicles without location data
-        if not vehicle.latitude or not vehicle.longitude:
-            continue
-            
-        # Check if vehicle is within search radius
-        vehicle_location = (vehicle.latitude, vehicle.longitude)
-        distance = calculate_distance(location, vehicle_location)
-        if distance > radius_km:
-            continue
-            
-        # Check for booking conflicts
-        has_conflict = CarsharingBooking.query.filter(
-            CarsharingBooking.vehicle_id == vehicle.id,
-            CarsharingBooking.status.in_(['confirmed', 'pending']),
-            CarsharingBooking.start_time < end_time,
-            CarsharingBooking.end_time > start_time
-        ).first()
-        
-        if not has_conflict:
-            available_vehicles.append(vehicle)
-    
-    return available_vehicles
+    vehicles = {v.id: v for v in query}
+    busy = _busy_vehicle_ids(list(vehicles), start_time, end_time)
+    return {vehicle_id: v for vehicle_id, v in vehicles.items() if vehicle_id not in busy}
+
+def _nearby_vehicles(locations, radius_km, *criteria):
+    """
+    Load the approved, available vehicles within radius_km of any location
+    Args:
+        locations: List of (latitude, longitude) tuples
+        radius_km: Search radius in kilometers
+        criteria: Extra filters for the vehicle query
+    Returns:
+        Tuple of (vehicles ordered by id, list of {vehicle_id: distance_km} per location)
+    """
+    query = Vehicle.query.filter(
+        Vehicle.is_approved == True,
+        Vehicle.is_available == True,
+        *criteria
+    )
+    # The geo backend narrows the query down to vehicles near the locations
+    vehicles = query.filter(
+        geo_backend().within(VEHICLES, locations, radius_km)
+    ).order_by(Vehicle.id).all()
+    vehicles = [v for v in vehicles if v.latitude and v.longitude]
+    lats = [v.latitude for v in vehicles]
+    lngs = [v.longitude for v in vehicles]
+    distances = []
+    for location in locations:
+        indices, found = radius_filter(location, lats, lngs, radius_km)
+        distances.append({vehicles[i].id: d for i, d in zip(indices.tolist(), found.tolist())})
+    return vehicles, distances
+
+def _busy_vehicle_ids(vehicle_ids, start_time, end_time):
+    """Return the vehicles among vehicle_ids with an active booking overlapping the window"""
+    # Slot bitmaps clear most vehicles at once; the rest get an exact interval check
+    maybe_busy = get_index(VehicleCalendarIndex).maybe_busy(vehicle_ids, start_time, end_time)
+    return get_index(VehicleBookingIndex).busy_keys(maybe_busy, start_time, end_time)
+
+def is_vehicle_free(vehicle_id, start_time, end_time):
+    """
+    Check that no active booking of a vehicle overlaps a window
+    Meant to be called in the transaction that inserts the booking: the
+    vehicle row is locked first (SELECT ... FOR UPDATE), so concurrent
+    bookings of the same vehicle are checked one after the other, and the
+    check always runs in SQL since the in-memory booking indexes only see
+    this worker's commits.
+    Args:
+        vehicle_id: ID of the vehicle
+        start_time: Window start datetime
+        end_time: Window end datetime
+    Returns:
+        True if the window is free
+    """
+    db.session.query(Vehicle.id).filter(Vehicle.id == vehicle_id).with_for_update().first()
+    return db.session.query(Vehicle.id).filter(
+        Vehicle.id == vehicle_id,
+        has_conflicting_booking(start_time, end_time)
+    ).first() is None
+
+def has_conflicting_booking(start_time, end_time):
+    """
+    Correlated EXISTS clause matching vehicles with an active booking overlapping a window
+    Args:
+        start_time: Window start datetime
+        end_time: Window end datetime
+    Returns:
+        SQL expression to use in a Vehicle query filter
+    """
+    return db.session.query(CarsharingBooking.id).filter(
+        CarsharingBooking.vehicle_id == Vehicle.id,
+        CarsharingBooking.status.in_(CARSHARING_ACTIVE_STATUSES),
+        CarsharingBooking.start_time < end_time,
+        CarsharingBooking.end_time > start_time
+    ).exists()
 
 def calculate_booking_price(vehicle, start_time, end_time):
     """
@@ -83,6 +234,8 @@ def create_carsharing_booking(user_id, vehicle_id, start_time, end_time, pickup_
     vehicle = Vehicle.query.get(vehicle_id)
     if not vehicle or not vehicle.is_available:
         raise ValueError("Vehicle not available")
+    if not is_vehicle_free(vehicle_id, start_time, end_time):
+        raise ValueError("Vehicle is already booked for this time")
     
     price = calculate_booking_price(vehicle, start_time, end_time)
     
@@ -0,0 +1,56 @@
+import threading
+from flask import current_app
+from models.service import DetailingService
+from models.read import DetailingServiceRecord
+from models.translation import Translation, load_translations
+from models.version import table_version
+
+# Languages with a snapshot at a time; others are serialized per request
+MAX_CATALOG_LANGUAGES = 32
+
+
+class ServiceCatalog:
+    """
+    Serialized snapshots of the active detailing services, one per language.
+    A snapshot is built on the first request in that language and kept with
+    the change counters (TableVersion) of the services and translations
+    tables it was built at. Any worker's commit, bulk and raw SQL writes
+    included, moves the counters and so replaces the snapshot on the next
+    request. They are the counters the endpoint's @etag decorator reads, so
+    the body and its ETag always change together.
+    """
+    tables = (DetailingService.__tablename__, Translation.__tablename__)
+
+    def __init__(self, app):
+        self.app = app
+        self.lock = threading.Lock()
+        self.snapshots = {}
+
+    def snapshot(self, lang):
+        """
+        Return the serialized catalog in lang
+        Args:
+            lang: Language code of the translated names and descriptions
+        """
+        # Read before the rows, so a snapshot is never older than its version
+        version = table_version(self.tables)
+        found = self.snapshots.get(lang)
+        if found is not None and found[0] == version:
+            return found[1]
+
+        services = DetailingServiceRecord.all(DetailingService.is_active == True)
+        load_translations(DetailingService.__tablename__, lang, [s.id for s in services])
+        body = (self.app.json.dumps([s.to_dict(lang) for s in services]) + '\n').encode()
+        with self.lock:
+            if lang in self.snapshots or len(self.snapshots) < MAX_CATALOG_LANGUAGES:
+                self.snapshots[lang] = (version, body)
+        return body
+
+
+def get_catalog() -> ServiceCatalog:
+    """Return the current app's service catalog"""
+    app = current_app._get_current_object()
+    catalog = app.extensions.get('service_catalog')
+    if catalog is None:
+        catalog = app.extensions.setdefault('service_catalog', ServiceCatalog(app))
+    return catalog
@@ -1,8 +1,11 @@
 from datetime import datetime, timedelta
+from flask import current_app
 from models.user import User
-from models.booking import DetailingBooking
+from models.booking import DetailingBooking, DETAILING_ACTIVE_STATUSES
 from models.service import DetailingService
-from utils.geoutils import calculate_distance
+from services.geo import geo_backend, PROVIDERS
+from services.indexes import get_index, ProviderBookingIndex
+from utils.geoutils import radius_filter
 from main import db
 
 def find_available_providers(service_id, start_time, location, radius_km=15):
@@ -22,39 +25,71 @@ def find_available_providers(service_id, start_time, location, radius_km=15):
     
     end_time = start_time + timedelta(minutes=service.duration)
     
-    providers = User.query.filter(
-        User.is_detailing_provider == True
-    ).all()
+    # The geo backend narrows the query down to providers that may cover the customer
+    query = User.query.filter(
+        User.is_detailing_provider == True,
+        geo_backend().covering(PROVIDERS, location)
+    )
+    if not current_app.config['BOOKING_INDEX_ENABLED']:
+        # Conflicts for every provider are resolved by the same query (NOT EXISTS)
+        query = query.filter(~has_conflicting_booking(start_time, end_time))
+    nearby = query.order_by(User.id).all()
     
-    available_providers = []
+    # Each provider covers the customer if the distance is within their own radius
+    nearby = [p for p in nearby if p.latitude and p.longitude and p.service_radius_km is not None]
+    indices, _ = radius_filter(
+        location,
+        [p.latitude for p in nearby],
+        [p.longitude for p in nearby],
+        [p.service_radius_km for p in nearby]
+    )
+    nearby = [nearby[i] for i in indices.tolist()]
     
-    for provider in providers:
-        # Skip providers without location data
-        if not provider.latitude or not provider.longitude:
-            continue
-            
-        # Check if provider is within service radius
-        provider_location = (provider.latitude, provider.longitude)
-        distance = calculate_distance(location, provider_location)
-        if distance > provider.service_radius_km:
-            continue
-            
-        # Check for booking conflicts
-        has_conflict = DetailingBooking.query.filter(
-            DetailingBooking.provider_id == provider.id,
-            DetailingBooking.status.in_(['confirmed', 'in_progress']),
-            DetailingBooking.start_time < end_time,
-            DetailingBooking.end_time > start_time
-        ).first()
-        
-        if not has_conflict:
-            available_providers.append({
-                'provider': provider,
-                'service': service,
-                'estimated_price': service.base_price
-            })
+    if current_app.config['BOOKING_INDEX_ENABLED']:
+        # Booked windows are checked in memory
+        busy = get_index(ProviderBookingIndex).busy_keys([p.id for p in nearby], start_time, end_time)
+        nearby = [p for p in nearby if p.id not in busy]
     
-    return available_providers
+    return [{
+        'provider': provider,
+        'service': service,
+        'estimated_price': service.base_price
+    } for provider in nearby]
+
+def is_provider_free(provider_id, start_time, end_time):
+    """
+    Check that no active booking of a provider overlaps a window
+    Meant to be called in the transaction that inserts the booking: the
+    provider row is locked first (SELECT ... FOR UPDATE) and the check always
+    runs in SQL, as in is_vehicle_free.
+    Args:
+        provider_id: ID of the detailing provider
+        start_time: Window start datetime
+        end_time: Window end datetime
+    Returns:
+        True if the window is free
+    """
+    db.session.query(User.id).filter(User.id == provider_id).with_for_update().first()
+    return db.session.query(User.id).filter(
+        User.id == provider_id,
+        has_conflicting_booking(start_time, end_time)
+    ).first() is None
+
+def has_conflicting_booking(start_time, end_time):
+    """
+    Correlated EXISTS clause matching providers with an active booking overlapping a window
+    Args:
+        start_time: Window start datetime
+        end_time: Window end datetime
+    Returns:
+        SQL expression to use in a User query filter
+    """
+    return db.session.query(DetailingBooking.id).filter(
+        DetailingBooking.provider_id == User.id,
+        DetailingBooking.status.in_(DETAILING_ACTIVE_STATUSES),
+        DetailingBooking.start_time < end_time,
+        DetailingBooking.end_time > start_time
+    ).exists()
 
 def create_detailing_booking(user_id, service_id, provider_id, vehicle_id, start_time, location):
     """
@@ -75,6 +110,9 @@ def create_detailing_booking(user_id, service_id, provider_id, vehicle_id, start
     
     end_time = start_time + timedelta(minutes=service.duration)
     
+    if not is_provider_free(provider_id, start_time, end_time):
+        raise ValueError("Provider is already booked for this time")
+    
     booking = DetailingBooking(
         user_id=user_id,
         service_id=service_id,
@@ -0,0 +1,42 @@
+from flask import current_app
+from sqlalchemy import event
+from models.user import User
+from models.vehicle import Vehicle
+from services.indexes import get_index, VehicleLocationIndex, ProviderCoverageIndex
+from utils.geoutils.backends import GeoLayer, default_backend_name, get_backend, install_rtree, drop_rtree
+from main import db
+
+# Searchable point sets: vehicle locations and detailing provider coverage
+VEHICLES = GeoLayer(
+    Vehicle.id, Vehicle.latitude, Vehicle.longitude,
+    index=lambda: get_index(VehicleLocationIndex)
+)
+PROVIDERS = GeoLayer(
+    User.id, User.latitude, User.longitude,
+    radius_column=User.service_radius_km,
+    criteria=(User.is_detailing_provider == True,),
+    index=lambda: get_index(ProviderCoverageIndex)
+)
+
+# On SQLite, tables created by db.create_all() get their R*Tree and triggers
+# straight away; existing databases get them from the migration
+for layer in (VEHICLES, PROVIDERS):
+    event.listen(layer.id_column.table, 'after_create', install_rtree)
+    event.listen(layer.id_column.table, 'after_drop', drop_rtree)
+
+
+def geo_backend():
+    """
+    Return the current app's geo backend, as chosen by GEO_BACKEND (by
+    default the database's own spatial engine)
+    """
+    extensions = current_app.extensions
+    backend = extensions.get('geo_backend')
+    name = current_app.config['GEO_BACKEND']
+    if not name:
+        name = extensions.get('geo_backend_default')
+        if name is None:
+            name = extensions['geo_backend_default'] = default_backend_name(db.session)
+    if backend is None or backend.name != name:
+        backend = extensions['geo_backend'] = get_backend(name, db.session)
+    return backend
@@ -0,0 +1,331 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models.user import User
+from models.vehicle import Vehicle
+from models.booking import (
+    CarsharingBooking, DetailingBooking,
+    CARSHARING_ACTIVE_STATUSES, DETAILING_ACTIVE_STATUSES
+)
+from utils.geoutils import radius_filter
+from utils.intervals import IntervalIndex
+from utils.timeslots import SlotCalendar
+from utils.spatial import CoverageIndex, GridIndex
+from main import db
+
+class ManagedIndex:
+    """
+    Base class for in-memory search indexes.
+    Each app gets its own instance, built from the database on first use and
+    rebuilt once it is older than SEARCH_INDEX_MAX_AGE seconds so that changes
+    committed by other worker processes are eventually picked up. Changes
+    committed through this process are applied as soon as the commit succeeds.
+    Subclasses declare the models they watch and implement build/capture/apply.
+    """
+    name = None
+    watched = ()
+    # Config setting holding the maximum age in seconds
+    max_age_setting = 'SEARCH_INDEX_MAX_AGE'
+
+    def __init__(self, app):
+        self.app = app
+        self.lock = threading.RLock()
+        self.built_at = None
+
+    def build(self):
+        """Load the index from the database"""
+        raise NotImplementedError
+
+    def capture(self, obj, deleted):
+        """Return a change record for a flushed instance, or None to ignore it"""
+        raise NotImplementedError
+
+    def apply(self, change):
+        """Apply a change record captured during flush"""
+        raise NotImplementedError
+
+    def is_stale(self):
+        if self.built_at is None:
+            return True
+        max_age = self.app.config.get(self.max_age_setting)
+        return bool(max_age) and time.monotonic() - self.built_at > max_age
+
+    def refresh(self):
+        with self.lock:
+            self.build()
+            self.built_at = time.monotonic()
+
+
+def get_index(index_class):
+    """Return the current app's instance of index_class, building it if needed"""
+    app = current_app._get_current_object()
+    indexes = app.extensions.setdefault('search_indexes', {})
+    index = indexes.get(index_class.name)
+    if index is None:
+        index = indexes.setdefault(index_class.name, index_class(app))
+    if index.is_stale():
+        index.refresh()
+    return index
+
+
+def _built_indexes():
+    if not has_app_context():
+        return []
+    indexes = current_app.extensions.get('search_indexes', {})
+    return [i for i in indexes.values() if i.built_at is not None]
+
+
+@event.listens_for(Session, 'after_flush')
+def _capture_index_changes(session, flush_context):
+    indexes = _built_indexes()
+    if not indexes:
+        return
+    pending = session.info.setdefault('index_changes', [])
+    for objects, deleted in ((session.new, False), (session.dirty, False), (session.deleted, True)):
+        for obj in objects:
+            for index in indexes:
+                if isinstance(obj, index.watched):
+                    change = index.capture(obj, deleted)
+                    if change is not None:
+                        pending.append((index, change))
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_index_changes(session):
+    for index, change in session.info.pop('index_changes', []):
+        with index.lock:
+            index.apply(change)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_index_changes(session, previous_transaction):
+    session.info.pop('index_changes', None)
+
+
+class VehicleLocationIndex(ManagedIndex):
+    """
+    Grid index of vehicle locations keyed by vehicle id, used by
+    GEO_BACKEND=python. Vehicles created or moved by other workers are only
+    found once the index is rebuilt, up to SEARCH_INDEX_MAX_AGE seconds
+    later; the database backends always search the committed rows.
+    """
+    name = 'vehicle_locations'
+    watched = (Vehicle,)
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.grid = GridIndex(app.config.get('SPATIAL_INDEX_CELL_DEG', 0.05))
+
+    def build(self):
+        rows = db.session.query(Vehicle.id, Vehicle.latitude, Vehicle.longitude).all()
+        self.grid.clear()
+        for vehicle_id, lat, lng in rows:
+            self.apply((vehicle_id, lat, lng))
+
+    def capture(self, obj, deleted):
+        if deleted:
+            return (obj.id, None, None)
+        return (obj.id, obj.latitude, obj.longitude)
+
+    def apply(self, change):
+        vehicle_id, lat, lng = change
+        # Vehicles without location data are never search results
+        if not lat or not lng:
+            self.grid.remove(vehicle_id)
+        else:
+            self.grid.insert(vehicle_id, lat, lng)
+
+    def within_radius(self, location, radius_km):
+        """Return {vehicle_id: distance_km} for vehicles within radius_km of location"""
+        with self.lock:
+            candidates = self.grid.candidates(location, radius_km)
+        if not candidates:
+            return {}
+        ids, lats, lngs = zip(*candidates)
+        indices, distances = radius_filter(location, lats, lngs, radius_km)
+        return {ids[i]: d for i, d in zip(indices.tolist(), distances.tolist())}
+
+
+class ProviderCoverageIndex(ManagedIndex):
+    """Coverage circles of detailing providers keyed by provider id"""
+    name = 'provider_coverage'
+    watched = (User,)
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.coverage = CoverageIndex(app.config.get('COVERAGE_INDEX_CELL_DEG', 0.1))
+
+    def build(self):
+        rows = db.session.query(
+            User.id, User.latitude, User.longitude, User.service_radius_km
+        ).filter(User.is_detailing_provider == True).all()
+        self.coverage.clear()
+        for provider_id, lat, lng, radius_km in rows:
+            self.apply((provider_id, lat, lng, radius_km))
+
+    def capture(self, obj, deleted):
+        if deleted or not obj.is_detailing_provider:
+            return (obj.id, None, None, None)
+        return (obj.id, obj.latitude, obj.longitude, obj.service_radius_km)
+
+    def apply(self, change):
+        provider_id, lat, lng, radius_km = change
+        # Providers without location data are never search results
+        if not lat or not lng or radius_km is None:
+            self.coverage.remove(provider_id)
+        else:
+            self.coverage.insert(provider_id, lat, lng, radius_km)
+
+    def covering(self, location):
+        """Return {provider_id: distance_km} for providers whose service radius covers location"""
+        with self.lock:
+            candidates = self.coverage.candidates(location)
+        if not candidates:
+            return {}
+        ids, lats, lngs, radii = zip(*candidates)
+        indices, distances = radius_filter(location, lats, lngs, radii)
+        return {ids[i]: d for i, d in zip(indices.tolist(), distances.tolist())}
+
+
+class BookingIndex(ManagedIndex):
+    """
+    Index of the time windows held by active bookings that have not ended
+    yet, so its size follows the bookings ahead rather than the whole history.
+    It only sees this worker's commits until it is rebuilt, which is fine for
+    searches but not for accepting a booking: is_vehicle_free and
+    is_provider_free always check in SQL.
+    Subclasses choose the booking model, the column bookings are keyed by, the
+    statuses that count as active and the structure windows are stored in.
+    """
+    model = None
+    key_column = None
+    active_statuses = ()
+    structure = None
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.intervals = self.structure()
+
+    def _load(self):
+        model = self.model
+        return db.session.query(
+            model.id, getattr(model, self.key_column), model.start_time, model.end_time
+        ).filter(
+            model.status.in_(self.active_statuses),
+            model.end_time > datetime.utcnow()
+        ).all()
+
+    def build(self):
+        self.intervals.load(self._load())
+
+    def capture(self, obj, deleted):
+        # Open-ended bookings never match the SQL overlap predicate either
+        active = (not deleted and obj.status in self.active_statuses
+                  and obj.end_time is not None and obj.end_time > datetime.utcnow())
+        if not active:
+            return (obj.id, None, None, None)
+        return (obj.id, getattr(obj, self.key_column), obj.start_time, obj.end_time)
+
+    def apply(self, change):
+        booking_id, key, start_time, end_time = change
+        if key is None:
+            self.intervals.remove(booking_id)
+        else:
+            self.intervals.add(booking_id, key, start_time, end_time)
+
+    def verify(self):
+        """
+        Compare the index with the database
+        Returns:
+            Dict with booking ids missing from the index, indexed but no longer
+            active, and indexed with a different key or window
+        """
+        expected = {booking_id: (key, start_time, end_time)
+                    for booking_id, key, start_time, end_time in self._load()}
+        with self.lock:
+            indexed = dict(self.intervals.items())
+        return {
+            'indexed': len(indexed),
+            'missing': sorted(set(expected) - set(indexed)),
+            'unexpected': sorted(set(indexed) - set(expected)),
+            'mismatched': sorted(i for i in set(expected) & set(indexed) if expected[i] != indexed[i])
+        }
+
+
+class BookingWindowIndex(BookingIndex):
+    """Interval index answering exact overlap checks for active bookings"""
+    structure = IntervalIndex
+
+    def is_free(self, key, start_time, end_time):
+        """Check if no active booking of key overlaps the window"""
+        with self.lock:
+            return not self.intervals.overlaps(key, start_time, end_time)
+
+    def busy_keys(self, keys, start_time, end_time):
+        """Return the keys among `keys` with an active booking overlapping the window"""
+        with self.lock:
+            return self.intervals.overlapping_keys(keys, start_time, end_time)
+
+
+class VehicleBookingIndex(BookingWindowIndex):
+    """Active carsharing booking windows keyed by vehicle id"""
+    name = 'vehicle_bookings'
+    watched = (CarsharingBooking,)
+    model = CarsharingBooking
+    key_column = 'vehicle_id'
+    active_statuses = CARSHARING_ACTIVE_STATUSES
+
+
+class ProviderBookingIndex(BookingWindowIndex):
+    """Active detailing booking windows keyed by provider id"""
+    name = 'provider_bookings'
+    watched = (DetailingBooking,)
+    model = DetailingBooking
+    key_column = 'provider_id'
+    active_statuses = DETAILING_ACTIVE_STATUSES
+
+
+class VehicleCalendarIndex(BookingIndex):
+    """
+    Busy 15-minute slot bitmaps per vehicle and day, from active carsharing
+    bookings. Like the other booking indexes it lags other workers' commits,
+    so it only prefilters searches; the calendar endpoint reads the vehicle's
+    bookings from the database (see vehicle_calendar).
+    """
+    name = 'vehicle_calendar'
+    watched = (CarsharingBooking,)
+    model = CarsharingBooking
+    key_column = 'vehicle_id'
+    active_statuses = CARSHARING_ACTIVE_STATUSES
+    structure = SlotCalendar
+
+    def maybe_busy(self, vehicle_ids, start_time, end_time):
+        """
+        Return the vehicles whose bitmaps have a busy slot in the window.
+        Vehicles not returned are free; returned ones need an exact check.
+        """
+        with self.lock:
+            return self.intervals.maybe_busy(vehicle_ids, start_time, end_time)
+
+
+def vehicle_calendar(vehicle_id, first_day, days):
+    """
+    Slot calendar of a vehicle's active bookings during the given number of
+    days from first_day, read from the database so that it never lags behind
+    other workers
+    """
+    window_start = datetime.combine(first_day, datetime.min.time())
+    window_end = window_start + timedelta(days=days)
+    calendar = SlotCalendar()
+    calendar.load(db.session.query(
+        CarsharingBooking.id, CarsharingBooking.vehicle_id, CarsharingBooking.start_time, CarsharingBooking.end_time
+    ).filter(
+        CarsharingBooking.vehicle_id == vehicle_id,
+        CarsharingBooking.status.in_(CARSHARING_ACTIVE_STATUSES),
+        CarsharingBooking.start_time < window_end,
+        CarsharingBooking.end_time > window_start
+    ))
+    return calendar
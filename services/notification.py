@@ -1,5 +1,6 @@
 from flask import current_app
 from models.notification import Notification
+from models.translation import store_translations
 from main import db
 from threading import Thread
 import requests
@@ -9,22 +10,23 @@ def send_notification(user_id, title, message, notification_type=None, related_i
     Send in-app notification and trigger other notification methods
     Args:
         user_id: Recipient user ID
-        title: Notification title
-        message: Notification message
+        title: Notification title, or dict of titles by language
+        message: Notification message, or dict of messages by language
         notification_type: Type of notification
         related_id: ID of related entity
     """
     # Create in-app notification
     notification = Notification(
         user_id=user_id,
-        title=title,
-        message=message,
         notification_type=notification_type,
         related_id=related_id
     )
+    store_translations(notification, title=title, message=message)
     
     db.session.add(notification)
     db.session.commit()
+    # Push and email go out in the default language
+    title, message = notification.title, notification.message
     
     # Trigger push and email notifications in background
     Thread(target=send_push_notification, args=(user_id, title, message)).start()
@@ -0,0 +1,50 @@
+from models.user import User
+from services.indexes import ManagedIndex, get_index
+from main import db
+
+class RoleVersionIndex(ManagedIndex):
+    """
+    role_version of every user whose roles have changed, keyed by user id.
+    Tokens carry the version their role claims were issued at; a token older
+    than the user's current version no longer authorizes anything. Changes
+    committed through this process apply at once, others within
+    ROLE_VERSION_MAX_AGE seconds.
+    """
+    name = 'role_versions'
+    watched = (User,)
+    max_age_setting = 'ROLE_VERSION_MAX_AGE'
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.versions = {}
+
+    def build(self):
+        rows = db.session.query(User.id, User.role_version).filter(User.role_version > 0).all()
+        self.versions = dict(rows)
+
+    def capture(self, obj, deleted):
+        return (obj.id, None if deleted else obj.role_version)
+
+    def apply(self, change):
+        user_id, version = change
+        if version:
+            self.versions[user_id] = version
+        else:
+            self.versions.pop(user_id, None)
+
+    def version(self, user_id):
+        return self.versions.get(user_id, 0)
+
+def role_claims(identity):
+    """
+    additional_claims_loader adding the user's roles and role_version to
+    the tokens issued for identity
+    """
+    user = db.session.get(User, int(identity))
+    if user is None:
+        return {}
+    return {'roles': user.roles, 'rv': user.role_version}
+
+def roles_current(claims):
+    """Check that the role claims of a token were issued at the user's current role_version"""
+    return claims.get('rv', 0) >= get_index(RoleVersionIndex).version(int(claims['sub']))
@@ -101,4 +101,84 @@ def test_detailing_service(app):
         )
         db.session.add(service)
         db.session.commit()
-        return service.id
\ No newline at end of file
+        return service.id
+
+@pytest.fixture
+def query_counter(app):
+    """Count SQL statements executed while the returned list is being appended to"""
+    from sqlalchemy import event
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', count)
+
+@pytest.fixture
+def capture_select(app):
+    """Return a helper running fn and returning the first (statement, parameters) selecting from table"""
+    from sqlalchemy import event
+
+    def capture_select(table, fn):
+        captured = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith('SELECT') and f'FROM {table}' in statement:
+                captured.append((statement, parameters))
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            fn()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        return captured[0]
+    return capture_select
+
+@pytest.fixture
+def explain(app):
+    """Return a helper giving SQLite's query plan for a captured statement as one string"""
+    def explain(statement, parameters):
+        rows = db.session.connection().exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)
+        return ' '.join(row[-1] for row in rows)
+    return explain
+
+@pytest.fixture
+def add_bookings(app):
+    """Return a helper adding count confirmed carsharing and detailing bookings from tomorrow on"""
+    from datetime import datetime, timedelta
+    from models.booking import CarsharingBooking, DetailingBooking
+
+    def add_bookings(user_id, provider_id, vehicle_id, service_id, count):
+        start_time = datetime.utcnow() + timedelta(days=1)
+        for i in range(count):
+            db.session.add(CarsharingBooking(
+                user_id=user_id, vehicle_id=vehicle_id, driver_id=user_id,
+                start_time=start_time + timedelta(hours=i), end_time=start_time + timedelta(hours=i, minutes=30),
+                pickup_address='123 Main St', pickup_latitude=34.0522, pickup_longitude=-118.2437,
+                total_price=10, status='confirmed'
+            ))
+            db.session.add(DetailingBooking(
+                user_id=user_id, service_id=service_id, provider_id=provider_id, vehicle_id=vehicle_id,
+                start_time=start_time + timedelta(hours=i), address='123 Main St',
+                latitude=34.0522, longitude=-118.2437, total_price=25, status='confirmed'
+            ))
+        db.session.commit()
+    return add_bookings
+
+@pytest.fixture
+def walk():
+    """Return a helper following next_cursor through every page of a listing and returning the pages' items"""
+    def walk(client, url, headers=None, **params):
+        pages, cursor = [], None
+        while True:
+            query = dict(params, **({'cursor': cursor} if cursor else {}))
+            response = client.get(url, query_string=query, headers=headers)
+            assert response.status_code == 200
+            pages.append(response.json['data']['items'])
+            cursor = response.json['data']['pagination']['next_cursor']
+            if cursor is None:
+                return pages
+    return walk
@@ -46,4 +46,116 @@ def test_password_reset(client, app, test_user):
         'email': 'test@example.com',
         'password': 'newsecurepass'
     })
-    assert login_response.status_code == 200
\ No newline at end of file
+    assert login_response.status_code == 200
+
+def test_login_rehashes_outdated_password_hashes(client, app, test_user):
+    from main import db
+    from werkzeug.security import generate_password_hash
+    user = User.query.get(test_user)
+    assert user.password_hash.startswith(app.config['PASSWORD_HASH_METHOD'] + '$')
+    user.password_hash = generate_password_hash('testpass', 'pbkdf2:sha256:1000')
+    db.session.commit()
+
+    response = client.post('/auth/login', json={'email': 'test@example.com', 'password': 'testpass'})
+    assert response.status_code == 200
+    db.session.refresh(user)
+    assert user.password_hash.startswith(app.config['PASSWORD_HASH_METHOD'] + '$')
+    assert user.check_password('testpass')
+
+
+def test_login_answers_503_when_hashing_queue_is_full(client, app, test_user):
+    from utils.passwords import get_hasher
+    hasher = get_hasher()
+    hasher.timeout = 0.01
+    # Every slot is taken by other requests
+    while hasher.slots.acquire(blocking=False):
+        pass
+    response = client.post('/auth/login', json={'email': 'test@example.com', 'password': 'testpass'})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+
+def test_admin_routes_authorize_from_role_claims(client, app, test_user, query_counter):
+    from main import db
+    login = lambda: client.post('/auth/login', json={'email': 'test@example.com', 'password': 'testpass'}).json
+    token = login()['access_token']
+    assert client.get('/admin/dashboard', headers={'Authorization': f'Bearer {token}'}).status_code == 403
+
+    user = User.query.get(test_user)
+    user.is_admin = True
+    db.session.commit()
+    assert user.role_version == 1
+    # The old token's claims predate the grant
+    assert client.get('/admin/dashboard', headers={'Authorization': f'Bearer {token}'}).status_code == 401
+
+    tokens = login()
+    headers = {'Authorization': f'Bearer {tokens["access_token"]}'}
+    query_counter.clear()
+    response = client.get('/admin/vehicles/pending', headers=headers)
+    assert response.status_code == 200
+    assert not [q for q in query_counter if 'FROM users' in q]
+
+    # Revoking the role takes effect for tokens already issued
+    user.is_admin = False
+    db.session.commit()
+    assert client.get('/admin/dashboard', headers=headers).status_code == 401
+    refreshed = client.post('/auth/refresh', headers={'Authorization': f'Bearer {tokens["refresh_token"]}'}).json
+    assert client.get('/admin/dashboard', headers={'Authorization': f'Bearer {refreshed["access_token"]}'}).status_code == 403
+
+
+def test_role_changes_outside_the_orm_bump_role_version(client, app, test_user):
+    from main import db
+    from services.indexes import get_index
+    from services.roles import RoleVersionIndex
+    user = User.query.get(test_user)
+    user.is_admin = True
+    db.session.commit()
+    token = client.post('/auth/login', json={'email': 'test@example.com', 'password': 'testpass'}).json['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+    assert client.get('/admin/dashboard', headers=headers).status_code == 200
+
+    # Bulk updates and raw SQL skip ORM events; the trigger still bumps the version
+    User.query.filter(User.id == test_user).update({'is_admin': False})
+    db.session.commit()
+    assert db.session.get(User, test_user).role_version == 2
+    db.session.execute(db.text('UPDATE users SET is_driver = 1'))
+    db.session.execute(db.text('UPDATE users SET first_name = :name'), {'name': 'Renamed'})
+    db.session.commit()
+    db.session.refresh(user)
+    assert user.role_version == 3
+
+    # Other workers see the revocation once their index is rebuilt (ROLE_VERSION_MAX_AGE)
+    get_index(RoleVersionIndex).refresh()
+    assert client.get('/admin/dashboard', headers=headers).status_code == 401
+
+def test_shorthand_hash_methods_do_not_force_rehashes():
+    from utils.passwords import PasswordHasher
+    for method in ('scrypt', 'pbkdf2', 'pbkdf2:sha256'):
+        hasher = PasswordHasher(method=method)
+        assert not hasher.needs_rehash(hasher.hash('secret'))
+    assert PasswordHasher(method='scrypt').needs_rehash(PasswordHasher(method='pbkdf2').hash('secret'))
+
+
+def test_hashing_recovers_from_a_broken_pool():
+    import os
+    from utils.passwords import PasswordHasher, _executor
+    hasher = PasswordHasher(method='pbkdf2:sha256:1000', workers=1, queue=1)
+    # A worker dying (e.g. OOM-killed) breaks the whole pool
+    broken = _executor(1)
+    broken.submit(os._exit, 1).exception()
+    assert hasher.verify(hasher.hash('secret'), 'secret')
+    assert _executor(1) is not broken
+    # Workers are never forked from the threaded app process
+    assert _executor(1)._mp_context.get_start_method() in ('forkserver', 'spawn')
+
+
+def test_hashing_busy_answers_503_on_every_blueprint(app):
+    from utils.passwords import HashingBusy
+
+    def busy():
+        raise HashingBusy()
+
+    app.add_url_rule('/busy', 'busy', busy)
+    response = app.test_client().get('/busy')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
@@ -0,0 +1,359 @@
+import random
+import pytest
+from datetime import datetime, timedelta
+from main import db
+from models.booking import CarsharingBooking, DetailingBooking
+from models.user import User
+from models.vehicle import Vehicle
+from services.carsharing import find_available_vehicles
+from services.detailing import find_available_providers
+from services.indexes import get_index, VehicleBookingIndex, VehicleCalendarIndex
+from utils.intervals import IntervalIndex
+from utils.timeslots import SlotCalendar
+
+LOS_ANGELES = (34.0522, -118.2437)
+
+
+def add_fleet(owner_id, count):
+    vehicles = [Vehicle(
+        owner_id=owner_id,
+        make='Toyota',
+        model='Corolla',
+        year=2021,
+        license_plate=f'FLEET{i}',
+        vehicle_type='sedan',
+        seating_capacity=5,
+        hourly_rate=10,
+        is_available=True,
+        is_approved=True,
+        latitude=LOS_ANGELES[0] + i * 0.001,
+        longitude=LOS_ANGELES[1]
+    ) for i in range(count)]
+    db.session.add_all(vehicles)
+    db.session.commit()
+    return [v.id for v in vehicles]
+
+
+def book_vehicle(user_id, vehicle_id, start_time, end_time, status='confirmed'):
+    booking = CarsharingBooking(
+        user_id=user_id,
+        vehicle_id=vehicle_id,
+        driver_id=user_id,
+        start_time=start_time,
+        end_time=end_time,
+        pickup_address='123 Main St',
+        pickup_latitude=LOS_ANGELES[0],
+        pickup_longitude=LOS_ANGELES[1],
+        total_price=10,
+        status=status
+    )
+    db.session.add(booking)
+    db.session.commit()
+    return booking
+
+
+@pytest.mark.parametrize('use_index', [True, False])
+@pytest.mark.parametrize('fleet_size', [5, 40])
+def test_vehicle_search_query_count_is_constant(app, test_driver, query_counter, fleet_size, use_index):
+    app.config['BOOKING_INDEX_ENABLED'] = use_index
+    vehicle_ids = add_fleet(test_driver, fleet_size)
+    start_time = datetime.utcnow() + timedelta(hours=1)
+    end_time = start_time + timedelta(hours=2)
+    book_vehicle(test_driver, vehicle_ids[0], start_time - timedelta(hours=1), start_time + timedelta(minutes=30))
+    book_vehicle(test_driver, vehicle_ids[1], start_time, end_time, status='canceled')
+    book_vehicle(test_driver, vehicle_ids[2], end_time, end_time + timedelta(hours=1))
+
+    # Build the location index outside the measured call
+    find_available_vehicles(start_time, end_time, LOS_ANGELES, radius_km=100)
+    query_counter.clear()
+
+    available = find_available_vehicles(start_time, end_time, LOS_ANGELES, radius_km=100)
+    assert [v.id for v in available] == vehicle_ids[1:]
+    assert len(query_counter) == 1
+
+
+@pytest.mark.parametrize('use_index', [True, False])
+def test_provider_search_excludes_booked_providers(app, use_index, test_user, test_detailing_service, query_counter):
+    app.config['BOOKING_INDEX_ENABLED'] = use_index
+    start_time = datetime.utcnow() + timedelta(days=1)
+    providers = []
+    for i in range(3):
+        provider = User(
+            email=f'provider{i}@example.com',
+            first_name='Provider',
+            last_name=str(i),
+            phone='+1987654321',
+            is_detailing_provider=True,
+            service_radius_km=20,
+            latitude=LOS_ANGELES[0],
+            longitude=LOS_ANGELES[1]
+        )
+        provider.set_password('providerpass')
+        providers.append(provider)
+    db.session.add_all(providers)
+    db.session.commit()
+
+    vehicle = Vehicle(owner_id=test_user, make='Honda', model='Civic', year=2019,
+                      license_plate='DTL1', vehicle_type='sedan', seating_capacity=5)
+    db.session.add(vehicle)
+    db.session.commit()
+    # Load the booking index before the booking exists; the commit must update it
+    assert len(find_available_providers(test_detailing_service, start_time, LOS_ANGELES)) == 3
+    db.session.add(DetailingBooking(
+        user_id=test_user,
+        service_id=test_detailing_service,
+        provider_id=providers[1].id,
+        vehicle_id=vehicle.id,
+        start_time=start_time,
+        end_time=start_time + timedelta(minutes=30),
+        address='123 Main St',
+        latitude=LOS_ANGELES[0],
+        longitude=LOS_ANGELES[1],
+        total_price=25,
+        status='confirmed'
+    ))
+    db.session.commit()
+    query_counter.clear()
+
+    available = find_available_providers(test_detailing_service, start_time, LOS_ANGELES)
+    assert [p['provider'].id for p in available] == [providers[0].id, providers[2].id]
+    # The service, the largest service radius (for the R*Tree box) and the providers
+    assert len(query_counter) == 3
+
+
+def test_interval_index_overlaps():
+    index = IntervalIndex()
+    base = datetime(2030, 1, 1, 10)
+    index.add(1, 'car', base, base + timedelta(hours=8))
+    index.add(2, 'car', base + timedelta(hours=1), base + timedelta(hours=2))
+    index.add(3, 'car', base + timedelta(hours=12), base + timedelta(hours=13))
+
+    assert index.overlaps('car', base + timedelta(hours=5), base + timedelta(hours=6))
+    assert not index.overlaps('car', base + timedelta(hours=8), base + timedelta(hours=12))
+    assert not index.overlaps('bike', base, base + timedelta(hours=1))
+
+    index.remove(1)
+    assert not index.overlaps('car', base + timedelta(hours=5), base + timedelta(hours=6))
+    assert index.overlapping_keys(['car', 'bike'], base, base + timedelta(hours=24)) == {'car'}
+
+
+def test_booking_index_tracks_status_changes(client, app, test_user, test_vehicle):
+    login_res = client.post('/auth/login', json={'email': 'test@example.com', 'password': 'testpass'})
+    headers = {'Authorization': f'Bearer {login_res.json["access_token"]}'}
+    start_time = datetime.utcnow() + timedelta(hours=1)
+    end_time = start_time + timedelta(hours=2)
+    payload = {
+        'vehicle_id': test_vehicle,
+        'start_time': start_time.isoformat(),
+        'end_time': end_time.isoformat(),
+        'pickup': {'address': '123 Main St', 'lat': LOS_ANGELES[0], 'lng': LOS_ANGELES[1]}
+    }
+
+    booking_id = client.post('/bookings/carsharing/book', headers=headers, json=payload).json['id']
+    assert client.post('/bookings/carsharing/book', headers=headers, json=payload).status_code == 409
+
+    client.post(f'/bookings/{booking_id}/cancel', headers=headers)
+    assert get_index(VehicleBookingIndex).verify()['indexed'] == 0
+    assert client.post('/bookings/carsharing/book', headers=headers, json=payload).status_code == 201
+
+    # Changes made behind the index's back show up in the consistency check
+    db.session.execute(db.text("UPDATE bookings SET status = 'canceled'"))
+    db.session.commit()
+    report = get_index(VehicleBookingIndex).verify()
+    assert report['unexpected'] and not report['missing']
+
+
+def test_booking_conflicts_are_checked_in_sql(client, app, test_user, test_vehicle):
+    login_res = client.post('/auth/login', json={'email': 'test@example.com', 'password': 'testpass'})
+    headers = {'Authorization': f'Bearer {login_res.json["access_token"]}'}
+    start_time = datetime.utcnow() + timedelta(hours=1)
+    end_time = start_time + timedelta(hours=2)
+    get_index(VehicleBookingIndex)
+
+    # A booking committed by another worker never reaches this worker's index
+    booking = book_vehicle(test_user, test_vehicle, start_time, end_time)
+    index = get_index(VehicleBookingIndex)
+    with index.lock:
+        index.intervals.remove(booking.id)
+    assert get_index(VehicleBookingIndex).is_free(test_vehicle, start_time, end_time)
+
+    response = client.post('/bookings/carsharing/book', headers=headers, json={
+        'vehicle_id': test_vehicle,
+        'start_time': (start_time + timedelta(minutes=30)).isoformat(),
+        'end_time': (end_time + timedelta(hours=1)).isoformat(),
+        'pickup': {'address': '123 Main St', 'lat': LOS_ANGELES[0], 'lng': LOS_ANGELES[1]}
+    })
+    assert response.status_code == 409
+
+
+def test_booking_index_skips_past_bookings(app, test_user, test_vehicle):
+    now = datetime.utcnow()
+    book_vehicle(test_user, test_vehicle, now - timedelta(days=2), now - timedelta(days=1))
+    book_vehicle(test_user, test_vehicle, now + timedelta(days=1), now + timedelta(days=2))
+    assert get_index(VehicleBookingIndex).verify()['indexed'] == 1
+
+
+def test_slot_calendar_never_misses_a_conflict():
+    """A clear bitmap must mean the exact interval check finds no overlap"""
+    rng = random.Random(5)
+    base = datetime(2030, 3, 1)
+    calendar, intervals = SlotCalendar(), IntervalIndex()
+    for booking_id in range(300):
+        start = base + timedelta(minutes=rng.randrange(0, 3 * 24 * 60))
+        end = start + timedelta(minutes=rng.randrange(1, 26 * 60))
+        vehicle_id = rng.randrange(50)
+        calendar.add(booking_id, vehicle_id, start, end)
+        intervals.add(booking_id, vehicle_id, start, end)
+    for booking_id in range(0, 300, 3):
+        calendar.remove(booking_id)
+        intervals.remove(booking_id)
+
+    for _ in range(200):
+        start = base + timedelta(minutes=rng.randrange(0, 3 * 24 * 60))
+        end = start + timedelta(minutes=rng.randrange(1, 8 * 60))
+        maybe_busy = set(calendar.maybe_busy(range(60), start, end))
+        assert intervals.overlapping_keys(range(60), start, end) <= maybe_busy
+
+    # Bulk loads build the same bitmaps and intervals as one add() at a time
+    loaded, loaded_intervals = SlotCalendar(), IntervalIndex()
+    loaded.load((item_id, key, start, end) for item_id, (key, start, end) in calendar.items())
+    loaded_intervals.load((item_id, key, start, end) for item_id, (key, start, end) in intervals.items())
+    for day in (base + timedelta(days=d) for d in range(5)):
+        for vehicle_id in range(50):
+            assert loaded.day_bitmap(vehicle_id, day.date()) == calendar.day_bitmap(vehicle_id, day.date())
+            assert loaded_intervals.overlaps(vehicle_id, day, day + timedelta(hours=7)) == \
+                intervals.overlaps(vehicle_id, day, day + timedelta(hours=7))
+
+
+def test_slot_calendar_redraws_only_the_touched_day():
+    # Adding a long booking costs one pass per day it spans, not per day squared
+    calendar = SlotCalendar()
+    start = datetime(2030, 1, 1, 10)
+    calendar.add(1, 7, start, start + timedelta(days=2000))
+    calendar.add(2, 7, start + timedelta(days=1000, hours=1), start + timedelta(days=1000, hours=2))
+    calendar.remove(1)
+    assert calendar.maybe_busy([7], start, start + timedelta(days=999)) == []
+    assert calendar.maybe_busy([7], start + timedelta(days=1000), start + timedelta(days=1001)) == [7]
+
+def test_vehicle_calendar_endpoint(client, app, test_user, test_vehicle):
+    day = (datetime.utcnow() + timedelta(days=2)).date()
+    start_time = datetime.combine(day, datetime.min.time()) + timedelta(hours=10, minutes=5)
+    book_vehicle(test_user, test_vehicle, start_time, start_time + timedelta(hours=2))
+
+    response = client.get(f'/vehicles/{test_vehicle}/calendar', query_string={'date': day.isoformat(), 'days': 2})
+    assert response.status_code == 200
+    first, second = response.json['days']
+    assert first['busy'] == [{
+        'start': f'{day.isoformat()}T10:00:00',
+        'end': f'{day.isoformat()}T12:15:00'
+    }]
+    assert second['busy'] == [] and second['bitmap'] == '00' * 12
+
+    # Bookings this worker's calendar index has not seen yet are shown too
+    calendar_index = get_index(VehicleCalendarIndex)
+    later = book_vehicle(test_user, test_vehicle, start_time + timedelta(days=1), start_time + timedelta(days=1, minutes=10))
+    with calendar_index.lock:
+        calendar_index.intervals.remove(later.id)
+    response = client.get(f'/vehicles/{test_vehicle}/calendar', query_string={'date': day.isoformat(), 'days': 2})
+    assert response.json['days'][1]['busy'] == [{
+        'start': f'{second["date"]}T10:00:00',
+        'end': f'{second["date"]}T10:15:00'
+    }]
+
+    # A window sharing only a rounded slot with the booking passes the exact check
+    vehicle = db.session.get(Vehicle, test_vehicle)
+    vehicle.latitude, vehicle.longitude = LOS_ANGELES
+    db.session.commit()
+    booking_end = start_time + timedelta(hours=2)
+    assert [v.id for v in find_available_vehicles(
+        booking_end, booking_end + timedelta(hours=1), LOS_ANGELES
+    )] == [test_vehicle]
+    assert find_available_vehicles(
+        booking_end - timedelta(minutes=1), booking_end + timedelta(hours=1), LOS_ANGELES
+    ) == []
+
+
+@pytest.mark.parametrize('use_index', [True, False])
+def test_batch_availability_matches_single_searches(client, app, test_driver, query_counter, use_index):
+    app.config['BOOKING_INDEX_ENABLED'] = use_index
+    vehicle_ids = add_fleet(test_driver, 6)
+    base = datetime.utcnow().replace(microsecond=0) + timedelta(days=1)
+    book_vehicle(test_driver, vehicle_ids[0], base, base + timedelta(hours=2))
+    book_vehicle(test_driver, vehicle_ids[1], base + timedelta(hours=3), base + timedelta(hours=5))
+    windows = [(base + timedelta(hours=h), base + timedelta(hours=h + 1)) for h in range(6)]
+    locations = [LOS_ANGELES, (LOS_ANGELES[0] + 0.1, LOS_ANGELES[1])]
+
+    find_available_vehicles(*windows[0], LOS_ANGELES)
+    query_counter.clear()
+    response = client.post('/carsharing/available/batch', json={
+        'windows': [{'start_time': s.isoformat(), 'end_time': e.isoformat()} for s, e in windows],
+        'locations': [{'lat': lat, 'lng': lng} for lat, lng in locations],
+        'radius_km': 8
+    })
+    assert response.status_code == 200
+    # Vehicles and bookings are fetched once for all twelve searches
+    assert len(query_counter) <= 2
+
+    results = iter(response.json['results'])
+    for location in locations:
+        for start_time, end_time in windows:
+            result = next(results)
+            expected = find_available_vehicles(start_time, end_time, location, radius_km=8)
+            assert [v['id'] for v in result['vehicles']] == [v.id for v in expected]
+    assert {v['id'] for v in response.json['vehicles']} == set(vehicle_ids)
+
+
+def test_batch_availability_validates_input(client):
+    assert client.post('/carsharing/available/batch', json={'windows': []}).status_code == 400
+    assert client.post('/carsharing/available/batch', json={
+        'windows': [{'start_time': 'tomorrow', 'end_time': 'later'}], 'lat': 1, 'lng': 2
+    }).status_code == 400
+    assert client.post('/carsharing/available/batch', json={
+        'windows': [{'start_time': '2030-01-01T12:00:00', 'end_time': '2030-01-01T13:00:00'},
+                    {'start_time': '2030-01-01T12:00:00', 'end_time': '2030-01-01T12:00:00'}],
+        'lat': 1, 'lng': 2
+    }).status_code == 400
+    # Windows longer than MAX_SEARCH_WINDOW_DAYS are refused before any day is walked
+    assert client.post('/carsharing/available/batch', json={
+        'windows': [{'start_time': '2030-01-01T12:00:00', 'end_time': '9999-01-01T12:00:00'}], 'lat': 1, 'lng': 2
+    }).status_code == 400
+    assert client.get('/carsharing/available', query_string={
+        'start_time': '2030-01-01T12:00:00', 'end_time': '9999-01-01T12:00:00', 'lat': 1, 'lng': 2
+    }).status_code == 400
+
+
+def test_vehicle_calendar_rejects_days_past_the_last_date(client, test_vehicle):
+    response = client.get(f'/vehicles/{test_vehicle}/calendar', query_string={'date': '9999-12-31', 'days': 5})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('use_index', [True, False])
+def test_nearest_vehicles_pages_in_distance_order(client, app, test_driver, use_index):
+    app.config['BOOKING_INDEX_ENABLED'] = use_index
+    app.config['GEO_BACKEND'] = 'python' if use_index else 'rtree'
+    vehicle_ids = add_fleet(test_driver, 7)
+    start_time = datetime.utcnow().replace(microsecond=0) + timedelta(days=1)
+    end_time = start_time + timedelta(hours=2)
+    book_vehicle(test_driver, vehicle_ids[1], start_time, end_time)
+    # Searching north of the fleet ranks the vehicles in reverse insertion order
+    origin = (LOS_ANGELES[0] + 0.01, LOS_ANGELES[1])
+    params = {'start_time': start_time.isoformat(), 'end_time': end_time.isoformat(),
+              'lat': origin[0], 'lng': origin[1], 'k': 2}
+
+    pages, cursor = [], None
+    while True:
+        response = client.get('/carsharing/available', query_string=dict(params, **({'cursor': cursor} if cursor else {})))
+        assert response.status_code == 200
+        pages.append(response.json['vehicles'])
+        cursor = response.json['next_cursor']
+        if cursor is None:
+            break
+
+    found = [v for page in pages for v in page]
+    assert [len(page) for page in pages] == [2, 2, 2]
+    assert [v['id'] for v in found] == [i for i in reversed(vehicle_ids) if i != vehicle_ids[1]]
+    distances = [v['distance_km'] for v in found]
+    assert distances == sorted(distances)
+
+    assert client.get('/carsharing/available', query_string=dict(params, cursor='garbage')).status_code == 400
+    assert client.get('/carsharing/available', query_string=dict(params, k=0)).status_code == 400
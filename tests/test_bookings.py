@@ -38,6 +38,16 @@ def test_create_carsharing_booking(client, app, test_user, test_vehicle):
     assert response.json['status'] == 'pending'
 
 
+def test_booking_duration_is_capped(client, app, test_user, test_vehicle):
+    token = client.post('/auth/login', json={'email': 'test@example.com', 'password': 'testpass'}).json['access_token']
+    start_time = datetime.utcnow() + timedelta(hours=1)
+    for end_time in (start_time + timedelta(days=app.config['MAX_BOOKING_DAYS'] + 1), start_time):
+        response = client.post('/bookings/carsharing/book', headers={'Authorization': f'Bearer {token}'}, json={
+            'vehicle_id': test_vehicle, 'start_time': start_time.isoformat(), 'end_time': end_time.isoformat(),
+            'pickup': {'address': '123 Main St', 'lat': 34.0522, 'lng': -118.2437}
+        })
+        assert response.status_code == 400
+
 def test_cancel_booking(client, app, test_user, test_vehicle):
     """Test canceling a booking"""
     # Login and create booking first
@@ -74,4 +84,61 @@ def test_cancel_booking(client, app, test_user, test_vehicle):
         headers={'Authorization': f'Bearer {token}'}
     )
     assert cancel_res.status_code == 200
-    assert cancel_res.json['message'] == 'Booking canceled successfully'
\ No newline at end of file
+    assert cancel_res.json['message'] == 'Booking canceled successfully'
+
+@pytest.mark.parametrize('count', [1, 3, 12])
+def test_upcoming_bookings_query_count_is_constant(client, app, test_user, test_vehicle, test_detailing_provider,
+                                                   test_detailing_service, query_counter, count, add_bookings):
+    add_bookings(test_user, test_detailing_provider, test_vehicle, test_detailing_service, count)
+    token = client.post('/auth/login', json={'email': 'test@example.com', 'password': 'testpass'}).json['access_token']
+
+    query_counter.clear()
+    response = client.get('/bookings/upcoming', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+    assert len(response.json['carsharing']) == count
+    assert len(response.json['detailing']) == count
+    assert response.json['detailing'][0]['service']['name'] == 'Basic Wash'
+    assert response.json['carsharing'][0]['driver']['id'] == test_user
+    # One query per booking type, with vehicles, drivers, providers and services joined in
+    assert len(query_counter) == 2
+
+
+def test_booking_history_loads_all_types_in_one_query(client, app, test_user, test_vehicle, test_detailing_provider,
+                                                      test_detailing_service, query_counter, add_bookings):
+    from main import db
+    from models.booking import Booking, BusSeatBooking
+    from models.user import User
+    add_bookings(test_user, test_detailing_provider, test_vehicle, test_detailing_service, 4)
+    db.session.add(BusSeatBooking(user_id=test_user, route_id=1, seat_id=1, agency_id=1,
+                                  start_time=datetime.utcnow(), total_price=5, status='completed'))
+    for booking in Booking.query.all():
+        booking.status = 'completed' if booking.id % 2 else 'canceled'
+    db.session.commit()
+    # Serialized the plain way, one lazy load at a time
+    db.session.expire_all()
+    expected = app.json.loads(app.json.dumps(
+        [b.to_dict() for b in Booking.query.order_by(Booking.start_time.desc()).limit(20)]
+    ))
+    db.session.expire_all()
+    token = client.post('/auth/login', json={'email': 'test@example.com', 'password': 'testpass'}).json['access_token']
+
+    query_counter.clear()
+    response = client.get('/bookings/history', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+    assert len(query_counter) == 1
+    assert sorted(response.json, key=lambda b: b['id']) == sorted(expected, key=lambda b: b['id'])
+    assert {b['service_type'] for b in response.json} == {'carsharing', 'detailing', 'bus_seat'}
+
+    # Admins see everyone's bookings the same way
+    db.session.get(User, test_user).is_admin = True
+    db.session.commit()
+    token = client.post('/auth/login', json={'email': 'test@example.com', 'password': 'testpass'}).json['access_token']
+    # The first role check loads the role versions index
+    client.get('/admin/bookings', headers={'Authorization': f'Bearer {token}'})
+    query_counter.clear()
+    response = client.get('/admin/bookings', query_string={'service_type': 'detailing'},
+                          headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+    # The admin role comes from the token, so the bookings query is the only one
+    assert len(query_counter) == 1
+    assert sorted(b['id'] for b in response.json) == sorted(b['id'] for b in expected if b['service_type'] == 'detailing')
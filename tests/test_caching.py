@@ -0,0 +1,161 @@
+def test_catalog_etag_answers_304_with_one_query(client, app, test_vehicle, query_counter):
+    from main import db
+    from models.vehicle import Vehicle
+    response = client.get('/vehicles/')
+    assert response.status_code == 200
+    tag = response.headers['ETag']
+
+    query_counter.clear()
+    cached = client.get('/vehicles/', headers={'If-None-Match': tag})
+    assert cached.status_code == 304
+    assert cached.get_data() == b''
+    assert cached.headers['ETag'] == tag
+    # Only the table's change counter, never the rows
+    assert len(query_counter) == 1 and 'table_versions' in query_counter[0]
+
+    # Other languages and query strings get their own tags
+    assert client.get('/vehicles/', headers={'Accept-Language': 'fr'}).headers['ETag'] != tag
+    assert client.get('/vehicles/', query_string={'fields': 'id'}).headers['ETag'] != tag
+
+    db.session.get(Vehicle, test_vehicle).daily_rate = 42
+    db.session.commit()
+    changed = client.get('/vehicles/', headers={'If-None-Match': tag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != tag
+    assert changed.json[0]['rates']['daily'] == 42.0
+
+
+def test_service_catalog_is_served_from_snapshots(client, app, test_detailing_service, query_counter):
+    from main import db
+    from models.service import DetailingService
+    service = db.session.get(DetailingService, test_detailing_service)
+    service.name = '{"en": "Basic Wash", "fr": "Lavage simple"}'
+    db.session.commit()
+
+    english = client.get('/detailing/services')
+    french = client.get('/detailing/services', headers={'Accept-Language': 'fr'})
+    assert english.json[0]['name'] == 'Basic Wash'
+    assert french.json[0]['name'] == 'Lavage simple'
+    assert english.headers['ETag'] != french.headers['ETag']
+
+    # Snapshots answer full and conditional requests from the change counters alone
+    query_counter.clear()
+    assert client.get('/detailing/services', headers={'Accept-Language': 'fr'}).get_data() == french.get_data()
+    cached = client.get('/detailing/services', headers={'If-None-Match': english.headers['ETag']})
+    assert cached.status_code == 304
+    assert query_counter and all('table_versions' in q and 'detailing_services.' not in q for q in query_counter)
+
+    # Any change replaces the snapshots, including writes outside this process's session
+    service.base_price = 42
+    db.session.commit()
+    changed = client.get('/detailing/services', headers={'If-None-Match': english.headers['ETag']})
+    assert changed.status_code == 200
+    assert changed.json[0]['base_price'] == 42.0
+    db.session.execute(db.text('UPDATE detailing_services SET duration = 45'))
+    db.session.commit()
+    raw = client.get('/detailing/services', headers={'If-None-Match': changed.headers['ETag']})
+    assert raw.status_code == 200
+    assert raw.json[0]['duration'] == 45
+
+
+def test_detail_etag_needs_the_row(client, app, test_vehicle, query_counter):
+    from main import db
+    from models.vehicle import Vehicle
+    tag = client.get(f'/vehicles/{test_vehicle}').headers['ETag']
+    assert client.get(f'/vehicles/{test_vehicle}', headers={'If-None-Match': tag}).status_code == 304
+
+    vehicle = db.session.get(Vehicle, test_vehicle)
+    vehicle.color = 'Red'
+    db.session.commit()
+    assert client.get(f'/vehicles/{test_vehicle}', headers={'If-None-Match': tag}).status_code == 200
+
+    missing = client.get('/vehicles/9999', headers={'If-None-Match': tag})
+    assert missing.status_code == 404 and 'ETag' not in missing.headers
+
+
+def test_responses_are_compressed_above_threshold(client, app, test_driver):
+    import gzip
+    from main import db
+    from models.vehicle import Vehicle
+    for i in range(20):
+        db.session.add(Vehicle(owner_id=test_driver, make='Ford', model='Focus', year=2019, license_plate=f'P{i}',
+                               vehicle_type='hatchback', seating_capacity=5, is_available=True, is_approved=True))
+    db.session.commit()
+
+    plain = client.get('/vehicles/')
+    assert 'Content-Encoding' not in plain.headers
+    response = client.get('/vehicles/', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.get_data()) == plain.get_data()
+    assert len(response.get_data()) < len(plain.get_data()) / 4
+
+    # Small bodies are not worth compressing
+    small = client.get('/', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+
+
+def test_compressed_bodies_are_cached_by_etag(client, app, test_driver, monkeypatch):
+    from main import compressor, db
+    from models.vehicle import BusAgency
+    for i in range(20):
+        db.session.add(BusAgency(name=f'Agency {i}', email=f'agency{i}@example.com', phone='+15550100', approved=True))
+    db.session.commit()
+
+    calls, rendered = [], []
+    compress = compressor.compress
+    monkeypatch.setattr(compressor, 'compress', lambda body, encoding: calls.append(encoding) or compress(body, encoding))
+    render = app.json.response
+    monkeypatch.setattr(app.json, 'response', lambda *args, **kwargs: rendered.append(1) or render(*args, **kwargs))
+    first = client.get('/vehicles/bus/agencies', headers={'Accept-Encoding': 'gzip'})
+    second = client.get('/vehicles/bus/agencies', headers={'Accept-Encoding': 'gzip'})
+    assert first.get_data() == second.get_data()
+    assert second.headers['Content-Type'] == first.headers['Content-Type']
+    # The cached body is found before the view builds and serializes it again
+    assert calls == ['gzip']
+    assert len(rendered) == 1
+    # The compressed representation gets a weak tag that still revalidates
+    assert first.headers['ETag'].startswith('W/')
+    cached = client.get('/vehicles/bus/agencies', headers={'Accept-Encoding': 'gzip', 'If-None-Match': first.headers['ETag']})
+    assert cached.status_code == 304
+
+
+def test_compression_settings_are_per_app(app):
+    from main import create_app
+    from config import TestingConfig
+
+    class SmallConfig(TestingConfig):
+        COMPRESS_MIN_SIZE = 10
+        COMPRESS_CACHE_SIZE = 1
+
+    other = create_app(SmallConfig)
+    assert other.extensions['compressor'].min_size == 10
+    assert app.extensions['compressor'].min_size == 500
+    assert other.extensions['compressor'].cache is not app.extensions['compressor'].cache
+
+
+def test_etag_follows_writes_that_skip_the_orm(client, app, test_vehicle):
+    from main import db
+    from models.vehicle import Vehicle
+
+    def tag():
+        return client.get('/vehicles/').headers['ETag']
+
+    # Bulk updates skip onupdate, raw SQL skips the ORM altogether
+    before = tag()
+    Vehicle.query.filter(Vehicle.id == test_vehicle).update({'daily_rate': 99})
+    db.session.commit()
+    after_bulk = tag()
+    db.session.execute(db.text('UPDATE vehicles SET hourly_rate = 12'))
+    db.session.commit()
+    after_raw = tag()
+    assert len({before, after_bulk, after_raw}) == 3
+
+    # Deleting a row and adding one with the same updated_at keeps count and max(updated_at)
+    vehicle = db.session.get(Vehicle, test_vehicle)
+    db.session.add(Vehicle(owner_id=vehicle.owner_id, make='Ford', model='Focus', year=2019, license_plate='XYZ789',
+                           vehicle_type='hatchback', seating_capacity=5, is_available=True, is_approved=True,
+                           updated_at=vehicle.updated_at))
+    db.session.delete(vehicle)
+    db.session.commit()
+    assert tag() != after_raw
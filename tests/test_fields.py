@@ -0,0 +1,73 @@
+from utils.fields import FieldSelection
+
+
+def test_field_selection_from_args():
+    selection = FieldSelection.from_args({'fields': 'id, location,rates', 'fields[vehicle]': 'id', 'include': 'vehicle'})
+    assert selection.fields == {'id', 'location', 'rates'}
+    assert selection.nested == {'vehicle': {'id'}}
+    assert selection.embedded(['vehicle', 'driver']) == set()
+
+    # Empty fieldsets select everything rather than nothing
+    selection = FieldSelection.from_args({'fields': '', 'fields[vehicle]': ' , '})
+    assert not selection and selection.apply({'id': 1, 'vehicle': {'id': 2}}) == {'id': 1, 'vehicle': {'id': 2}}
+    assert not FieldSelection.from_args({})
+
+    selection = FieldSelection.from_args({'fields': 'id,vehicle', 'fields[vehicle]': 'id,make'})
+    assert selection.embedded(['vehicle', 'driver']) == {'vehicle'}
+    assert selection.apply({'id': 1, 'status': 'pending', 'driver_id': 3,
+                            'vehicle': {'id': 2, 'make': 'Toyota', 'year': 2020}}) == {
+        'id': 1, 'vehicle': {'id': 2, 'make': 'Toyota'}
+    }
+
+
+def test_vehicle_listing_selects_requested_columns(client, app, test_vehicle, query_counter):
+    from main import db
+    from models.vehicle import Vehicle
+    vehicle = db.session.get(Vehicle, test_vehicle)
+    vehicle.latitude, vehicle.longitude = 34.0522, -118.2437
+    db.session.commit()
+
+    full = client.get('/vehicles/')
+    query_counter.clear()
+    response = client.get('/vehicles/', query_string={'fields': 'id,location,rates'})
+    assert response.status_code == 200
+    assert response.json == [{
+        'id': test_vehicle,
+        'location': {'lat': 34.0522, 'lng': -118.2437},
+        'rates': {'daily': 50.0, 'hourly': 10.0}
+    }]
+    assert len(response.get_data()) < len(full.get_data()) / 2
+    statement = query_counter[-1].lower()
+    assert 'license_plate' not in statement and 'daily_rate' in statement
+    assert client.get('/vehicles/', query_string={'fields': ''}).json == full.json
+
+    # Pages and streams are trimmed the same way
+    page = client.get('/vehicles/', query_string={'fields': 'id,location,rates', 'per_page': 10})
+    assert page.json['data']['items'] == response.json
+    streamed = client.get('/vehicles/', query_string={'fields': 'id,location,rates', 'stream': 'true'})
+    assert streamed.json == response.json
+
+
+def test_upcoming_bookings_only_load_included_relationships(client, app, test_user, test_vehicle,
+                                                            test_detailing_provider, test_detailing_service,
+                                                            query_counter, add_bookings):
+    add_bookings(test_user, test_detailing_provider, test_vehicle, test_detailing_service, 3)
+    token = client.post('/auth/login', json={'email': 'test@example.com', 'password': 'testpass'}).json['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    full = client.get('/bookings/upcoming', headers=headers)
+    query_counter.clear()
+    response = client.get('/bookings/upcoming', query_string={'include': 'vehicle', 'fields[vehicle]': 'id,make'},
+                          headers=headers)
+    assert response.status_code == 200
+    booking = response.json['carsharing'][0]
+    assert booking['vehicle'] == {'id': test_vehicle, 'make': 'Toyota'}
+    assert booking['driver_id'] == test_user and 'driver' not in booking
+    detailing = response.json['detailing'][0]
+    assert detailing['service_id'] == test_detailing_service and 'service' not in detailing
+    assert detailing['provider_id'] == test_detailing_provider and 'provider' not in detailing
+    assert len(response.get_data()) < len(full.get_data())
+
+    # Only the vehicles are joined in
+    assert len(query_counter) == 2
+    assert all(statement.lower().count(' join ') == 2 for statement in query_counter)
@@ -0,0 +1,240 @@
+import random
+import pytest
+from datetime import datetime, timedelta
+from main import db
+from models.user import User
+from models.vehicle import Vehicle
+from services.carsharing import find_available_vehicles
+from services.detailing import find_available_providers
+from utils.geoutils import (
+    calculate_distance, find_nearest, haversine_distances,
+    is_within_radius, nearest_indices, radius_filter
+)
+from utils.spatial import CoverageIndex, GridIndex
+
+
+def test_grid_index_matches_full_scan():
+    """Grid candidates must contain every point a full scan finds"""
+    rng = random.Random(7)
+    grid = GridIndex(cell_size_deg=0.05)
+    points = {}
+    for i in range(2000):
+        # Cluster around Los Angeles, plus a few near the antimeridian and the pole
+        if i % 100 == 0:
+            lat, lng = rng.uniform(89.5, 89.99), rng.uniform(-180, 180)
+        elif i % 100 == 1:
+            lat, lng = rng.uniform(-10, 10), rng.choice([179.99, -179.99])
+        else:
+            lat, lng = 34.05 + rng.uniform(-0.5, 0.5), -118.24 + rng.uniform(-0.5, 0.5)
+        points[i] = (lat, lng)
+        grid.insert(i, lat, lng)
+
+    for center, radius in [((34.05, -118.24), 10), ((34.3, -118.0), 3),
+                           ((0.0, 180.0), 50), ((89.9, 0.0), 40)]:
+        expected = {k for k, p in points.items() if calculate_distance(center, p) <= radius}
+        found = {k for k, lat, lng in grid.candidates(center, radius)
+                 if calculate_distance(center, (lat, lng)) <= radius}
+        assert found == expected
+
+
+def test_available_vehicles_follow_location_updates(app, test_vehicle):
+    """The vehicle index picks up committed location changes"""
+    start_time = datetime.utcnow() + timedelta(hours=1)
+    end_time = start_time + timedelta(hours=2)
+    los_angeles = (34.0522, -118.2437)
+
+    vehicle = db.session.get(Vehicle, test_vehicle)
+    vehicle.latitude, vehicle.longitude = los_angeles
+    db.session.commit()
+    assert [v.id for v in find_available_vehicles(start_time, end_time, los_angeles)] == [test_vehicle]
+
+    # Moving the vehicle out of range takes effect without a rebuild
+    vehicle.latitude, vehicle.longitude = 40.7128, -74.0060
+    db.session.commit()
+    assert find_available_vehicles(start_time, end_time, los_angeles) == []
+
+    # Rolled back moves are not applied
+    vehicle.latitude, vehicle.longitude = los_angeles
+    db.session.flush()
+    db.session.rollback()
+    assert find_available_vehicles(start_time, end_time, los_angeles) == []
+
+
+def test_batch_distances_match_great_circle():
+    """Vectorized haversine agrees with the pairwise geopy distance"""
+    rng = random.Random(3)
+    origin = (34.0522, -118.2437)
+    points = [(rng.uniform(-89, 89), rng.uniform(-180, 180)) for _ in range(500)]
+    lats, lngs = zip(*points)
+
+    distances = haversine_distances(origin, lats, lngs)
+    expected = [calculate_distance(origin, p) for p in points]
+    assert distances.tolist() == pytest.approx(expected, rel=1e-9)
+
+    indices, sorted_distances = nearest_indices(origin, lats, lngs, max_distance=5000)
+    assert sorted_distances.tolist() == pytest.approx(sorted(d for d in expected if d <= 5000), rel=1e-9)
+    assert {int(i) for i in radius_filter(origin, lats, lngs, 5000)[0]} == set(indices.tolist())
+
+
+def test_find_nearest_sorts_and_filters():
+    origin = (34.0522, -118.2437)
+    locations = [
+        {'name': 'far', 'lat': 34.5, 'lng': -118.2437},
+        {'name': 'near', 'lat': 34.06, 'lng': -118.2437},
+        {'name': 'unknown'},
+    ]
+    nearest = find_nearest(origin, locations, max_distance=10)
+    assert [loc['name'] for loc in nearest] == ['near']
+    assert nearest[0]['distance_km'] == pytest.approx(calculate_distance(origin, (34.06, -118.2437)))
+    assert is_within_radius(origin, (34.06, -118.2437), 1)
+    assert not is_within_radius(origin, (34.5, -118.2437), 10)
+
+
+def test_coverage_index_matches_full_scan():
+    """Coverage lookups find every circle containing the point"""
+    rng = random.Random(11)
+    coverage = CoverageIndex(cell_size_deg=0.1)
+    circles = {}
+    for i in range(500):
+        circle = (34.05 + rng.uniform(-1, 1), -118.24 + rng.uniform(-1, 1), rng.uniform(1, 40))
+        circles[i] = circle
+        coverage.insert(i, *circle)
+
+    for _ in range(50):
+        point = (34.05 + rng.uniform(-1, 1), -118.24 + rng.uniform(-1, 1))
+        expected = {k for k, (lat, lng, r) in circles.items() if calculate_distance(point, (lat, lng)) <= r}
+        found = {k for k, lat, lng, r in coverage.candidates(point)
+                 if calculate_distance(point, (lat, lng)) <= r}
+        assert found == expected
+
+
+def test_provider_coverage_follows_radius_updates(app, test_detailing_provider, test_detailing_service):
+    start_time = datetime.utcnow() + timedelta(days=1)
+    customer = (34.0522, -118.2437)
+    provider = db.session.get(User, test_detailing_provider)
+    # About 22km north of the customer, with the fixture's 20km radius
+    provider.latitude, provider.longitude = 34.25, -118.2437
+    db.session.commit()
+    assert find_available_providers(test_detailing_service, start_time, customer) == []
+
+    provider.service_radius_km = 30
+    db.session.commit()
+    found = find_available_providers(test_detailing_service, start_time, customer)
+    assert [p['provider'].id for p in found] == [test_detailing_provider]
+
+    provider.is_detailing_provider = False
+    db.session.commit()
+    assert find_available_providers(test_detailing_service, start_time, customer) == []
+
+
+def test_sql_vehicle_search_uses_location_index(app, test_vehicle, capture_select, explain):
+    app.config['GEO_BACKEND'] = 'sql'
+    start_time = datetime.utcnow() + timedelta(hours=1)
+    end_time = start_time + timedelta(hours=2)
+    los_angeles = (34.0522, -118.2437)
+    vehicle = db.session.get(Vehicle, test_vehicle)
+    vehicle.latitude, vehicle.longitude = 34.06, -118.25
+    db.session.commit()
+
+    assert [v.id for v in find_available_vehicles(start_time, end_time, los_angeles)] == [test_vehicle]
+    assert find_available_vehicles(start_time, end_time, (40.7128, -74.0060)) == []
+
+    statement, parameters = capture_select(
+        'vehicles', lambda: find_available_vehicles(start_time, end_time, los_angeles)
+    )
+    assert 'latitude BETWEEN' in statement
+    assert 'ix_vehicles_search_location' in explain(statement, parameters)
+
+
+def test_sql_provider_search_uses_location_index(app, test_detailing_provider, test_detailing_service, capture_select, explain):
+    app.config['GEO_BACKEND'] = 'sql'
+    start_time = datetime.utcnow() + timedelta(days=1)
+    provider = db.session.get(User, test_detailing_provider)
+    provider.latitude, provider.longitude = 34.25, -118.2437
+    db.session.commit()
+
+    assert find_available_providers(test_detailing_service, start_time, (34.0522, -118.2437)) == []
+    found = find_available_providers(test_detailing_service, start_time, (34.1, -118.2437))
+    assert [p['provider'].id for p in found] == [test_detailing_provider]
+
+    statement, parameters = capture_select(
+        'users', lambda: find_available_providers(test_detailing_service, start_time, (34.1, -118.2437))
+    )
+    assert 'ix_users_provider_location' in explain(statement, parameters)
+
+
+def test_bounding_box_filter_crosses_antimeridian(app, test_driver):
+    from utils.spatial import within_bounding_box
+    for i, lng in enumerate([179.95, -179.95, 170.0]):
+        db.session.add(Vehicle(owner_id=test_driver, make='Make', model='Model', year=2020,
+                               license_plate=f'DATELINE{i}', vehicle_type='sedan', seating_capacity=4,
+                               latitude=0.5, longitude=lng))
+    db.session.commit()
+    found = Vehicle.query.filter(within_bounding_box(Vehicle.latitude, Vehicle.longitude, (0.5, 180.0), 20)).all()
+    assert sorted(v.longitude for v in found) == [-179.95, 179.95]
+
+
+@pytest.mark.parametrize('backend', ['python', 'sql', 'rtree'])
+def test_geo_backends_match_full_scan(app, test_driver, backend):
+    from services.carsharing import find_nearest_vehicles
+    app.config['GEO_BACKEND'] = backend
+    rng = random.Random(5)
+    vehicles = [Vehicle(owner_id=test_driver, make='Make', model='Model', year=2020,
+                        license_plate=f'GEO{i}', vehicle_type='sedan', seating_capacity=4,
+                        is_available=True, is_approved=True,
+                        latitude=34.05 + rng.uniform(-0.2, 0.2), longitude=-118.24 + rng.uniform(-0.2, 0.2))
+                for i in range(200)]
+    db.session.add_all(vehicles)
+    db.session.commit()
+    start_time = datetime.utcnow() + timedelta(hours=1)
+    end_time = start_time + timedelta(hours=2)
+    center = (34.05, -118.24)
+
+    def expected():
+        return sorted(v.id for v in Vehicle.query.all()
+                      if v.latitude and calculate_distance(center, (v.latitude, v.longitude)) <= 10)
+
+    assert sorted(v.id for v in find_available_vehicles(start_time, end_time, center)) == expected()
+
+    # Moved and deleted vehicles are picked up (by triggers for the R*Tree)
+    vehicles[0].latitude, vehicles[0].longitude = center
+    vehicles[1].latitude, vehicles[1].longitude = 40.7128, -74.0060
+    db.session.delete(vehicles[2])
+    db.session.commit()
+    assert sorted(v.id for v in find_available_vehicles(start_time, end_time, center)) == expected()
+
+    found, _ = find_nearest_vehicles(start_time, end_time, center, k=5)
+    assert found[0][0].id == vehicles[0].id
+    assert [d for _, d in found] == sorted(d for _, d in found)
+
+
+def test_rtree_backend_uses_virtual_table(app, test_vehicle, capture_select, explain):
+    app.config['GEO_BACKEND'] = 'rtree'
+    start_time = datetime.utcnow() + timedelta(hours=1)
+    end_time = start_time + timedelta(hours=2)
+    vehicle = db.session.get(Vehicle, test_vehicle)
+    vehicle.latitude, vehicle.longitude = 34.06, -118.25
+    db.session.commit()
+
+    statement, parameters = capture_select(
+        'vehicles', lambda: find_available_vehicles(start_time, end_time, (34.0522, -118.2437))
+    )
+    assert 'VIRTUAL TABLE INDEX' in explain(statement, parameters)
+
+
+def test_postgis_backend_pushes_radius_into_st_dwithin(app, test_detailing_provider):
+    from sqlalchemy.dialects import postgresql
+    from services.geo import PROVIDERS, VEHICLES
+    from utils.geoutils.backends import get_backend
+    backend = get_backend('postgis', db.session)
+
+    within = str(backend.within(VEHICLES, [(34.05, -118.24)], 10).compile(dialect=postgresql.dialect()))
+    assert 'ST_DWithin(geography(ST_MakePoint(vehicles.longitude, vehicles.latitude))' in within
+    covering = backend.covering(PROVIDERS, (34.05, -118.24)).compile(dialect=postgresql.dialect())
+    # The largest radius (20 km) is a constant the GiST index can use; each
+    # provider's own radius is rechecked on the rows it finds
+    assert 'users.service_radius_km' in str(covering)
+    assert pytest.approx(20000, rel=1e-5) in covering.params.values()
+
+    with pytest.raises(ValueError):
+        get_backend('quadtree', db.session)
@@ -0,0 +1,118 @@
+import pytest
+from datetime import date, datetime
+from decimal import Decimal
+from utils import jsonprovider
+from utils.jsonprovider import FastJSONProvider
+
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_json_provider_encodes_model_values(app, use_orjson):
+    if use_orjson and jsonprovider.orjson is None:
+        pytest.skip('orjson is not installed')
+    provider = FastJSONProvider(app, use_orjson=use_orjson)
+    payload = {
+        'price': Decimal('12.50'),
+        'start_time': datetime(2030, 6, 1, 8, 30, 0, 125000),
+        'day': date(2030, 6, 1),
+        'name': 'Détail',
+        'nested': [{'b': None, 'a': 1.5}]
+    }
+    expected = {
+        'price': 12.5,
+        'start_time': '2030-06-01T08:30:00.125000',
+        'day': '2030-06-01',
+        'name': 'Détail',
+        'nested': [{'a': 1.5, 'b': None}]
+    }
+    assert provider.loads(provider.dumps(payload)) == expected
+
+    with app.test_request_context():
+        response = provider.response(payload)
+    assert response.mimetype == 'application/json'
+    assert provider.loads(response.get_data()) == expected
+    # Keys come out sorted, as with Flask's default provider
+    assert response.get_data(as_text=True).index('"day"') < response.get_data(as_text=True).index('"name"')
+
+
+def test_vehicle_rates_serialize_as_numbers(client, test_vehicle):
+    response = client.get(f'/vehicles/{test_vehicle}')
+    assert response.status_code == 200
+    assert response.json['rates'] == {'daily': 50.0, 'hourly': 10.0}
+
+
+def test_read_models_serialize_like_models(client, app, test_vehicle, test_detailing_service):
+    from main import db
+    from models.read import DetailingServiceRecord, VehicleRecord
+    from models.service import DetailingService
+    from models.vehicle import Vehicle
+    vehicle = db.session.get(Vehicle, test_vehicle)
+    vehicle.latitude, vehicle.longitude = 34.0522, -118.2437
+    db.session.add(Vehicle(owner_id=vehicle.owner_id, make='Ford', model='Focus', year=2019, license_plate='XYZ789',
+                           vehicle_type='hatchback', seating_capacity=5, is_available=True, is_approved=False))
+    db.session.commit()
+
+    with app.test_request_context(headers={'Accept-Language': 'en'}):
+        expected_vehicles = [v.to_dict() for v in Vehicle.query.order_by(Vehicle.id)]
+        expected_services = [s.to_dict() for s in DetailingService.query.all()]
+        db.session.expunge_all()
+        vehicles = VehicleRecord.all()
+        services = DetailingServiceRecord.all()
+        # Records never enter the session
+        assert len(db.session.identity_map) == 0
+        assert sorted((v.to_dict() for v in vehicles), key=lambda v: v['id']) == expected_vehicles
+        assert [s.to_dict() for s in services] == expected_services
+
+    response = client.get('/vehicles/')
+    assert [v['id'] for v in response.json] == [test_vehicle]
+    assert response.json[0] == app.json.loads(app.json.dumps(expected_vehicles[0]))
+    assert client.get('/detailing/services').json == app.json.loads(app.json.dumps(expected_services))
+
+
+def test_list_endpoints_stream_the_same_json(client, app, test_driver):
+    from main import db
+    from models.vehicle import BusAgency, BusRoute, BusSeat, Vehicle
+    db.session.add_all([Vehicle(owner_id=test_driver, make='Make', model='Model', year=2020,
+                                license_plate=f'STREAM{i}', vehicle_type='sedan', seating_capacity=4,
+                                hourly_rate=10, is_available=True, is_approved=True) for i in range(7)])
+    agency = BusAgency(name='Agency', email='agency@example.com', phone='+1555', approved=True)
+    db.session.add(agency)
+    db.session.flush()
+    route = BusRoute(agency_id=agency.id, origin='A', destination='B', departure_time=datetime(2030, 6, 1, 8),
+                     available_seats=3, price=Decimal('12.50'))
+    db.session.add(route)
+    db.session.flush()
+    db.session.add_all([BusSeat(route_id=route.id, seat_number=str(i), is_booked=i == 0) for i in range(3)])
+    db.session.commit()
+
+    for url, params in [('/vehicles/', {}), ('/vehicles/bus/routes', {}), ('/vehicles/bus/seats', {'route_id': route.id})]:
+        buffered = client.get(url, query_string=params)
+        streamed = client.get(url, query_string=dict(params, stream='true'))
+        assert streamed.status_code == 200
+        assert streamed.is_streamed
+        assert streamed.json == buffered.json
+        assert len(streamed.json) > 0
+
+    from models.read import VehicleRecord
+    from utils.response import streamed_json_array
+    with app.test_request_context():
+        response = streamed_json_array(VehicleRecord.stream(batch_size=2), chunk_size=3)
+        chunks = list(response.response)
+    # Opening bracket first, then chunks of three items
+    assert chunks[0] == '['
+    assert len(chunks) == 5
+    assert [v['license_plate'] for v in app.json.loads(''.join(chunks))] == [f'STREAM{i}' for i in range(7)]
+
+
+def test_socketio_emits_use_the_app_json_provider(app):
+    import json
+    from main import socketio
+    assert json.loads(socketio.server.packet_class.json.dumps({'price': Decimal('1.50')})) == {'price': 1.5}
+
+
+def test_zero_rates_are_numbers(client, app, test_vehicle):
+    from main import db
+    from models.vehicle import Vehicle
+    vehicle = db.session.get(Vehicle, test_vehicle)
+    vehicle.daily_rate = Decimal('0.00')
+    db.session.commit()
+    assert client.get(f'/vehicles/{test_vehicle}').json['rates'] == {'daily': 0.0, 'hourly': 10.0}
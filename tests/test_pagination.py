@@ -0,0 +1,54 @@
+import pytest
+from datetime import datetime, timedelta
+from main import db
+from models.notification import Notification
+from models.vehicle import Vehicle
+from utils.pagination import decode_key, encode_key
+
+
+def test_vehicle_listing_keyset_pages(client, app, test_driver, walk):
+    created = datetime(2030, 1, 1)
+    # Several vehicles share a created_at, so the id has to break ties
+    db.session.add_all([Vehicle(owner_id=test_driver, make='Make', model='Model', year=2020,
+                                license_plate=f'PAGE{i}', vehicle_type='sedan', seating_capacity=4,
+                                is_available=True, is_approved=i != 3, created_at=created + timedelta(hours=i // 3))
+                        for i in range(8)])
+    db.session.commit()
+
+    pages = walk(client, '/vehicles/', per_page=3)
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [v['license_plate'] for page in pages for v in page] == [f'PAGE{i}' for i in range(8) if i != 3]
+
+    response = client.get('/vehicles/', query_string={'per_page': 2, 'total': 'true'})
+    assert response.json['data']['pagination']['total'] == 7
+    assert client.get('/vehicles/', query_string={'cursor': 'not-a-cursor'}).status_code == 400
+    # Without pagination parameters the plain list is unchanged
+    assert len(client.get('/vehicles/').json) == 7
+
+
+def test_notifications_page_newest_first(client, app, test_user, walk):
+    start = datetime(2030, 1, 1)
+    db.session.add_all([Notification(user_id=test_user, title=f'N{i}', message='Hello', notification_type='alert',
+                                     created_at=start + timedelta(minutes=i)) for i in range(5)])
+    db.session.commit()
+    token = client.post('/auth/login', json={'email': 'test@example.com', 'password': 'testpass'}).json['access_token']
+
+    pages = walk(client, '/notifications/', headers={'Authorization': f'Bearer {token}'}, per_page=2)
+    assert [n['title'] for page in pages for n in page] == ['N4', 'N3', 'N2', 'N1', 'N0']
+
+
+def test_keyset_cursor_round_trip():
+    key = (Vehicle.created_at, Vehicle.id)
+    values = (datetime(2030, 1, 1, 8, 30, 0, 5), 42)
+    assert decode_key(encode_key(values), key) == values
+    with pytest.raises(ValueError):
+        decode_key(encode_key(['yesterday', 42]), key)
+    with pytest.raises(ValueError):
+        decode_key(encode_key([42]), key)
+
+
+def test_vehicle_page_query_seeks_on_index(app, test_driver, capture_select, explain):
+    from models.read import VehicleRecord
+    cursor = encode_key((datetime(2030, 1, 1), 5))
+    statement, parameters = capture_select('vehicles', lambda: VehicleRecord.page(per_page=10, cursor=cursor))
+    assert 'ix_vehicles_created_at_id' in explain(statement, parameters)
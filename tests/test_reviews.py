@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+from main import db
+from models.review import Review
+
+
+def test_review_pages_load_relationships_in_one_query(client, app, test_user, test_vehicle,
+                                                      test_detailing_provider, query_counter, walk):
+    created = datetime(2030, 1, 1)
+    db.session.add_all([Review(booking_id=i + 1, reviewer_id=test_user, target_id=test_detailing_provider,
+                               vehicle_id=test_vehicle if i % 2 else None, rating=i % 5 + 1,
+                               review_type='detailing', created_at=created + timedelta(hours=i // 2))
+                        for i in range(25)])
+    db.session.commit()
+    expected = [r.to_dict() for r in Review.query.order_by(Review.created_at.desc(), Review.id.desc())]
+    expected = app.json.loads(app.json.dumps(expected))
+    db.session.expire_all()
+
+    query_counter.clear()
+    pages = walk(client, f'/reviews/users/{test_detailing_provider}', per_page=10)
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert [r for page in pages for r in page] == expected
+    # One query per page, with reviewers, targets and vehicles joined in
+    assert len(query_counter) == 3
+
+    pages = walk(client, f'/reviews/vehicles/{test_vehicle}')
+    assert [r['id'] for r in pages[0]] == [r['id'] for r in expected if r['vehicle']]
+
+    response = client.get(f'/reviews/users/{test_detailing_provider}', query_string={'cursor': 'bogus'})
+    assert response.status_code == 400
@@ -0,0 +1,86 @@
+import json
+from utils.translation import parse_translations, translate_field
+
+
+def test_translate_field_parses_each_value_once():
+    parse_translations.cache_clear()
+    blob = '{"en": "Basic Wash", "fr": "Lavage simple"}'
+    assert translate_field(blob, 'fr') == 'Lavage simple'
+    assert translate_field(blob, 'de') == 'Basic Wash'
+    assert translate_field(blob, 'en') == 'Basic Wash'
+    assert parse_translations.cache_info().misses == 1
+
+    # Plain strings and other JSON values come back untouched, without a parse
+    assert translate_field('Exterior wash', 'fr') == 'Exterior wash'
+    assert translate_field('2024', 'fr') == '2024'
+    assert translate_field(None, 'fr') is None
+    assert translate_field('{not json', 'fr') == '{not json'
+    assert parse_translations.cache_info().misses == 2
+
+
+def load_migration():
+    import importlib.util
+    from pathlib import Path
+    path = Path(__file__).parent.parent / 'migrations' / 'versions' / 'f4b8d2e6a915_add_translations_table.py'
+    spec = importlib.util.spec_from_file_location('translations_migration', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_migration_splits_translation_blobs():
+    import sqlalchemy as sa
+    from alembic.migration import MigrationContext
+    from alembic.operations import Operations
+    migration = load_migration()
+    engine = sa.create_engine('sqlite://')
+    with engine.begin() as connection:
+        connection.exec_driver_sql('CREATE TABLE detailing_services (id INTEGER PRIMARY KEY, name TEXT, description TEXT)')
+        connection.exec_driver_sql('CREATE TABLE notifications (id INTEGER PRIMARY KEY, title TEXT, message TEXT)')
+        connection.exec_driver_sql(
+            """INSERT INTO detailing_services VALUES (1, '{"en": "Wash", "fr": "Lavage", "es": "Lavado"}', 'Plain')""")
+        connection.exec_driver_sql("""INSERT INTO notifications VALUES (1, 'Hi', '{"fr": "Bonjour"}')""")
+
+        operations = Operations(MigrationContext.configure(connection))
+        with Operations.context(operations.migration_context):
+            migration.upgrade()
+        assert connection.exec_driver_sql('SELECT name, description FROM detailing_services').one() == ('Wash', 'Plain')
+        assert connection.exec_driver_sql('SELECT title, message FROM notifications').one() == ('Hi', 'Bonjour')
+        assert sorted(connection.exec_driver_sql('SELECT entity, entity_id, field, lang, value FROM translations')) == [
+            ('detailing_services', 1, 'name', 'es', 'Lavado'),
+            ('detailing_services', 1, 'name', 'fr', 'Lavage'),
+            # Blobs without the default language fall back to their first text
+            ('notifications', 1, 'message', 'fr', 'Bonjour'),
+        ]
+
+        with Operations.context(operations.migration_context):
+            migration.downgrade()
+        name = connection.exec_driver_sql('SELECT name FROM detailing_services').scalar()
+        assert json.loads(name) == {'en': 'Wash', 'fr': 'Lavage', 'es': 'Lavado'}
+
+
+def test_list_endpoints_load_one_language(client, app, test_user, test_detailing_service, query_counter):
+    from main import db
+    from models.notification import Notification
+    from models.service import DetailingService
+    from models.translation import Translation, store_translations
+    service = db.session.get(DetailingService, test_detailing_service)
+    store_translations(service, name={'en': 'Basic Wash', 'fr': 'Lavage simple', 'de': 'Einfache Wäsche'})
+    for i in range(5):
+        store_translations(Notification(user_id=test_user, notification_type='alert'),
+                           title={'en': f'Booked {i}', 'fr': f'Réservé {i}'}, message='Details')
+    db.session.commit()
+    assert service.name == 'Basic Wash'
+    assert Translation.query.count() == 7
+
+    assert client.get('/detailing/services', headers={'Accept-Language': 'fr'}).json[0]['name'] == 'Lavage simple'
+    assert client.get('/detailing/services', headers={'Accept-Language': 'de'}).json[0]['name'] == 'Einfache Wäsche'
+    assert client.get('/detailing/services', headers={'Accept-Language': 'es'}).json[0]['name'] == 'Basic Wash'
+
+    token = client.post('/auth/login', json={'email': 'test@example.com', 'password': 'testpass'}).json['access_token']
+    query_counter.clear()
+    response = client.get('/notifications/', headers={'Authorization': f'Bearer {token}', 'Accept-Language': 'fr'})
+    assert sorted(n['title'] for n in response.json) == [f'Réservé {i}' for i in range(5)]
+    # Only the French rows of the listed notifications, in one query
+    translation_queries = [q for q in query_counter if 'translations' in q]
+    assert len(translation_queries) == 1
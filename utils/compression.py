@@ -0,0 +1,133 @@
+import gzip
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript'}
+
+
+class CompressedCache:
+    """Thread-safe LRU of (mimetype, compressed body) pairs keyed by (ETag, encoding)"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[str, bytes]]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Tuple[str, str]) -> Optional[Tuple[str, bytes]]:
+        with self.lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: Tuple[str, str], entry: Tuple[str, bytes]) -> None:
+        with self.lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class CompressionSettings:
+    """Compression settings and compressed-body cache of one app, read from its config"""
+
+    def __init__(self, config):
+        self.min_size = config.get('COMPRESS_MIN_SIZE', 500)
+        self.gzip_level = config.get('COMPRESS_GZIP_LEVEL', 6)
+        self.brotli_quality = config.get('COMPRESS_BROTLI_QUALITY', 4)
+        self.cache = CompressedCache(config.get('COMPRESS_CACHE_SIZE', 256))
+        self.encodings = ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def negotiate(settings: CompressionSettings) -> Optional[str]:
+    """Return the encoding to use for the current request, or None"""
+    accepted = request.accept_encodings
+    for encoding in settings.encodings:
+        if accepted[encoding]:
+            return encoding
+    return None
+
+
+def cached_response(tag: str):
+    """
+    Return a response with the compressed body cached under tag for the
+    current request's encoding, or None when there is none. Endpoints with
+    an ETag check it before building their body, so a cached representation
+    is neither rendered nor serialized again.
+    """
+    settings = current_app.extensions.get('compressor')
+    if settings is None:
+        return None
+    encoding = negotiate(settings)
+    if encoding is None:
+        return None
+    entry = settings.cache.get((tag, encoding))
+    if entry is None:
+        return None
+    mimetype, body = entry
+    response = current_app.response_class(body, mimetype=mimetype)
+    response.headers['Content-Encoding'] = encoding
+    response.set_etag(tag, weak=True)
+    return response
+
+
+class Compressor:
+    """
+    Compresses responses with brotli (when installed) or gzip, as negotiated
+    from Accept-Encoding. Bodies shorter than COMPRESS_MIN_SIZE, streamed
+    responses and non-text types go out as they are. Responses carrying an
+    ETag are cacheable, so their compressed bodies are kept in an LRU keyed
+    by ETag and encoding and each catalog version is compressed once (see
+    cached_response). The ETag of a compressed response is made weak, since
+    the bytes differ from the identity encoding; If-None-Match still matches
+    it. Each app's settings and cache live in app.extensions['compressor'].
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        app.extensions['compressor'] = CompressionSettings(app.config)
+        app.after_request(self.after_request)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        settings = current_app.extensions['compressor']
+        if encoding == 'br':
+            return brotli.compress(body, quality=settings.brotli_quality)
+        return gzip.compress(body, compresslevel=settings.gzip_level, mtime=0)
+
+    def after_request(self, response):
+        response.vary.add('Accept-Encoding')
+        if (response.status_code < 200 or response.status_code >= 300 or response.status_code == 204
+                or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+        settings = current_app.extensions['compressor']
+        encoding = negotiate(settings)
+        if encoding is None:
+            return response
+        body = response.get_data()
+        if len(body) < settings.min_size:
+            return response
+
+        tag, weak = response.get_etag()
+        compressed = self.compress(body, encoding)
+        if tag is not None:
+            settings.cache.put((tag, encoding), (response.mimetype, compressed))
+            response.set_etag(tag, weak=True)
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,36 @@
+import base64
+import json
+from typing import Any, List, Sequence
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encode the sort key of the last item on a page as an opaque cursor
+    Args:
+        values: JSON-serializable key values, e.g. (distance_km, id)
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps(list(values), separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor
+    Args:
+        cursor: Cursor string from a previous page
+        size: Number of key values the cursor must hold
+    Returns:
+        List of key values
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Invalid cursor')
+    return values
@@ -2,15 +2,32 @@ from functools import wraps
 from flask import request, jsonify
 from flask_jwt_extended import get_jwt, verify_jwt_in_request
 from datetime import datetime
+from hashlib import blake2b
+from services.roles import roles_current
+from utils.response import etag_response
+from utils.translation import get_current_lang
+from models.version import table_version, version_query
+from main import db
 import re
 
 def role_required(*roles):
-    """Decorator to require specific user roles"""
+    """
+    Decorator to require specific user roles
+    Roles come from the token's claims; tokens issued before the user's
+    roles last changed are refused until refreshed. A database trigger bumps
+    role_version on every role change, ORM, bulk or raw SQL alike. Revoking a
+    role through this worker's session applies here at once; other workers
+    and writes outside the ORM session are seen only when the version index
+    is rebuilt, so a revoked token keeps working there for up to
+    ROLE_VERSION_MAX_AGE seconds (30 by default).
+    """
     def wrapper(fn):
         @wraps(fn)
         def decorator(*args, **kwargs):
             verify_jwt_in_request()
             claims = get_jwt()
+            if not roles_current(claims):
+                return jsonify({'message': 'Roles have changed, please refresh your token'}), 401
             if claims.get('roles') and any(role in claims['roles'] for role in roles):
                 return fn(*args, **kwargs)
             return jsonify({'message': 'Insufficient permissions'}), 403
@@ -50,4 +67,43 @@ def validate_input(schema):
                 
             return fn(*args, **kwargs)
         return decorator
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+def etag(model, criteria=None, depends_on=()):
+    """
+    Decorator answering conditional GETs of endpoints serving rows of model.
+    The strong ETag hashes the change counters (TableVersion) of model's
+    table and of the depends_on models' tables, the query string and the
+    language. Triggers bump the counters on every write, bulk and raw SQL
+    ones included, so the tag changes whenever a row is added, edited or
+    deleted; they only grow, so their sum changes with any of them. The
+    fingerprint is that one indexed sum; a request whose
+    If-None-Match matches gets a 304 without the view running or the body
+    being serialized.
+    Args:
+        model: Model whose table is tracked with track_versions
+        criteria: Optional callable taking the view's keyword arguments and
+            returning the filters of the rows the response is built from
+        depends_on: Other tracked models the response is built from
+    """
+    tables = sorted(m.__tablename__ for m in (model, *depends_on))
+
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            if criteria:
+                # The counters and the row's existence in one query
+                version, found = db.session.query(
+                    version_query(tables), db.session.query(model).filter(*criteria(**kwargs)).exists()
+                ).one()
+                if not found:
+                    # Let the view answer for rows that do not exist
+                    return fn(*args, **kwargs)
+            else:
+                version = table_version(tables)
+
+            fingerprint = repr((tables, version, request.full_path, get_current_lang()))
+            tag = blake2b(fingerprint.encode(), digest_size=16).hexdigest()
+            return etag_response(tag, lambda: fn(*args, **kwargs))
+        return decorator
+    return wrapper
@@ -0,0 +1,56 @@
+from typing import Dict, FrozenSet, Iterable, Optional
+
+
+def _names(value: Optional[str]) -> Optional[FrozenSet[str]]:
+    if value is None:
+        return None
+    return frozenset(name.strip() for name in value.split(',') if name.strip())
+
+
+class FieldSelection:
+    """
+    Sparse fieldset requested by a client:
+        fields=id,location     top-level keys to keep
+        fields[vehicle]=id     keys to keep inside an embedded relationship
+        include=vehicle        relationships to embed (default: all of them)
+    An empty fields= or fields[vehicle]= selects all keys, as if it was left out.
+    Relationships that are not embedded are never loaded; serializers render
+    their foreign key (e.g. vehicle_id) instead.
+    """
+    __slots__ = ('fields', 'nested', 'include')
+
+    def __init__(self, fields: Optional[Iterable[str]] = None,
+                 nested: Optional[Dict[str, Iterable[str]]] = None,
+                 include: Optional[Iterable[str]] = None):
+        self.fields = frozenset(fields) if fields is not None else None
+        self.nested = {name: frozenset(keys) for name, keys in (nested or {}).items()}
+        self.include = frozenset(include) if include is not None else None
+
+    @classmethod
+    def from_args(cls, args) -> 'FieldSelection':
+        nested = {key[len('fields['):-1]: _names(value) for key, value in args.items()
+                  if key.startswith('fields[') and key.endswith(']')}
+        nested = {name: keys for name, keys in nested.items() if keys}
+        return cls(_names(args.get('fields')) or None, nested, _names(args.get('include')))
+
+    def __bool__(self) -> bool:
+        return self.fields is not None or bool(self.nested) or self.include is not None
+
+    def embedded(self, relationships: Iterable[str]) -> FrozenSet[str]:
+        """Return the relationships among `relationships` that should be embedded"""
+        embedded = frozenset(relationships)
+        if self.include is not None:
+            embedded &= self.include
+        if self.fields is not None:
+            embedded &= self.fields
+        return embedded
+
+    def apply(self, data: Dict) -> Dict:
+        """Drop the keys of a serialized dict (and its embedded dicts) that were not requested"""
+        if self.fields is not None:
+            data = {key: value for key, value in data.items()
+                    if key in self.fields or (key.endswith('_id') and key[:-3] in self.fields)}
+        for name, keys in self.nested.items():
+            if isinstance(data.get(name), dict):
+                data[name] = {key: value for key, value in data[name].items() if key in keys}
+        return data
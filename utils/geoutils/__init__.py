@@ -0,0 +1,98 @@
+import numpy as np
+from geopy.distance import great_circle
+from typing import Tuple, List, Dict, Optional, Sequence
+
+# Mean earth radius used by geopy's great_circle, so batch and pairwise distances agree
+EARTH_RADIUS_KM = 6371.009
+
+def calculate_distance(point1: Tuple[float, float], point2: Tuple[float, float]) -> float:
+    """Calculate distance between two (lat,lng) points in kilometers"""
+    return great_circle(point1, point2).km
+
+def haversine_distances(origin: Tuple[float, float],
+                        lats: Sequence[float],
+                        lngs: Sequence[float]) -> np.ndarray:
+    """
+    Calculate distances in kilometers from one (lat,lng) origin to N points
+    Args:
+        origin: (lat, lng) tuple
+        lats: N latitudes
+        lngs: N longitudes
+    Returns:
+        Array of N distances, in the order the points were given
+    """
+    lat1, lng1 = np.radians(origin[0]), np.radians(origin[1])
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    lng2 = np.radians(np.asarray(lngs, dtype=np.float64))
+
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def nearest_indices(origin: Tuple[float, float],
+                    lats: Sequence[float],
+                    lngs: Sequence[float],
+                    max_distance: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sort N points by distance from origin
+    Args:
+        origin: (lat, lng) tuple
+        lats: N latitudes
+        lngs: N longitudes
+        max_distance: Optional max distance in km
+    Returns:
+        (indices, distances) of the points within max_distance, nearest first
+    """
+    distances = haversine_distances(origin, lats, lngs)
+    indices = np.argsort(distances, kind='stable')
+    if max_distance is not None:
+        indices = indices[distances[indices] <= max_distance]
+    return indices, distances[indices]
+
+def radius_filter(origin: Tuple[float, float],
+                  lats: Sequence[float],
+                  lngs: Sequence[float],
+                  radius_km) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the points within radius_km of origin
+    Args:
+        origin: (lat, lng) tuple
+        lats: N latitudes
+        lngs: N longitudes
+        radius_km: Radius in km, or an array of N per-point radii
+    Returns:
+        (indices, distances) of the matching points, in input order
+    """
+    distances = haversine_distances(origin, lats, lngs)
+    indices = np.flatnonzero(distances <= np.asarray(radius_km, dtype=np.float64))
+    return indices, distances[indices]
+
+def is_within_radius(base_point: Tuple[float, float],
+                    check_point: Tuple[float, float],
+                    radius_km: float) -> bool:
+    """Check if a point is within given radius of base point"""
+    return bool(haversine_distances(base_point, [check_point[0]], [check_point[1]])[0] <= radius_km)
+
+def find_nearest(point: Tuple[float, float],
+                locations: List[Dict],
+                max_distance: Optional[float] = None) -> List[Dict]:
+    """
+    Find nearest locations to a point
+    Args:
+        point: (lat, lng) tuple
+        locations: List of dicts with 'lat' and 'lng' keys
+        max_distance: Optional max distance in km
+    Returns:
+        List of locations sorted by distance with distance added
+    """
+    located = [loc for loc in locations if 'lat' in loc and 'lng' in loc]
+    if not located:
+        return []
+
+    indices, distances = nearest_indices(
+        point,
+        [loc['lat'] for loc in located],
+        [loc['lng'] for loc in located],
+        max_distance
+    )
+    return [dict(located[i], distance_km=float(d)) for i, d in zip(indices.tolist(), distances.tolist())]
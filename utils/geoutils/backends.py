@@ -0,0 +1,242 @@
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+from sqlalchemy import and_, column, false, func, or_, select, table, text
+from utils.geoutils import radius_filter
+from utils.spatial import bounding_box, within_bounding_box
+
+# Slack added to database radius checks so that rounding never drops a point
+# the exact great-circle check would keep; callers always recheck exactly
+RADIUS_SLACK = 1e-6
+
+
+class GeoLayer:
+    """
+    A table of points searched by location.
+    Args:
+        id_column: Primary key column
+        lat_column: Latitude column
+        lng_column: Longitude column
+        radius_column: Optional per-row coverage radius column, in km
+        criteria: Filters selecting the rows that belong to the layer
+        index: Optional callable returning the in-memory index of the layer,
+            with within_radius(location, radius_km) and covering(location)
+    """
+
+    def __init__(self, id_column, lat_column, lng_column, radius_column=None,
+                 criteria=(), index: Optional[Callable] = None):
+        self.id_column = id_column
+        self.lat_column = lat_column
+        self.lng_column = lng_column
+        self.radius_column = radius_column
+        self.criteria = tuple(criteria)
+        self.index = index
+
+    @property
+    def table_name(self) -> str:
+        return self.id_column.table.name
+
+
+class GeoBackend:
+    """
+    Turns radius and coverage searches into SQL filters on a layer's table.
+    Filters may match a superset of the rows within range: callers compute
+    exact great-circle distances (radius_filter) for the rows they load.
+    """
+    name = None
+
+    def __init__(self, session):
+        self.session = session
+
+    def within(self, layer: GeoLayer, locations: List[Tuple[float, float]], radius_km: float):
+        """Filter for rows that may lie within radius_km of any of the locations"""
+        raise NotImplementedError
+
+    def covering(self, layer: GeoLayer, location: Tuple[float, float]):
+        """Filter for rows whose coverage radius may contain location"""
+        raise NotImplementedError
+
+    def distances(self, layer: GeoLayer, location: Tuple[float, float], radius_km: float) -> Dict[Hashable, float]:
+        """Return {id: distance_km} for the located rows within radius_km of location"""
+        rows = self.session.query(layer.id_column, layer.lat_column, layer.lng_column).filter(
+            *layer.criteria,
+            self.within(layer, [location], radius_km)
+        ).all()
+        # Rows without location data are never search results
+        rows = [row for row in rows if row[1] and row[2]]
+        if not rows:
+            return {}
+        ids, lats, lngs = zip(*rows)
+        indices, found = radius_filter(location, lats, lngs, radius_km)
+        return {ids[i]: d for i, d in zip(indices.tolist(), found.tolist())}
+
+    def _max_radius(self, layer: GeoLayer) -> Optional[float]:
+        return self.session.query(func.max(layer.radius_column)).filter(*layer.criteria).scalar()
+
+
+class PythonBackend(GeoBackend):
+    """Answers searches from the layer's in-memory grid index"""
+    name = 'python'
+
+    def within(self, layer, locations, radius_km):
+        index = layer.index()
+        ids = set().union(*[index.within_radius(location, radius_km) for location in locations])
+        return layer.id_column.in_(ids) if ids else false()
+
+    def covering(self, layer, location):
+        ids = layer.index().covering(location)
+        return layer.id_column.in_(ids) if ids else false()
+
+    def distances(self, layer, location, radius_km):
+        return layer.index().within_radius(location, radius_km)
+
+
+class SQLBackend(GeoBackend):
+    """Bounding-box filters on the latitude/longitude columns, for any database"""
+    name = 'sql'
+
+    def within(self, layer, locations, radius_km):
+        return or_(*[
+            within_bounding_box(layer.lat_column, layer.lng_column, location, radius_km)
+            for location in locations
+        ])
+
+    def covering(self, layer, location):
+        # No row further away than the largest radius can cover the location
+        max_radius = self._max_radius(layer)
+        if max_radius is None:
+            return false()
+        return within_bounding_box(layer.lat_column, layer.lng_column, location, max_radius)
+
+
+class RTreeBackend(GeoBackend):
+    """
+    SQLite R*Tree lookups. Each layer table has a `<table>_rtree` virtual table
+    kept in sync by triggers (see rtree_statements).
+    """
+    name = 'rtree'
+
+    def _rtree(self, layer):
+        return table(f'{layer.table_name}_rtree', column('id'), column('min_lat'),
+                     column('max_lat'), column('min_lng'), column('max_lng'))
+
+    def _box_ids(self, rtree, center, radius_km):
+        min_lat, max_lat, min_lng, max_lng = bounding_box(center, radius_km)
+        clause = and_(rtree.c.max_lat >= min_lat, rtree.c.min_lat <= max_lat)
+        if max_lng - min_lng < 360.0:
+            # Boxes crossing the antimeridian are split in two
+            if min_lng < -180.0:
+                lng_clause = or_(rtree.c.max_lng >= min_lng + 360.0, rtree.c.min_lng <= max_lng)
+            elif max_lng > 180.0:
+                lng_clause = or_(rtree.c.max_lng >= min_lng, rtree.c.min_lng <= max_lng - 360.0)
+            else:
+                lng_clause = and_(rtree.c.max_lng >= min_lng, rtree.c.min_lng <= max_lng)
+            clause = and_(clause, lng_clause)
+        return select(rtree.c.id).where(clause)
+
+    def within(self, layer, locations, radius_km):
+        rtree = self._rtree(layer)
+        return or_(*[layer.id_column.in_(self._box_ids(rtree, location, radius_km)) for location in locations])
+
+    def covering(self, layer, location):
+        max_radius = self._max_radius(layer)
+        if max_radius is None:
+            return false()
+        return layer.id_column.in_(self._box_ids(self._rtree(layer), location, max_radius))
+
+
+class PostGISBackend(GeoBackend):
+    """
+    PostGIS ST_DWithin on geography points, which can use a GiST index on
+    geography(ST_MakePoint(longitude, latitude)). Distances are measured on
+    the sphere to match the exact check.
+    """
+    name = 'postgis'
+
+    def _point(self, lat, lng):
+        return func.geography(func.ST_MakePoint(lng, lat))
+
+    def within(self, layer, locations, radius_km):
+        point = self._point(layer.lat_column, layer.lng_column)
+        meters = radius_km * 1000 * (1 + RADIUS_SLACK)
+        return or_(*[
+            func.ST_DWithin(point, self._point(*location), meters, False)
+            for location in locations
+        ])
+
+    def covering(self, layer, location):
+        # A constant radius lets the GiST index find the rows within the
+        # largest coverage radius; each row's own radius is checked on those
+        max_radius = self._max_radius(layer)
+        if max_radius is None:
+            return false()
+        point = self._point(layer.lat_column, layer.lng_column)
+        center = self._point(*location)
+        return and_(
+            func.ST_DWithin(point, center, max_radius * 1000 * (1 + RADIUS_SLACK), False),
+            func.ST_DWithin(point, center, layer.radius_column * 1000 * (1 + RADIUS_SLACK), False)
+        )
+
+
+BACKENDS = {backend.name: backend for backend in (PythonBackend, SQLBackend, RTreeBackend, PostGISBackend)}
+
+
+def get_backend(name: str, session) -> GeoBackend:
+    """
+    Create the geo backend called name
+    Raises:
+        ValueError: If there is no such backend
+    """
+    try:
+        return BACKENDS[name](session)
+    except KeyError:
+        raise ValueError(f'Unknown geo backend: {name}') from None
+
+
+def default_backend_name(session) -> str:
+    """
+    Name of the backend using the database's own spatial engine: rtree on
+    SQLite, postgis on PostgreSQL with the extension installed and sql (the
+    bounding-box filters) on anything else
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        return 'rtree'
+    if dialect == 'postgresql':
+        has_postgis = session.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'postgis'")).scalar()
+        return 'postgis' if has_postgis else 'sql'
+    return 'sql'
+
+
+def rtree_statements(table_name: str, id_column: str = 'id',
+                     lat_column: str = 'latitude', lng_column: str = 'longitude') -> List[str]:
+    """
+    SQLite statements creating a table's R*Tree, the triggers keeping it in
+    sync and filling it with the rows already in the table
+    """
+    rtree = f'{table_name}_rtree'
+    located = f'NEW.{lat_column} IS NOT NULL AND NEW.{lng_column} IS NOT NULL'
+    point = f'NEW.{id_column}, NEW.{lat_column}, NEW.{lat_column}, NEW.{lng_column}, NEW.{lng_column}'
+    return [
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {rtree} USING rtree(id, min_lat, max_lat, min_lng, max_lng)',
+        f'CREATE TRIGGER IF NOT EXISTS {rtree}_insert AFTER INSERT ON {table_name} WHEN {located} '
+        f'BEGIN INSERT OR REPLACE INTO {rtree} VALUES ({point}); END',
+        f'CREATE TRIGGER IF NOT EXISTS {rtree}_update AFTER UPDATE OF {lat_column}, {lng_column} ON {table_name} '
+        f'BEGIN DELETE FROM {rtree} WHERE id = OLD.{id_column}; '
+        f'INSERT INTO {rtree} SELECT {point} WHERE {located}; END',
+        f'CREATE TRIGGER IF NOT EXISTS {rtree}_delete AFTER DELETE ON {table_name} '
+        f'BEGIN DELETE FROM {rtree} WHERE id = OLD.{id_column}; END',
+        f'INSERT OR REPLACE INTO {rtree} SELECT {id_column}, {lat_column}, {lat_column}, {lng_column}, {lng_column} '
+        f'FROM {table_name} WHERE {lat_column} IS NOT NULL AND {lng_column} IS NOT NULL',
+    ]
+
+
+def install_rtree(target, connection, **kw) -> None:
+    """after_create listener adding the R*Tree of a table on SQLite"""
+    if connection.dialect.name == 'sqlite':
+        for statement in rtree_statements(target.name):
+            connection.exec_driver_sql(statement)
+
+
+def drop_rtree(target, connection, **kw) -> None:
+    """after_drop listener removing the R*Tree of a table on SQLite"""
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql(f'DROP TABLE IF EXISTS {target.name}_rtree')
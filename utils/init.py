@@ -13,6 +13,9 @@ __all__ = [
     'calculate_distance',
     'is_within_radius',
     'find_nearest',
+    'haversine_distances',
+    'nearest_indices',
+    'radius_filter',
     
     # Time utils
     'parse_datetime',
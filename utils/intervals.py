@@ -0,0 +1,101 @@
+from bisect import bisect_left
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+
+class _KeyIntervals:
+    """Intervals of one key sorted by start, with a running max of end times"""
+    __slots__ = ('entries', 'starts', 'max_ends')
+
+    def __init__(self):
+        self.entries: List[Tuple] = []  # (start, end, item_id)
+        self.starts: List = []
+        self.max_ends: List = []
+
+    def _reindex(self, position: int) -> None:
+        self.starts[position:] = [e[0] for e in self.entries[position:]]
+        running = self.max_ends[position - 1] if position else None
+        max_ends = []
+        for _, end, _ in self.entries[position:]:
+            running = end if running is None or end > running else running
+            max_ends.append(running)
+        self.max_ends[position:] = max_ends
+
+    def add(self, start, end, item_id) -> None:
+        entry = (start, end, item_id)
+        position = bisect_left(self.entries, entry)
+        self.entries.insert(position, entry)
+        self._reindex(position)
+
+    def remove(self, start, end, item_id) -> None:
+        position = self.entries.index((start, end, item_id))
+        del self.entries[position]
+        self._reindex(position)
+
+    def overlaps(self, start, end) -> bool:
+        # Entries before `count` start before the window ends; one of them
+        # overlaps if the latest end among them is after the window starts
+        count = bisect_left(self.starts, end)
+        return count > 0 and self.max_ends[count - 1] > start
+
+
+class IntervalIndex:
+    """
+    Half-open [start, end) intervals grouped by key (e.g. a vehicle id).
+    Checking a key for overlap with a window is O(log n) in its interval count.
+    """
+
+    def __init__(self):
+        self._keys: Dict[Hashable, _KeyIntervals] = {}
+        self._items: Dict[Hashable, Tuple[Hashable, object, object]] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item_id: Hashable) -> bool:
+        return item_id in self._items
+
+    def get(self, item_id: Hashable) -> Optional[Tuple[Hashable, object, object]]:
+        """Return (key, start, end) for an item"""
+        return self._items.get(item_id)
+
+    def items(self):
+        return self._items.items()
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self._items.clear()
+
+    def load(self, items: Iterable[Tuple[Hashable, Hashable, object, object]]) -> None:
+        """Replace the contents with (item_id, key, start, end) items, sorting each key's intervals once"""
+        self.clear()
+        for item_id, key, start, end in items:
+            self._keys.setdefault(key, _KeyIntervals()).entries.append((start, end, item_id))
+            self._items[item_id] = (key, start, end)
+        for intervals in self._keys.values():
+            intervals.entries.sort()
+            intervals._reindex(0)
+
+    def add(self, item_id: Hashable, key: Hashable, start, end) -> None:
+        """Add or move an item's interval"""
+        self.remove(item_id)
+        self._keys.setdefault(key, _KeyIntervals()).add(start, end, item_id)
+        self._items[item_id] = (key, start, end)
+
+    def remove(self, item_id: Hashable) -> None:
+        found = self._items.pop(item_id, None)
+        if found is None:
+            return
+        key, start, end = found
+        intervals = self._keys[key]
+        intervals.remove(start, end, item_id)
+        if not intervals.entries:
+            del self._keys[key]
+
+    def overlaps(self, key: Hashable, start, end) -> bool:
+        """Check if any interval of key overlaps [start, end)"""
+        intervals = self._keys.get(key)
+        return intervals is not None and intervals.overlaps(start, end)
+
+    def overlapping_keys(self, keys: Iterable[Hashable], start, end) -> Set[Hashable]:
+        """Return the keys among `keys` with an interval overlapping [start, end)"""
+        return {key for key in keys if self.overlaps(key, start, end)}
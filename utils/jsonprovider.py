@@ -0,0 +1,65 @@
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Encode the types models hand over as-is: Decimal as a number, dates in ISO 8601"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    return DefaultJSONProvider.default(obj)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider encoding with orjson when it is installed and the standard
+    library otherwise. Both encode Decimal values as numbers and dates and
+    datetimes in ISO 8601, so to_dict() methods can return column values
+    unconverted. SocketIO emits go through it as well (see create_app).
+    Keys are sorted and debug responses indented, like Flask's default
+    provider.
+    """
+
+    def __init__(self, app, use_orjson: bool = True):
+        super().__init__(app)
+        self.use_orjson = use_orjson and orjson is not None
+
+    def _orjson_options(self, indent: bool = False) -> int:
+        options = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if self.use_orjson and not kwargs:
+            return orjson.dumps(obj, default=_default, option=self._orjson_options()).decode()
+        kwargs.setdefault('default', _default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        if self.use_orjson:
+            body = orjson.dumps(obj, default=_default, option=self._orjson_options(indent)) + b'\n'
+        else:
+            body = json.dumps(
+                obj, default=_default, ensure_ascii=self.ensure_ascii, sort_keys=self.sort_keys,
+                indent=2 if indent else None, separators=None if indent else (',', ':')
+            ) + '\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
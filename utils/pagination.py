@@ -0,0 +1,99 @@
+from datetime import date, datetime
+from typing import Any, Optional, Sequence, Tuple
+from sqlalchemy import and_, or_
+from utils.cursors import encode_cursor, decode_cursor
+
+DEFAULT_PER_PAGE = 20
+MAX_PER_PAGE = 100
+
+
+def wants_page(args) -> bool:
+    """Check if a request asked for a keyset page (?per_page= or ?cursor=)"""
+    return 'per_page' in args or 'cursor' in args
+
+
+def page_args(args, default: int = DEFAULT_PER_PAGE, maximum: int = MAX_PER_PAGE) -> Tuple[int, Optional[str]]:
+    """
+    Read per_page and cursor from request args
+    Returns:
+        (per_page, cursor) with per_page clamped to [1, maximum]
+    Raises:
+        ValueError: If per_page is not an integer
+    """
+    per_page = int(args.get('per_page', default))
+    return min(max(per_page, 1), maximum), args.get('cursor') or None
+
+
+def encode_key(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row on a page as a cursor"""
+    return encode_cursor([v.isoformat() if isinstance(v, (date, datetime)) else v for v in values])
+
+
+def decode_key(cursor: str, columns: Sequence) -> Tuple:
+    """
+    Decode a cursor into values of the key columns' Python types
+    Raises:
+        ValueError: If the cursor is malformed or does not match the columns
+    """
+    values = decode_cursor(cursor, len(columns))
+    decoded = []
+    for column, value in zip(columns, values):
+        python_type = column.type.python_type
+        try:
+            if python_type in (date, datetime):
+                decoded.append(python_type.fromisoformat(value))
+            else:
+                decoded.append(python_type(value))
+        except (TypeError, ValueError) as e:
+            raise ValueError('Invalid cursor') from e
+    return tuple(decoded)
+
+
+def after_key(columns: Sequence, values: Sequence, descending: bool = False):
+    """
+    Filter for rows sorted after values on columns. Spelled out as nested
+    comparisons rather than a row-value comparison so that every database
+    can match it against an index on the key columns.
+    """
+    column, *rest = columns
+    value, *rest_values = values
+    beyond = column < value if descending else column > value
+    if not rest:
+        return beyond
+    return or_(beyond, and_(column == value, after_key(rest, rest_values, descending)))
+
+
+def keyset_page(query, columns: Sequence, per_page: int, cursor: Optional[str] = None,
+                descending: bool = False):
+    """
+    Apply keyset (seek) pagination to a query whose rows carry the key columns
+    Args:
+        query: Select statement or ORM query
+        columns: Sort key columns, ending with a unique one (e.g. id)
+        per_page: Page size
+        cursor: Cursor of the previous page, or None for the first page
+        descending: Sort newest/highest first
+    Returns:
+        The query filtered past the cursor, ordered on the key and limited to
+        per_page + 1 rows; the extra row tells whether there is a next page
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if cursor:
+        query = query.where(after_key(columns, decode_key(cursor, columns), descending))
+    return query.order_by(*[c.desc() if descending else c.asc() for c in columns]).limit(per_page + 1)
+
+
+def split_page(rows: Sequence, per_page: int, key) -> Tuple[Sequence, Optional[str]]:
+    """
+    Split the rows fetched by a keyset_page query
+    Args:
+        rows: Up to per_page + 1 rows
+        per_page: Page size
+        key: Function returning the sort key values of a row
+    Returns:
+        (rows of the page, cursor of the next page or None on the last page)
+    """
+    if len(rows) > per_page:
+        return rows[:per_page], encode_key(key(rows[per_page - 1]))
+    return rows, None
@@ -0,0 +1,127 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import cached_property
+from typing import Dict, Tuple
+from flask import current_app, has_app_context, jsonify
+from werkzeug.security import generate_password_hash, check_password_hash
+
+DEFAULT_METHOD = 'pbkdf2:sha256:600000'
+
+_executors: Dict[Tuple[int, int], ProcessPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+class HashingBusy(Exception):
+    """Raised when the password hashing queue stays full for too long"""
+
+
+def hashing_busy(error):
+    """App-wide error handler answering HashingBusy with 503 and Retry-After"""
+    return jsonify({'message': 'Too many requests, please retry'}), 503, {'Retry-After': '1'}
+
+
+def _mp_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _executor(workers: int) -> ProcessPoolExecutor:
+    # One pool per process and size, created on first use so that gunicorn
+    # workers never inherit the master's pool. Pool workers come from a fork
+    # server (or are spawned where there is none): forking this threaded
+    # process could copy a lock another thread holds into the child.
+    key = (os.getpid(), workers)
+    executor = _executors.get(key)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(key)
+            if executor is None:
+                executor = _executors[key] = ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context())
+    return executor
+
+
+def _discard(executor: ProcessPoolExecutor) -> None:
+    # Forget a broken pool so that the next _executor() call starts a new one
+    with _executors_lock:
+        for key, known in list(_executors.items()):
+            if known is executor:
+                del _executors[key]
+    executor.shutdown(wait=False)
+
+
+class PasswordHasher:
+    """
+    Runs password key derivation in a process pool, so hashes are computed in
+    parallel across cores and request threads only wait on the result.
+    At most PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE hashes are in flight;
+    a request that cannot get a slot within PASSWORD_HASH_TIMEOUT seconds
+    raises HashingBusy. With PASSWORD_HASH_WORKERS = 0 hashes are computed
+    inline. New hashes use PASSWORD_HASH_METHOD. A pool whose worker died
+    (BrokenProcessPool) is replaced and the hash retried once.
+    """
+
+    def __init__(self, method: str = DEFAULT_METHOD, workers: int = 0, queue: int = 0, timeout: float = 5):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(workers + queue)
+
+    @classmethod
+    def from_config(cls, config) -> 'PasswordHasher':
+        return cls(
+            method=config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD),
+            workers=config.get('PASSWORD_HASH_WORKERS', 0),
+            queue=config.get('PASSWORD_HASH_QUEUE', 0),
+            timeout=config.get('PASSWORD_HASH_TIMEOUT', 5)
+        )
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        if not self.slots.acquire(timeout=self.timeout):
+            raise HashingBusy()
+        try:
+            executor = _executor(self.workers)
+            try:
+                return executor.submit(fn, *args).result()
+            except BrokenProcessPool:
+                _discard(executor)
+                return _executor(self.workers).submit(fn, *args).result()
+        finally:
+            self.slots.release()
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        return self._run(check_password_hash, pwhash, password)
+
+    @cached_property
+    def method_prefix(self) -> str:
+        """
+        Method string werkzeug writes in hashes made with self.method, with
+        the defaults of shorthands such as scrypt or pbkdf2 filled in. Found by
+        hashing a dummy password once.
+        """
+        return generate_password_hash('', self.method).split('$', 1)[0]
+
+    def needs_rehash(self, pwhash: str) -> bool:
+        """Check if a hash was made with other parameters than the configured method"""
+        return pwhash.split('$', 1)[0] != self.method_prefix
+
+
+def get_hasher() -> PasswordHasher:
+    """Return the current app's password hasher (an inline one outside an app context)"""
+    if not has_app_context():
+        return _inline
+    app = current_app._get_current_object()
+    hasher = app.extensions.get('password_hasher')
+    if hasher is None:
+        hasher = app.extensions.setdefault('password_hasher', PasswordHasher.from_config(app.config))
+    return hasher
+
+
+_inline = PasswordHasher()
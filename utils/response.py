@@ -1,5 +1,8 @@
-from flask import jsonify
-from typing import Any, Dict, List, Optional
+from flask import current_app, jsonify, make_response, request, stream_with_context
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from utils.compression import cached_response
+from utils.fields import FieldSelection
+from utils.pagination import page_args
 
 def success_response(data: Any = None, 
                     message: str = 'Success', 
@@ -23,17 +26,96 @@ def error_response(message: str = 'Error',
     }
     return jsonify(response), status_code
 
+def etag_response(tag: str, build: Callable[[], Any]):
+    """
+    Answer the current request for a representation tagged tag: 304 Not
+    Modified if If-None-Match matches, then a compressed body cached under
+    tag, otherwise the response build() returns. Responses other than 200
+    are returned untagged.
+    """
+    if request.if_none_match.contains_weak(tag):
+        response = current_app.response_class(status=304)
+        response.set_etag(tag)
+    else:
+        response = cached_response(tag)
+        if response is None:
+            response = make_response(build())
+            if response.status_code != 200:
+                return response
+            response.set_etag(tag)
+    response.vary.add('Accept-Language')
+    return response
+
 def paginated_response(items: List, 
-                      page: int, 
-                      per_page: int, 
-                      total: int) -> Dict:
-    """Standard paginated response format"""
-    return success_response({
-        'items': items,
-        'pagination': {
+                      page: Optional[int] = None, 
+                      per_page: Optional[int] = None, 
+                      total: Optional[int] = None,
+                      next_cursor: Optional[str] = None) -> Dict:
+    """
+    Standard paginated response format, for numbered pages or keyset cursors.
+    Without a page number the pagination block carries next_cursor (None on
+    the last page) and the total only when one was counted.
+    """
+    pagination = {'per_page': per_page}
+    if page is not None:
+        pagination.update({
             'page': page,
-            'per_page': per_page,
             'total': total,
             'pages': (total + per_page - 1) // per_page
-        }
-    })
\ No newline at end of file
+        })
+    else:
+        pagination['next_cursor'] = next_cursor
+        if total is not None:
+            pagination['total'] = total
+    return success_response({
+        'items': items,
+        'pagination': pagination
+    })
+
+def keyset_response(record_class, *criteria, descending: bool = False):
+    """
+    Paginated response holding one keyset page of read-model records, as
+    requested by the per_page, cursor and total=true query parameters and
+    trimmed to the fields query parameters
+    """
+    selection = FieldSelection.from_args(request.args)
+    try:
+        per_page, cursor = page_args(request.args)
+        records, next_cursor = record_class.page(
+            *criteria, per_page=per_page, cursor=cursor, descending=descending,
+            fields=selection.fields
+        )
+    except ValueError:
+        return jsonify({'message': 'Invalid pagination parameters'}), 400
+    
+    total = None
+    if request.args.get('total', 'false').lower() == 'true':
+        total = record_class.count(*criteria)
+    return paginated_response([selection.apply(r.to_dict()) for r in records], per_page=per_page,
+                              total=total, next_cursor=next_cursor)
+
+def streamed_json_array(items: Iterable,
+                        serialize: Callable[[Any], Any] = lambda item: item.to_dict(),
+                        chunk_size: int = 500):
+    """
+    Stream a JSON array, encoding items as they are pulled from the iterable.
+    The opening bracket is sent before the first item is fetched, and only
+    chunk_size encoded items are held at a time. An error raised mid-stream
+    truncates the array, since the status line has already been sent.
+    """
+    dumps = current_app.json.dumps
+
+    def generate():
+        yield '['
+        separator = ''
+        chunk = []
+        for item in items:
+            chunk.append(dumps(serialize(item)))
+            if len(chunk) >= chunk_size:
+                yield separator + ','.join(chunk)
+                separator, chunk = ',', []
+        if chunk:
+            yield separator + ','.join(chunk)
+        yield ']\n'
+
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/json')
@@ -0,0 +1,184 @@
+import math
+from collections import defaultdict
+from typing import Dict, Hashable, Iterator, List, Optional, Set, Tuple
+from sqlalchemy import and_, or_
+
+# Kilometres per degree of latitude on the sphere geopy's great_circle uses
+KM_PER_DEGREE = 6371.009 * math.pi / 180
+
+
+def bounding_box(center: Tuple[float, float], radius_km: float) -> Tuple[float, float, float, float]:
+    """
+    Return a (min_lat, max_lat, min_lng, max_lng) box that contains every point
+    within radius_km of center. Longitudes are not wrapped, so min_lng can be
+    below -180 or max_lng above 180 near the antimeridian.
+    """
+    lat, lng = center
+    lat_delta = radius_km / KM_PER_DEGREE
+    min_lat = max(lat - lat_delta, -90.0)
+    max_lat = min(lat + lat_delta, 90.0)
+
+    # The box is widest at the latitude furthest from the equator
+    widest_lat = max(abs(min_lat), abs(max_lat))
+    if widest_lat >= 90.0:
+        return min_lat, max_lat, -180.0, 180.0
+
+    lng_delta = lat_delta / math.cos(math.radians(widest_lat))
+    if lng_delta >= 180.0:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, lng - lng_delta, lng + lng_delta
+
+
+def within_bounding_box(lat_column, lng_column, center: Tuple[float, float], radius_km: float):
+    """
+    SQL filter keeping rows whose (lat_column, lng_column) fall in the bounding
+    box of a search circle. Longitude ranges crossing the antimeridian are split
+    in two so that both halves can still use an index.
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(center, radius_km)
+    lat_clause = lat_column.between(min_lat, max_lat)
+    if max_lng - min_lng >= 360.0:
+        return lat_clause
+    if min_lng < -180.0:
+        lng_clause = or_(lng_column >= min_lng + 360.0, lng_column <= max_lng)
+    elif max_lng > 180.0:
+        lng_clause = or_(lng_column >= min_lng, lng_column <= max_lng - 360.0)
+    else:
+        lng_clause = lng_column.between(min_lng, max_lng)
+    return and_(lat_clause, lng_clause)
+
+
+class GridIndex:
+    """
+    Fixed-size latitude/longitude grid mapping keys to points.
+    A radius query only visits the cells overlapping the circle's bounding box;
+    callers still compute exact distances for the keys it returns.
+    """
+
+    def __init__(self, cell_size_deg: float = 0.05):
+        self.cell_size = cell_size_deg
+        self._lng_cells = int(math.ceil(360.0 / cell_size_deg))
+        self._cells: Dict[Tuple[int, int], Set[Hashable]] = defaultdict(set)
+        self._points: Dict[Hashable, Tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._points
+
+    def _lat_cell(self, lat: float) -> int:
+        return int(math.floor((lat + 90.0) / self.cell_size))
+
+    def _lng_cell(self, lng: float) -> int:
+        return int(math.floor((lng + 180.0) / self.cell_size)) % self._lng_cells
+
+    def cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return self._lat_cell(lat), self._lng_cell(lng)
+
+    def get(self, key: Hashable) -> Optional[Tuple[float, float]]:
+        return self._points.get(key)
+
+    def insert(self, key: Hashable, lat: float, lng: float) -> None:
+        """Add key at (lat, lng), moving it if it is already indexed"""
+        self.remove(key)
+        self._points[key] = (lat, lng)
+        self._cells[self.cell(lat, lng)].add(key)
+
+    def remove(self, key: Hashable) -> None:
+        point = self._points.pop(key, None)
+        if point is None:
+            return
+        cell = self.cell(*point)
+        bucket = self._cells.get(cell)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._cells[cell]
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._points.clear()
+
+    def cells_for_box(self, min_lat: float, max_lat: float,
+                      min_lng: float, max_lng: float) -> Iterator[Tuple[int, int]]:
+        """Yield the grid cells overlapping a bounding box"""
+        lat_cells = range(self._lat_cell(min_lat), self._lat_cell(max_lat) + 1)
+        if max_lng - min_lng >= 360.0:
+            lng_cells = range(self._lng_cells)
+        else:
+            first = int(math.floor((min_lng + 180.0) / self.cell_size))
+            last = int(math.floor((max_lng + 180.0) / self.cell_size))
+            lng_cells = sorted({i % self._lng_cells for i in range(first, last + 1)})
+        for lat_cell in lat_cells:
+            for lng_cell in lng_cells:
+                yield lat_cell, lng_cell
+
+    def candidates(self, center: Tuple[float, float], radius_km: float) -> List[Tuple[Hashable, float, float]]:
+        """
+        Return (key, lat, lng) for every key in the cells overlapping the
+        search circle. This is a superset of the keys within radius_km.
+        """
+        results = []
+        for cell in self.cells_for_box(*bounding_box(center, radius_km)):
+            bucket = self._cells.get(cell)
+            if not bucket:
+                continue
+            for key in bucket:
+                lat, lng = self._points[key]
+                results.append((key, lat, lng))
+        return results
+
+
+class CoverageIndex:
+    """
+    Grid of coverage circles with a per-key radius.
+    Every cell overlapping a circle's bounding box is tagged with its key, so
+    the keys whose circles may contain a point are found with one cell lookup;
+    callers still check the exact distance against each key's radius.
+    """
+
+    def __init__(self, cell_size_deg: float = 0.1):
+        self._grid = GridIndex(cell_size_deg)
+        self._cells: Dict[Tuple[int, int], Set[Hashable]] = defaultdict(set)
+        self._circles: Dict[Hashable, Tuple[float, float, float, List[Tuple[int, int]]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._circles)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._circles
+
+    def insert(self, key: Hashable, lat: float, lng: float, radius_km: float) -> None:
+        """Add key's circle, replacing any previous one"""
+        self.remove(key)
+        cells = list(self._grid.cells_for_box(*bounding_box((lat, lng), radius_km)))
+        for cell in cells:
+            self._cells[cell].add(key)
+        self._circles[key] = (lat, lng, radius_km, cells)
+
+    def remove(self, key: Hashable) -> None:
+        circle = self._circles.pop(key, None)
+        if circle is None:
+            return
+        for cell in circle[3]:
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._cells[cell]
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._circles.clear()
+
+    def candidates(self, point: Tuple[float, float]) -> List[Tuple[Hashable, float, float, float]]:
+        """
+        Return (key, lat, lng, radius_km) for every circle tagged on the cell
+        containing point. This is a superset of the circles containing it.
+        """
+        results = []
+        for key in self._cells.get(self._grid.cell(*point), ()):
+            lat, lng, radius_km, _ = self._circles[key]
+            results.append((key, lat, lng, radius_km))
+        return results
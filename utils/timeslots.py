@@ -0,0 +1,178 @@
+import numpy as np
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Hashable, Iterable, Iterator, List, Set, Tuple
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+BYTES_PER_DAY = SLOTS_PER_DAY // 8
+
+
+def day_slots(start: datetime, end: datetime) -> Iterator[Tuple[date, int, int]]:
+    """
+    Split [start, end) into (day, first_slot, end_slot) ranges, rounding outwards
+    to whole slots, so any instant of the window falls in one of the slots
+    """
+    day = start.date()
+    while True:
+        midnight = datetime.combine(day, time.min)
+        first = int((start - midnight).total_seconds() // 60 // SLOT_MINUTES) if start > midnight else 0
+        minutes_to_end = (end - midnight).total_seconds() / 60
+        if minutes_to_end <= SLOTS_PER_DAY * SLOT_MINUTES:
+            last = int(-(-minutes_to_end // SLOT_MINUTES))
+            if last > first:
+                yield day, first, last
+            return
+        yield day, first, SLOTS_PER_DAY
+        day += timedelta(days=1)
+
+
+def slots_on(day: date, start: datetime, end: datetime) -> Tuple[int, int]:
+    """
+    Slots [first, last) of day that [start, end) covers, rounded outwards as in
+    day_slots; first >= last when the interval misses the day
+    """
+    midnight = datetime.combine(day, time.min)
+    first = int((start - midnight).total_seconds() // 60 // SLOT_MINUTES) if start > midnight else 0
+    last = int(-(-((end - midnight).total_seconds() / 60) // SLOT_MINUTES))
+    return first, min(last, SLOTS_PER_DAY)
+
+
+def slot_mask(first: int, last: int) -> np.ndarray:
+    """Packed bitmap with slots [first, last) set"""
+    bits = np.zeros(SLOTS_PER_DAY, dtype=bool)
+    bits[first:last] = True
+    return np.packbits(bits)
+
+
+def busy_ranges(day: date, bitmap: bytes) -> List[Tuple[datetime, datetime]]:
+    """Merge the set slots of a packed day bitmap into (start, end) datetimes"""
+    bits = np.unpackbits(np.frombuffer(bitmap, dtype=np.uint8))
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], bits, [0]))))
+    midnight = datetime.combine(day, time.min)
+    return [(midnight + timedelta(minutes=int(first) * SLOT_MINUTES),
+             midnight + timedelta(minutes=int(last) * SLOT_MINUTES))
+            for first, last in zip(edges[::2], edges[1::2])]
+
+
+class SlotCalendar:
+    """
+    Per-key, per-day bitmaps of busy 15-minute slots.
+    A day keeps a sorted array of the keys with anything booked that day and a
+    packed (keys x 12 bytes) bitmap, so checking many keys against a window is
+    a vectorized lookup and bitwise AND. Intervals are rounded out to whole
+    slots: a clear bitmap proves a window is free, a set bit only means an
+    interval may overlap it.
+    """
+
+    def __init__(self):
+        self._days: Dict[date, Tuple[np.ndarray, np.ndarray]] = {}
+        self._intervals: Dict[Hashable, Tuple[Hashable, datetime, datetime]] = {}
+        self._day_items: Dict[Tuple[Hashable, date], Set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    def items(self):
+        return self._intervals.items()
+
+    def clear(self) -> None:
+        self._days.clear()
+        self._intervals.clear()
+        self._day_items.clear()
+
+    def load(self, items: Iterable[Tuple[Hashable, Hashable, datetime, datetime]]) -> None:
+        """
+        Replace the contents with (item_id, key, start, end) items. Each day's
+        keys are sorted and its bitmaps stacked once, rather than inserted
+        into the arrays one by one as add() does.
+        """
+        self.clear()
+        days: Dict[date, Dict[Hashable, np.ndarray]] = {}
+        for item_id, key, start, end in items:
+            self._intervals[item_id] = (key, start, end)
+            for day, first, last in day_slots(start, end):
+                self._day_items.setdefault((key, day), set()).add(item_id)
+                bits = days.setdefault(day, {}).get(key)
+                if bits is None:
+                    bits = days[day][key] = np.zeros(SLOTS_PER_DAY, dtype=bool)
+                bits[first:last] = True
+        for day, by_key in days.items():
+            keys = sorted(by_key)
+            self._days[day] = (np.asarray(keys, dtype=np.int64),
+                               np.packbits(np.stack([by_key[key] for key in keys]), axis=1))
+
+    def add(self, item_id: Hashable, key: Hashable, start: datetime, end: datetime) -> None:
+        """Add or move an item's interval"""
+        self.remove(item_id)
+        self._intervals[item_id] = (key, start, end)
+        for day, _, _ in day_slots(start, end):
+            self._day_items.setdefault((key, day), set()).add(item_id)
+            self._redraw(key, day)
+
+    def remove(self, item_id: Hashable) -> None:
+        found = self._intervals.pop(item_id, None)
+        if found is None:
+            return
+        key, start, end = found
+        for day, _, _ in day_slots(start, end):
+            items = self._day_items.get((key, day))
+            if items is not None:
+                items.discard(item_id)
+                if not items:
+                    del self._day_items[(key, day)]
+            self._redraw(key, day)
+
+    def _redraw(self, key: Hashable, day: date) -> None:
+        bits = np.zeros(SLOTS_PER_DAY, dtype=bool)
+        for item_id in self._day_items.get((key, day), ()):
+            # Only this day's slots, so a long interval costs the same as a short one
+            _, start, end = self._intervals[item_id]
+            first, last = slots_on(day, start, end)
+            if last > first:
+                bits[first:last] = True
+
+        keys, bitmaps = self._days.get(day, (np.empty(0, dtype=np.int64), np.empty((0, BYTES_PER_DAY), dtype=np.uint8)))
+        position = int(np.searchsorted(keys, key))
+        present = position < len(keys) and keys[position] == key
+        if bits.any():
+            packed = np.packbits(bits)
+            if present:
+                bitmaps[position] = packed
+            else:
+                keys = np.insert(keys, position, key)
+                bitmaps = np.insert(bitmaps, position, packed, axis=0)
+            self._days[day] = (keys, bitmaps)
+        elif present:
+            keys = np.delete(keys, position)
+            bitmaps = np.delete(bitmaps, position, axis=0)
+            if len(keys):
+                self._days[day] = (keys, bitmaps)
+            else:
+                del self._days[day]
+
+    def day_bitmap(self, key: Hashable, day: date) -> bytes:
+        """Packed 12-byte bitmap of a key's busy slots on a day"""
+        keys, bitmaps = self._days.get(day, (None, None))
+        if keys is not None:
+            position = int(np.searchsorted(keys, key))
+            if position < len(keys) and keys[position] == key:
+                return bitmaps[position].tobytes()
+        return bytes(BYTES_PER_DAY)
+
+    def maybe_busy(self, keys: Iterable[Hashable], start: datetime, end: datetime) -> List[Hashable]:
+        """Return the keys with a busy slot in [start, end), in input order"""
+        keys = list(keys)
+        if not keys:
+            return []
+        wanted = np.asarray(keys, dtype=np.int64)
+        busy = np.zeros(len(wanted), dtype=bool)
+        for day, first, last in day_slots(start, end):
+            if day not in self._days:
+                continue
+            day_keys, bitmaps = self._days[day]
+            positions = np.searchsorted(day_keys, wanted)
+            positions[positions == len(day_keys)] = 0
+            found = day_keys[positions] == wanted
+            overlap = (bitmaps[positions] & slot_mask(first, last)).any(axis=1)
+            busy |= found & overlap
+        return [keys[i] for i in np.flatnonzero(busy).tolist()]
@@ -1,22 +1,42 @@
 import json
+from functools import lru_cache
+from types import MappingProxyType
 from flask import request
 
 DEFAULT_LANG = "en"
+# Distinct translated values whose parsed maps are kept
+TRANSLATION_CACHE_SIZE = 4096
 
 def get_current_lang():
     # Detect language from headers or default
     return request.headers.get("Accept-Language", DEFAULT_LANG).split(",")[0][:2]
 
+@lru_cache(maxsize=TRANSLATION_CACHE_SIZE)
+def parse_translations(field_value):
+    """
+    Parse a JSON translation map such as {"en": "Wash", "fr": "Lavage"}.
+    Results are cached by raw value, so each distinct blob is parsed once.
+    Returns:
+        Read-only {lang: text} mapping, or None if the value is not one
+    """
+    try:
+        translations = json.loads(field_value)
+    except json.JSONDecodeError:
+        return None
+    return MappingProxyType(translations) if isinstance(translations, dict) else None
+
 def translate_field(field_value, lang=None):
     """
     If field_value is JSON string with translations, return the right one.
     Otherwise return as-is.
     """
-    if not lang:
-        lang = get_current_lang()
+    # Plain strings are returned without attempting to parse them
+    if not isinstance(field_value, str) or field_value.lstrip()[:1] != "{":
+        return field_value
 
-    try:
-        translations = json.loads(field_value)
-        return translations.get(lang, translations.get(DEFAULT_LANG, field_value))
-    except (json.JSONDecodeError, TypeError):
+    translations = parse_translations(field_value)
+    if translations is None:
         return field_value
+    if not lang:
+        lang = get_current_lang()
+    return translations.get(lang, translations.get(DEFAULT_LANG, field_value))
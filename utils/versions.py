@@ -0,0 +1,86 @@
+from typing import List, Sequence
+
+# Committed rows of a table are folded into one on every FOLD_EVERY-th bump
+FOLD_EVERY = 64
+
+# PostgreSQL trigger function shared by every tracked table. Each writing
+# statement inserts a row of its own instead of updating a shared one, so
+# concurrent transactions never wait on each other's counter; the version of
+# a table is the sum of its rows. Folding only takes rows no one else holds
+# (SKIP LOCKED) and keeps their sum, so it never blocks a writer either.
+BUMP_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+DECLARE
+    bump_id bigint;
+BEGIN
+    INSERT INTO table_versions (name, version) VALUES (TG_TABLE_NAME, 1) RETURNING id INTO bump_id;
+    IF bump_id % {FOLD_EVERY} = 0 THEN
+        WITH folded AS (
+            DELETE FROM table_versions WHERE id IN (
+                SELECT id FROM table_versions WHERE name = TG_TABLE_NAME FOR UPDATE SKIP LOCKED
+            ) RETURNING version
+        )
+        INSERT INTO table_versions (name, version)
+        SELECT TG_TABLE_NAME, sum(version) FROM folded HAVING count(*) > 0;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def version_statements(table_name: str, dialect: str) -> List[str]:
+    """Statements creating the triggers that bump a table's TableVersion on SQLite or PostgreSQL"""
+    if dialect == 'sqlite':
+        # SQLite runs one write transaction at a time, so a single row per table does
+        bump = (f"UPDATE table_versions SET version = version + 1 WHERE name = '{table_name}'; "
+                f"INSERT INTO table_versions (name, version) SELECT '{table_name}', 1 "
+                f"WHERE NOT EXISTS (SELECT 1 FROM table_versions WHERE name = '{table_name}');")
+        return [f'CREATE TRIGGER IF NOT EXISTS {table_name}_version_{op.lower()} AFTER {op} ON {table_name} '
+                f'BEGIN {bump} END'
+                for op in ('INSERT', 'UPDATE', 'DELETE')]
+    if dialect == 'postgresql':
+        return [
+            BUMP_FUNCTION,
+            f'DROP TRIGGER IF EXISTS {table_name}_version ON {table_name}',
+            f'CREATE TRIGGER {table_name}_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table_name} '
+            f'FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()',
+        ]
+    return []
+
+
+def counter_statements(table_name: str, counter_column: str, columns: Sequence[str], dialect: str) -> List[str]:
+    """
+    Statements creating the trigger that increments a row's counter_column
+    whenever the value of one of columns changes, on SQLite or PostgreSQL
+    """
+    trigger = f'{table_name}_{counter_column}'
+    if dialect == 'sqlite':
+        changed = ' OR '.join(f'OLD.{name} IS NOT NEW.{name}' for name in columns)
+        return [f'CREATE TRIGGER IF NOT EXISTS {trigger} AFTER UPDATE OF {", ".join(columns)} ON {table_name} '
+                f'WHEN {changed} BEGIN UPDATE {table_name} SET {counter_column} = {counter_column} + 1 '
+                f'WHERE rowid = NEW.rowid; END']
+    if dialect == 'postgresql':
+        changed = ' OR '.join(f'OLD.{name} IS DISTINCT FROM NEW.{name}' for name in columns)
+        return [
+            f"""
+CREATE OR REPLACE FUNCTION bump_{trigger}() RETURNS trigger AS $$
+BEGIN
+    IF {changed} THEN
+        NEW.{counter_column} := OLD.{counter_column} + 1;
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+""",
+            f'DROP TRIGGER IF EXISTS {trigger} ON {table_name}',
+            f'CREATE TRIGGER {trigger} BEFORE UPDATE ON {table_name} '
+            f'FOR EACH ROW EXECUTE FUNCTION bump_{trigger}()',
+        ]
+    return []
+
+
+def install_version_triggers(target, connection, **kw) -> None:
+    """after_create listener adding the version triggers of a table"""
+    for statement in version_statements(target.name, connection.dialect.name):
+        connection.exec_driver_sql(statement)